@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2019 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"""Persistent address to derivation path reverse index
+
+   For each account extended public key, addresses are derived along
+   the given chains (e.g. 0 for receiving and 1 for change addresses)
+   and their hash160 are stored as fixed-size records:
+
+   [ 0:20] hash160
+   [20:24] account (position in the xpub list)
+   [24:28] chain
+   [28:32] index
+
+   sorted by hash160 in a binary file, after an 8 bytes magic header,
+   the 4 bytes number of accounts, and the 20 bytes fingerprint
+   (hash160 of the serialization) of each account xpub.
+   The file is memory-mapped and binary-searched: lookups are O(log n)
+   with no derivation at query time.
+"""
+
+import heapq
+import mmap
+import os
+from typing import Sequence, Optional, Tuple, List, Dict, Iterable
+
+from btclib import base58
+from btclib.bip32 import ExtendedKey, derive_range, ckd
+from btclib.utils import octets, h160
+
+MAGIC = b'BTCLIDX2'
+RECORD_SIZE = 32
+
+Path = Tuple[int, int, int]  # account, chain, index
+
+
+def _record(h: bytes, account: int, chain: int, index: int) -> bytes:
+    return (h + account.to_bytes(4, 'big') +
+            chain.to_bytes(4, 'big') + index.to_bytes(4, 'big'))
+
+
+def _path(record: bytes) -> Path:
+    account = int.from_bytes(record[20:24], 'big')
+    chain = int.from_bytes(record[24:28], 'big')
+    index = int.from_bytes(record[28:32], 'big')
+    return account, chain, index
+
+
+def _fingerprints(xpubs: Sequence[octets]) -> List[bytes]:
+    return [h160(ExtendedKey.from_xkey(xpub).serialize()) for xpub in xpubs]
+
+
+def _records(xpubs: Sequence[octets],
+             chains: Sequence[int],
+             starts: Dict[Tuple[int, int], int],
+             n: int) -> List[bytes]:
+    # derive the records from starts[(account, chain)] up to n
+    records: List[bytes] = list()
+    for account, xpub in enumerate(xpubs):
+        xaccount = ExtendedKey.from_xkey(xpub)
+        for chain in chains:
+            start = starts.get((account, chain), 0)
+            if start >= n:
+                continue
+            xchain = ckd(xaccount, chain)
+            h160s = derive_range(xchain, start, n - start, 'h160')
+            for index, h in enumerate(h160s, start):
+                records.append(_record(h, account, chain, index))
+    return records
+
+
+def _write_tmp(filename: str, fingerprints: List[bytes],
+               records: Iterable[bytes]) -> str:
+    # write the new index beside the old one, for an atomic os.replace
+    tmp = filename + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(MAGIC + len(fingerprints).to_bytes(4, 'big'))
+        f.write(b''.join(fingerprints))
+        for record in records:
+            f.write(record)
+        f.flush()
+        os.fsync(f.fileno())
+    return tmp
+
+
+def build_index(filename: str,
+                xpubs: Sequence[octets],
+                n: int,
+                chains: Sequence[int] = (0, 1)) -> int:
+    """Derive n addresses per chain of each account and store the index
+
+       Return the number of records in the index.
+    """
+
+    records = _records(xpubs, chains, dict(), n)
+    records.sort()
+    os.replace(_write_tmp(filename, _fingerprints(xpubs), records), filename)
+    return len(records)
+
+
+def extend_index(filename: str,
+                 xpubs: Sequence[octets],
+                 n: int,
+                 chains: Sequence[int] = (0, 1)) -> int:
+    """Extend an existing index up to n addresses per chain
+
+       The xpubs must be the ones the index was built with.
+       Only the missing addresses are derived, e.g. when the gap limit
+       moves, and merged into the sorted ones; return the number of
+       records in the index.
+    """
+
+    fingerprints = _fingerprints(xpubs)
+    with AddressIndex(filename) as index:
+        if index.fingerprints != fingerprints:
+            raise ValueError("xpubs do not match the index ones")
+        starts: Dict[Tuple[int, int], int] = dict()
+        for record in index.records():
+            account, chain, i = _path(record)
+            if i >= starts.get((account, chain), 0):
+                starts[(account, chain)] = i + 1
+        size = len(index)
+
+        new_records = _records(xpubs, chains, starts, n)
+        if not new_records:
+            return size
+        new_records.sort()
+        # both are sorted: merge them, streaming the mapped records
+        records = heapq.merge(index.records(), new_records)
+        tmp = _write_tmp(filename, fingerprints, records)
+    # atomic replacement, once the index is closed
+    os.replace(tmp, filename)
+    return size + len(new_records)
+
+
+class AddressIndex:
+    """Memory-mapped, binary-searched address reverse index"""
+
+    def __init__(self, filename: str) -> None:
+        self._file = open(filename, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        if size < len(MAGIC) + 4:
+            self._file.close()
+            raise ValueError(f"invalid index file size ({size})")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError("invalid index file: wrong magic bytes")
+
+        offset = len(MAGIC)
+        accounts = int.from_bytes(self._map[offset:offset+4], 'big')
+        offset += 4
+        self.fingerprints = [self._map[offset+20*i:offset+20*(i+1)]
+                             for i in range(accounts)]
+        offset += 20 * accounts
+        self._start = offset
+        if size < offset or (size - offset) % RECORD_SIZE:
+            self.close()
+            raise ValueError(f"invalid index file size ({size})")
+        self._n = (size - offset) // RECORD_SIZE
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __enter__(self) -> 'AddressIndex':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+    def _record(self, i: int) -> bytes:
+        offset = self._start + i * RECORD_SIZE
+        return self._map[offset:offset + RECORD_SIZE]
+
+    def records(self) -> Iterable[bytes]:
+        """All the records, sorted by hash160"""
+
+        return (self._record(i) for i in range(self._n))
+
+    def lookup(self, h160: bytes) -> Optional[Path]:
+        """Return (account, chain, index) for the given hash160, if any"""
+
+        if len(h160) != 20:
+            raise ValueError(f"hash160 of wrong size: {len(h160)}")
+        lo, hi = 0, self._n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = self._start + mid * RECORD_SIZE
+            h = self._map[offset:offset + 20]
+            if h < h160:
+                lo = mid + 1
+            elif h > h160:
+                hi = mid
+            else:
+                return _path(self._record(mid))
+        return None
+
+    def lookup_address(self, address: octets) -> Optional[Path]:
+        """Return (account, chain, index) for the given address, if any"""
+
+        payload = base58.decode_check(address, 21)
+        return self.lookup(payload[1:])
@@ -9,15 +9,31 @@
    - added length check functionalities to decode and decode_check
 """
 
+from functools import partial
 from hashlib import sha256
-from typing import Union, Optional
+from typing import Union, Optional, Iterable, Iterator, Tuple, List
 
-from btclib.utils import double_sha256
+from btclib.utils import double_sha256, chunks, imap, Buffer
 
 # used digits
 __digits = b'123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
 __base = len(__digits)
 
+# reverse lookup table: byte value -> digit index, 0xFF if invalid
+__index = bytearray(b'\xFF' * 256)
+for __i, __c in enumerate(__digits):
+    __index[__c] = __i
+__index = bytes(__index)
+del __i, __c
+
+# chunked conversion: 58^10 < 2^64
+__chunk_digits = 10
+__chunk_base = __base ** __chunk_digits
+# digit pairs, least significant digit first
+__pair_base = __base * __base
+__reversed_pairs = [bytes((__digits[j % __base], __digits[j // __base]))
+                    for j in range(__pair_base)]
+
 
 def _str_to_bytes(v: Union[str, bytes]) -> bytes:
     """Encode string to bytes, stipping leading/trailing white spaces"""
@@ -35,12 +51,19 @@ def encode_from_int(i: int) -> bytes:
     if i == 0:
         return __digits[0:1]
 
-    result = b""
+    # big-integer divmod by 58^10, then small-int divmod by 58^2:
+    # digit pairs are accumulated least significant first, reversed once
+    result = bytearray()
     while i:
-        i, idx = divmod(i, __base)
-        result = __digits[idx:idx+1] + result
-
-    return result
+        i, chunk = divmod(i, __chunk_base)
+        for _ in range(__chunk_digits // 2):
+            chunk, idx = divmod(chunk, __pair_base)
+            result += __reversed_pairs[idx]
+    # remove the zero digits padding the most significant chunk
+    while result[-1] == __digits[0]:
+        result.pop()
+    result.reverse()
+    return bytes(result)
 
 
 def encode(v: Union[str, bytes]) -> bytes:
@@ -77,10 +100,31 @@ def decode_to_int(v: Union[str, bytes]) -> int:
 
     v = _str_to_bytes(v)
 
+    # table lookup for all characters at once, then accumulation
+    digits = v.translate(__index)
+    invalid = digits.find(b'\xFF')
+    if invalid != -1:
+        char = chr(v[invalid])
+        raise ValueError(f"invalid base58 character {char!r}")
+    return _int_from_digits(digits)
+
+
+def _int_from_digits(digits: bytes) -> int:
+    # small-int accumulation of 10 digits at a time,
+    # big-integer multiply-add once per chunk
+    vlen = len(digits)
     i = 0
-    for char in v:
-        i *= __base
-        i += __digits.index(char)
+    start = 0
+    # the first chunk is the shorter one
+    stop = vlen % __chunk_digits or __chunk_digits
+    while start < vlen:
+        chunk = 0
+        for idx in digits[start:stop]:
+            chunk = chunk * __base + idx
+        size = stop - start
+        i = i * (__chunk_base if size == __chunk_digits else __base**size)
+        i += chunk
+        start, stop = stop, stop + __chunk_digits
     return i
 
 
@@ -128,3 +172,91 @@ def decode_check(v: Union[str, bytes],
         raise ValueError(m)
 
     return result
+
+
+# status codes of decode_check_many
+DECODE_OK = 0
+INVALID_CHARACTER = 1
+INVALID_SIZE = 2
+INVALID_CHECKSUM = 3
+
+
+def _items(values: Union[str, Buffer, Iterable[Union[str, bytes]]]) -> Iterator[bytes]:
+    # a buffer is split into newline-separated values
+    if isinstance(values, (str, bytes, bytearray, memoryview)):
+        if isinstance(values, str):
+            values = values.encode()
+        values = bytes(values).splitlines()
+    for v in values:
+        yield _str_to_bytes(v).strip()
+
+
+def _decode_check_chunk(values: List[bytes],
+                        output_size: Optional[int]
+                        ) -> List[Tuple[int, Optional[bytes]]]:
+    # checks of decode_check, with status codes instead of exceptions
+    index = __index
+    results: List[Tuple[int, Optional[bytes]]] = list()
+    for v in values:
+        digits = v.translate(index)
+        if digits.find(b'\xFF') != -1:
+            results.append((INVALID_CHARACTER, None))
+            continue
+        # base58 leading-1s (zero digits) become leading-0s
+        stripped = digits.lstrip(b'\x00')
+        payload = b'\0' * (len(digits) - len(stripped))
+        if stripped:
+            i = _int_from_digits(stripped)
+            payload += i.to_bytes((i.bit_length() + 7) // 8, 'big')
+        size = len(payload) - 4
+        if size < 0 or output_size is not None and size != output_size:
+            results.append((INVALID_SIZE, None))
+            continue
+        result, checksum = payload[:-4], payload[-4:]
+        if sha256(sha256(result).digest()).digest()[:4] != checksum:
+            results.append((INVALID_CHECKSUM, None))
+            continue
+        results.append((DECODE_OK, result))
+    return results
+
+
+def _encode_check_chunk(values: List[bytes]) -> List[bytes]:
+    return [encode(v + sha256(sha256(v).digest()).digest()[:4])
+            for v in values]
+
+
+def _map_chunks(func, items: Iterator[bytes],
+                processes: Optional[int], chunk_size: int) -> Iterator:
+    for results in imap(func, chunks(items, chunk_size), processes):
+        yield from results
+
+
+def decode_check_many(values: Union[str, Buffer, Iterable[Union[str, bytes]]],
+                      output_size: Optional[int] = None,
+                      processes: Optional[int] = None,
+                      chunk_size: int = 10000
+                      ) -> Iterator[Tuple[int, Optional[bytes]]]:
+    """Decode many Base58Check values, streaming (status, payload) results
+
+       values can be an iterable or a buffer of newline-separated values.
+       Instead of raising exceptions, each result has a status code
+       (DECODE_OK, INVALID_CHARACTER, INVALID_SIZE, or INVALID_CHECKSUM)
+       and a None payload if invalid.
+       With processes > 1, chunks of values are decoded in a process pool;
+       results are always returned in input order.
+    """
+
+    func = partial(_decode_check_chunk, output_size=output_size)
+    return _map_chunks(func, _items(values), processes, chunk_size)
+
+
+def encode_check_many(values: Union[str, Buffer, Iterable[Union[str, bytes]]],
+                      processes: Optional[int] = None,
+                      chunk_size: int = 10000) -> Iterator[bytes]:
+    """Encode many values using Base58Check, streaming results in order"""
+
+    if isinstance(values, (str, bytes, bytearray, memoryview)):
+        m = "values must be an iterable of bytes, not a buffer"
+        raise TypeError(m)
+    items = (_str_to_bytes(v) for v in values)
+    return _map_chunks(_encode_check_chunk, items, processes, chunk_size)
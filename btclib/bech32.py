@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2019 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"""Bech32 and Bech32m encoding, segwit addresses
+
+   https://github.com/bitcoin/bips/blob/master/bip-0173.mediawiki
+   https://github.com/bitcoin/bips/blob/master/bip-0350.mediawiki
+
+   Witness version 0 addresses use the bech32 checksum,
+   witness versions 1 to 16 use the bech32m checksum.
+   The BCH checksum polymod is table-driven: the five generator
+   contributions selected by the top 5 bits are precomputed.
+"""
+
+from typing import Union, List, Tuple, Optional, Iterable
+
+__alphabet = b'qpzry9x8gf2tvdw0s3jn54khce6mua7l'
+
+# reverse lookup table: byte value -> 5-bit value, 0xFF if invalid
+# (both lower and upper case characters are mapped)
+__index = bytearray(b'\xFF' * 256)
+for __i, __c in enumerate(__alphabet):
+    __index[__c] = __i
+    __index[ord(chr(__c).upper())] = __i
+__index = bytes(__index)
+del __i, __c
+
+__generator = (0x3b6a57b2, 0x26508e6d, 0x1ea119fa, 0x3d4233dd, 0x2a1462b3)
+# polymod table: xor of the generators selected by the top 5 bits
+__table = [0] * 32
+for __b in range(32):
+    for __j in range(5):
+        if (__b >> __j) & 1:
+            __table[__b] ^= __generator[__j]
+del __b, __j
+
+BECH32_CONST = 1
+BECH32M_CONST = 0x2bc830a3
+BECH32 = 'bech32'
+BECH32M = 'bech32m'
+__consts = {BECH32: BECH32_CONST, BECH32M: BECH32M_CONST}
+
+
+def _polymod(values: Iterable[int], chk: int = 1) -> int:
+    table = __table
+    for v in values:
+        chk = ((chk & 0x1ffffff) << 5) ^ v ^ table[chk >> 25]
+    return chk
+
+
+def _hrp_expand(hrp: bytes) -> List[int]:
+    return [c >> 5 for c in hrp] + [0] + [c & 31 for c in hrp]
+
+
+def _create_checksum(hrp: bytes, data: List[int], spec: str) -> List[int]:
+    values = _hrp_expand(hrp) + data
+    polymod = _polymod(values + [0] * 6) ^ __consts[spec]
+    return [(polymod >> 5 * (5 - i)) & 31 for i in range(6)]
+
+
+def _str_to_bytes(v: Union[str, bytes]) -> bytes:
+    if isinstance(v, str):
+        v = v.encode()
+    return v
+
+
+def encode(hrp: Union[str, bytes], data: List[int], spec: str) -> bytes:
+    """Compute a bech32/bech32m string given HRP and 5-bit values"""
+
+    hrp = _str_to_bytes(hrp).lower()
+    if spec not in __consts:
+        raise ValueError(f"invalid spec ({spec})")
+    if any(not 0 <= d < 32 for d in data):
+        raise ValueError("data values must be 5-bit")
+    combined = data + _create_checksum(hrp, data, spec)
+    result = hrp + b'1' + bytes(__alphabet[d] for d in combined)
+    if len(result) > 90:
+        raise ValueError(f"bech32 string length ({len(result)}) > 90")
+    return result
+
+
+def decode(bech: Union[str, bytes]) -> Tuple[bytes, List[int], str]:
+    """Validate a bech32/bech32m string and return (HRP, data, spec)"""
+
+    bech = _str_to_bytes(bech)
+    if any(c < 33 or c > 126 for c in bech):
+        raise ValueError("invalid character in bech32 string")
+    if bech.lower() != bech and bech.upper() != bech:
+        raise ValueError("mixed case bech32 string")
+    if len(bech) > 90:
+        raise ValueError(f"bech32 string length ({len(bech)}) > 90")
+    bech = bech.lower()
+    pos = bech.rfind(b'1')
+    if pos < 1 or pos + 7 > len(bech):
+        raise ValueError("invalid separator position in bech32 string")
+    hrp = bech[:pos]
+    digits = bech[pos+1:].translate(__index)
+    if digits.find(b'\xFF') != -1:
+        raise ValueError("invalid character in bech32 data part")
+    data = list(digits)
+    const = _polymod(data, _polymod(_hrp_expand(hrp)))
+    if const == BECH32_CONST:
+        spec = BECH32
+    elif const == BECH32M_CONST:
+        spec = BECH32M
+    else:
+        raise ValueError("invalid bech32 checksum")
+    return hrp, data[:-6], spec
+
+
+def _convertbits(data: Iterable[int], frombits: int, tobits: int,
+                 pad: bool) -> List[int]:
+    acc = 0
+    bits = 0
+    ret: List[int] = list()
+    maxv = (1 << tobits) - 1
+    max_acc = (1 << (frombits + tobits - 1)) - 1
+    for value in data:
+        if value < 0 or (value >> frombits):
+            raise ValueError(f"invalid {frombits}-bit value ({value})")
+        acc = ((acc << frombits) | value) & max_acc
+        bits += frombits
+        while bits >= tobits:
+            bits -= tobits
+            ret.append((acc >> bits) & maxv)
+    if pad:
+        if bits:
+            ret.append((acc << (tobits - bits)) & maxv)
+    elif bits >= frombits or ((acc << (tobits - bits)) & maxv):
+        raise ValueError("invalid padding")
+    return ret
+
+
+def _check_witness(wver: int, wprog: bytes) -> None:
+    if not 0 <= wver <= 16:
+        raise ValueError(f"invalid witness version ({wver})")
+    if not 2 <= len(wprog) <= 40:
+        raise ValueError(f"invalid witness program size ({len(wprog)})")
+    if wver == 0 and len(wprog) not in (20, 32):
+        m = f"invalid witness program size ({len(wprog)}) for version 0"
+        raise ValueError(m)
+
+
+def segwit_address(hrp: Union[str, bytes], wver: int, wprog: bytes) -> bytes:
+    """Encode a segwit address"""
+
+    _check_witness(wver, wprog)
+    spec = BECH32 if wver == 0 else BECH32M
+    return encode(hrp, [wver] + _convertbits(wprog, 8, 5, True), spec)
+
+
+def witness_from_address(address: Union[str, bytes],
+                         hrp: Optional[Union[str, bytes]] = None
+                         ) -> Tuple[int, bytes]:
+    """Decode a segwit address, returning (witness version, program)"""
+
+    hrpgot, data, spec = decode(address)
+    if hrp is not None and hrpgot != _str_to_bytes(hrp).lower():
+        raise ValueError(f"invalid HRP ({hrpgot.decode()})")
+    if not data:
+        raise ValueError("empty data part")
+    wver = data[0]
+    wprog = bytes(_convertbits(data[1:], 5, 8, False))
+    _check_witness(wver, wprog)
+    if (wver == 0) != (spec == BECH32):
+        raise ValueError(f"invalid checksum spec ({spec}) for version {wver}")
+    return wver, wprog
+
+
+def scriptpubkey_from_address(address: Union[str, bytes],
+                              hrp: Optional[Union[str, bytes]] = None
+                              ) -> bytes:
+    """Output script of a segwit address"""
+
+    wver, wprog = witness_from_address(address, hrp)
+    return bytes([wver + 0x50 if wver else 0, len(wprog)]) + wprog
+
+
+def validate_many(addresses: Iterable[Union[str, bytes]],
+                  hrp: Optional[Union[str, bytes]] = None) -> List[bool]:
+    """Validate many segwit addresses, without raising exceptions"""
+
+    results: List[bool] = list()
+    for address in addresses:
+        try:
+            witness_from_address(address, hrp)
+            results.append(True)
+        except Exception:
+            results.append(False)
+    return results
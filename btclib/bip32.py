@@ -8,15 +8,18 @@
 # No part of btclib including this file, may be copied, modified, propagated,
 # or distributed except according to the terms contained in the LICENSE file.
 
+from functools import lru_cache
 from hmac import HMAC
 from hashlib import sha512
-from typing import Union, Optional, Sequence, List
+from typing import Union, Optional, Sequence, List, Tuple
 
 from btclib import base58 
-from btclib.curve import mult
+from btclib.curve import Point, mult, _mult_jac, _jac_from_aff, \
+    _aff_from_jac_batch
 from btclib.curves import secp256k1 as ec
+from btclib.keys import PrivateKey, PublicKey
 from btclib.utils import octets, point_from_octets, octets_from_point, \
-                         int_from_octets, h160
+                         int_from_octets, h160, LRUCache
 from btclib.wifaddress import address_from_pubkey
 
 # VERSION BYTES =      4 bytes     Base58 encode starts with
@@ -94,106 +97,309 @@ def xpub_from_xprv(xprv: octets) -> bytes:
     return base58.encode_check(xpub)
 
 
-def ckd(xparentkey: octets, index: Union[octets, int]) -> bytes:
-    """Child Key Derivation (CDK)
-
-    Key derivation is normal if the extended parent key is public or
-    child_index is less than 0x80000000.
+class ExtendedKey:
+    """Parsed (binary) extended key
 
-    Key derivation is hardened if the extended parent key is private and
-    child_index is not less than 0x80000000.
+       Base58 serialization only happens at the API boundary
+       (from_xkey / xkey), while derivation works on the parsed fields.
+       The public key point is computed on first use and then cached.
     """
 
-    if isinstance(index, int):
-        index = index.to_bytes(4, 'big')
-    elif isinstance(index, str):  # hex string
-        index = bytes.fromhex(index)
-
-    if len(index) != 4:
-        raise ValueError(f"a 4 bytes int is required, not {len(index)}")
-
-    xparent = base58.decode_check(xparentkey, 78)
-
-    version = xparent[:4]
-
-    # serialization data
-    xkey = version                               # version
-    xkey += (xparent[4] + 1).to_bytes(1, 'big')  # (increased) depth
+    __slots__ = ('version', 'depth', 'fingerprint', 'index',
+                 'chain_code', 'key', '_Q')
+
+    def __init__(self,
+                 version: bytes,
+                 depth: int,
+                 fingerprint: bytes,
+                 index: bytes,
+                 chain_code: bytes,
+                 key: bytes,
+                 Q: Optional[Point] = None) -> None:
+        self.version = version          # 4 bytes
+        self.depth = depth              # int in [0, 255]
+        self.fingerprint = fingerprint  # 4 bytes parent pubkey fingerprint
+        self.index = index              # 4 bytes child index
+        self.chain_code = chain_code    # 32 bytes
+        self.key = key                  # 33 bytes private/public key
+        self._Q = Q
+
+    @classmethod
+    def from_xkey(cls, xkey: octets) -> 'ExtendedKey':
+        """Parse a Base58Check serialized extended key"""
+
+        xkey = base58.decode_check(xkey, 78)
+        return cls(xkey[:4], xkey[4], xkey[5:9], xkey[9:13],
+                   xkey[13:45], xkey[45:])
+
+    def serialize(self) -> bytes:
+        """Return the 78 bytes binary serialization"""
+
+        return (self.version + self.depth.to_bytes(1, 'big') +
+                self.fingerprint + self.index + self.chain_code + self.key)
+
+    def xkey(self) -> bytes:
+        """Return the Base58Check serialization"""
+
+        return base58.encode_check(self.serialize())
+
+    @property
+    def is_private(self) -> bool:
+        return self.key[0] == 0
+
+    @property
+    def prvkey(self) -> int:
+        if self.key[0] != 0:
+            raise ValueError("extended key is not a private one")
+        return int.from_bytes(self.key[1:], 'big')
+
+    @property
+    def Q(self) -> Point:
+        """Public key point, computed on first use"""
+
+        if self._Q is None:
+            if self.key[0] == 0:
+                self._Q = mult(ec, self.prvkey, ec.G)
+            else:
+                self._Q = point_from_octets(ec, self.key)
+        return self._Q
+
+    @property
+    def pubkey(self) -> bytes:
+        """Compressed public key"""
+
+        if self.key[0] in (2, 3):
+            return self.key
+        return octets_from_point(ec, self.Q, True)
+
+    def public_key(self) -> PublicKey:
+        """Compressed PublicKey object, reusing the cached point"""
+
+        if self.key[0] in (2, 3) and self._Q is None:
+            # the point is decoded only once, by PublicKey
+            P = PublicKey(self.key)
+            self._Q = P.Q
+            return P
+        return PublicKey(self.Q)
+
+    def private_key(self) -> PrivateKey:
+        """Compressed PrivateKey object, reusing the cached point"""
+
+        key = PrivateKey(self.prvkey)
+        if self._Q is not None:
+            key._public_key = PublicKey(self._Q)
+        return key
+
+
+def _ckd(xparent: ExtendedKey, index: bytes) -> ExtendedKey:
+    # binary Child Key Derivation, see ckd
+
+    version = xparent.version
+    depth = xparent.depth + 1                    # (increased) depth
 
     if (version in PUB):
-        if xparent[45] not in (2, 3):  # not a compressed public key
+        if xparent.key[0] not in (2, 3):  # not a compressed public key
             raise ValueError("version/key mismatch in extended parent key")
-        Parent_bytes = xparent[45:]
-        Parent = point_from_octets(ec, Parent_bytes)
-        xkey += h160(Parent_bytes)[:4]          # parent pubkey fingerprint
+        Parent_bytes = xparent.key
+        Parent = xparent.Q
+        fingerprint = h160(Parent_bytes)[:4]     # parent pubkey fingerprint
         if index[0] >= 0x80:
             raise ValueError("no private/hardened derivation from pubkey")
-        xkey += index                            # child index
-        parent_chain_code = xparent[13:45]       # normal derivation
         # actual extended key (key + chain code) derivation
-        h = HMAC(parent_chain_code, Parent_bytes + index, sha512).digest()
+        h = HMAC(xparent.chain_code, Parent_bytes + index, sha512).digest()
         offset = int.from_bytes(h[:32], 'big')
         Offset = mult(ec, offset, ec.G)
         Child = ec.add(Parent, Offset)
         Child_bytes = octets_from_point(ec, Child, True)
-        xkey += h[32:]                            # chain code
-        xkey += Child_bytes                       # public key
+        return ExtendedKey(version, depth, fingerprint, index,
+                           h[32:], Child_bytes, Child)
     elif (version in PRV):
-        if xparent[45] != 0:    # not a private key
+        if xparent.key[0] != 0:    # not a private key
             raise ValueError("version/key mismatch in extended parent key")
-        parent = int.from_bytes(xparent[46:], 'big')
-        Parent = mult(ec, parent, ec.G)
-        Parent_bytes = octets_from_point(ec, Parent, True)
-        xkey += h160(Parent_bytes)[:4]           # parent pubkey fingerprint
-        xkey += index                             # child index
+        parent = xparent.prvkey
+        Parent_bytes = xparent.pubkey
+        fingerprint = h160(Parent_bytes)[:4]     # parent pubkey fingerprint
         # actual extended key (key + chain code) derivation
-        parent_chain_code = xparent[13:45]
         if (index[0] < 0x80):                     # normal derivation
-            h = HMAC(parent_chain_code, Parent_bytes + index, sha512).digest()
+            data = Parent_bytes + index
         else:                                     # hardened derivation
-            h = HMAC(parent_chain_code, xparent[45:] + index, sha512).digest()
+            data = xparent.key + index
+        h = HMAC(xparent.chain_code, data, sha512).digest()
         offset = int.from_bytes(h[:32], 'big')
         child = (parent + offset) % ec.n
         child_bytes = b'\x00' + child.to_bytes(32, 'big')
-        xkey += h[32:]                            # chain code
-        xkey += child_bytes                       # private key
+        return ExtendedKey(version, depth, fingerprint, index,
+                           h[32:], child_bytes)
     else:
         raise ValueError("invalid extended key version")
 
-    return base58.encode_check(xkey)
+
+def _index_bytes(index: Union[octets, int]) -> bytes:
+    if isinstance(index, int):
+        index = index.to_bytes(4, 'big')
+    elif isinstance(index, str):  # hex string
+        index = bytes.fromhex(index)
+
+    if len(index) != 4:
+        raise ValueError(f"a 4 bytes int is required, not {len(index)}")
+    return index
 
 
-def derive(xkey: octets, path: Union[str, Sequence[int]]) -> bytes:
+def ckd(xparentkey: Union[octets, ExtendedKey],
+        index: Union[octets, int]) -> Union[bytes, ExtendedKey]:
+    """Child Key Derivation (CDK)
+
+    Key derivation is normal if the extended parent key is public or
+    child_index is less than 0x80000000.
+
+    Key derivation is hardened if the extended parent key is private and
+    child_index is not less than 0x80000000.
+
+    An ExtendedKey parent returns an ExtendedKey child, avoiding any
+    Base58 serialization.
+    """
+
+    index = _index_bytes(index)
+    if isinstance(xparentkey, ExtendedKey):
+        return _ckd(xparentkey, index)
+    xparent = ExtendedKey.from_xkey(xparentkey)
+    return _ckd(xparent, index).xkey()
+
+
+class DerivationCache(LRUCache):
+    """Thread-safe bounded LRU cache of intermediate extended keys
+
+       Child keys are cached by (parent key, parent chain code, index),
+       so that derivations sharing a (hardened) path prefix, e.g.
+       m/84'/0'/0'/0/i for many i, compute the prefix only once.
+       A maxsize equal to zero disables the cache.
+    """
+
+    def set_maxsize(self, maxsize: int) -> None:
+        super().set_maxsize(maxsize)
+
+    def ckd(self, xparent: 'ExtendedKey', index: bytes) -> 'ExtendedKey':
+        """Memoized binary child key derivation"""
+
+        if self.maxsize == 0:
+            return _ckd(xparent, index)
+        # version and depth are part of the child serialization
+        key = (xparent.version, xparent.depth,
+               xparent.key, xparent.chain_code, index)
+        child = self._get(None, key)
+        if child is None:
+            child = _ckd(xparent, index)
+            self._put(None, key, child)
+        return child
+
+
+# disabled by default: use derivation_cache.set_maxsize to enable it
+derivation_cache = DerivationCache()
+
+
+@lru_cache(maxsize=1024)
+def _indexes_from_path(path: str) -> Tuple[bool, Tuple[bytes, ...]]:
+    # return absolute flag and indexes for a path like "m/44'/0'/1'/0/10"
+    # compiled paths are cached, as the same few paths are used over and over
+    steps = path.split('/')
+    if steps[0] not in {'m', '.'}:
+        raise ValueError(f'Invalid derivation path: {path}')
+
+    indexes: List[bytes] = list()
+    for step in steps[1:]:
+        hardened = False
+        if step[-1] == "'" or step[-1] == "H":
+            hardened = True
+            step = step[:-1]
+        index = int(step)
+        index += 0x80000000 if hardened else 0
+        indexes.append(_index_bytes(index))
+    return steps[0] == 'm', tuple(indexes)
+
+
+def derive(xkey: Union[octets, ExtendedKey],
+           path: Union[str, Sequence[int]]) -> Union[bytes, ExtendedKey]:
     """derive an extended key according to path like
        "m/44'/0'/1'/0/10" (absolute) or "./0/10" (relative)
+
+       The extended key is parsed once and serialized once:
+       an ExtendedKey input returns an ExtendedKey.
+       If derivation_cache is enabled, all steps but the last one
+       are looked up there first.
     """
 
     if isinstance(path, str):
-        steps = path.split('/')
-        if steps[0] not in {'m', '.'}:
-            raise ValueError(f'Invalid derivation path: {path}')
-        if steps[0] == 'm':
-            decoded = base58.decode_check(xkey, 78)
-            t = b'\x00'*9
-            if decoded[4:13] != t:
-                raise ValueError("Absolute derivation path for non-master key")
-
-        indexes: List[int] = list()
-        for step in steps[1:]:
-            hardened = False
-            if step[-1] == "'" or step[-1] == "H":
-                hardened = True
-                step = step[:-1]
-            index = int(step)
-            index += 0x80000000 if hardened else 0
-            indexes.append(index)
+        absolute, indexes = _indexes_from_path(path)
     else:
-        indexes = path
+        absolute = False
+        indexes = [_index_bytes(index) for index in path]
 
-    for index in indexes:
-        xkey = ckd(xkey, index)
+    if isinstance(xkey, ExtendedKey):
+        k = xkey
+    else:
+        k = ExtendedKey.from_xkey(xkey)
+
+    if absolute and (k.depth != 0 or k.fingerprint != b'\x00'*4 or
+                     k.index != b'\x00'*4):
+        raise ValueError("Absolute derivation path for non-master key")
+
+    if indexes:
+        for index in indexes[:-1]:
+            k = derivation_cache.ckd(k, index)
+        k = _ckd(k, indexes[-1])
+
+    return k if isinstance(xkey, ExtendedKey) else k.xkey()
+
+
+def derive_range(xpub: Union[octets, ExtendedKey],
+                 start: int,
+                 count: int,
+                 output: str = 'pubkey') -> List[bytes]:
+    """derive the public children with indexes in [start, start+count)
+
+       The parent public key is decompressed once, offsets are multiplied
+       and added in Jacobian coordinates, and all children are normalized
+       to affine coordinates with a single simultaneous inversion.
+       The output can be compressed 'pubkey', 'h160', or 'address'.
+    """
+
+    if output not in ('pubkey', 'h160', 'address'):
+        raise ValueError(f"invalid output ({output})")
+    if start < 0 or count < 0 or start + count > 0x80000000:
+        m = f"index range [{start}, {start+count}) "
+        m += "not in normal derivation range"
+        raise ValueError(m)
+
+    if isinstance(xpub, ExtendedKey):
+        xparent = xpub
+    else:
+        xparent = ExtendedKey.from_xkey(xpub)
+    if xparent.key[0] not in (2, 3):
+        raise ValueError("extended key is not a public one")
+    if xparent.version not in PUB:
+        raise ValueError("version/key mismatch in extended parent key")
+
+    Parent_bytes = xparent.key
+    ParentJ = _jac_from_aff(xparent.Q)
+    chain_code = xparent.chain_code
+    ChildrenJ = list()
+    for i in range(start, start + count):
+        index = i.to_bytes(4, 'big')
+        h = HMAC(chain_code, Parent_bytes + index, sha512).digest()
+        offset = int.from_bytes(h[:32], 'big')
+        OffsetJ = _mult_jac(ec, offset, ec.GJ)
+        ChildrenJ.append(ec._add_jac(ParentJ, OffsetJ))
+    Children = _aff_from_jac_batch(ec, ChildrenJ)
+
+    pubkeys = [octets_from_point(ec, Q, True) for Q in Children]
+    if output == 'pubkey':
+        return pubkeys
+    h160s = [h160(pubkey) for pubkey in pubkeys]
+    if output == 'h160':
+        return h160s
+    version = ADDRESS[PUB.index(xparent.version)]
+    return [base58.encode_check(version + h) for h in h160s]
 
-    return xkey
 
 # FIXME: revise address_from_xpub / address_from_pubkey relation
 # FIXME: address_from_xpub should be pubkey_from_xpub o point_from_xpub
@@ -11,10 +11,11 @@
 """BIP39 entropy / mnemonic / seed functions"""
 
 from hashlib import sha256, pbkdf2_hmac
+from typing import Iterable, Iterator, List, Optional, Union
 
 from btclib.entropy import Entropy, GenericEntropy, bytes_from_entropy, \
     str_from_entropy
-from btclib.mnemonic import mnemonic_dict
+from btclib.mnemonic import mnemonic_dict, _seeds_from_mnemonics
 from btclib import bip32
 
 
@@ -89,6 +90,37 @@ def raw_entropy_from_mnemonic(mnemonic: str, lang: str) -> Entropy:
 
     return raw_entr
 
+
+def validate_many(mnemonics: Iterable[str],
+                  lang: Optional[str] = None) -> List[bool]:
+    """Check many mnemonic checksums, without raising exceptions
+
+       The language of each mnemonic is detected if lang is not given.
+    """
+
+    results: List[bool] = list()
+    for mnemonic in mnemonics:
+        try:
+            indexes = mnemonic_dict.indexes_from_mnemonic(mnemonic, lang)
+        except Exception:
+            results.append(False)
+            continue
+        # integer arithmetic instead of binary strings
+        nwords = len(indexes)
+        bits = nwords * 11
+        if nwords % 3 or bits * 32 // 33 not in _allowed_raw_entr_bits:
+            results.append(False)
+            continue
+        entropy = 0
+        for i in indexes:
+            entropy = (entropy << 11) | i
+        checksum_bits = nwords // 3
+        raw_entr = entropy >> checksum_bits
+        raw_bytes = raw_entr.to_bytes((bits - checksum_bits) // 8, 'big')
+        checksum = sha256(raw_bytes).digest()[0] >> (8 - checksum_bits)
+        results.append(entropy & ((1 << checksum_bits) - 1) == checksum)
+    return results
+
 # TODO: re-evaluate style
 
 
@@ -100,6 +132,24 @@ def seed_from_mnemonic(mnemonic: str, passphrase: str) -> bytes:
     dksize = 64
     return pbkdf2_hmac(hash_name, password, salt, iterations, dksize)
 
+
+def seeds_from_mnemonics(mnemonics: Iterable[str],
+                         passphrases: Union[str, Iterable[str]] = '',
+                         workers: Optional[int] = None,
+                         ordered: bool = True) -> Iterator:
+    """Derive the seeds of many mnemonics with a pool of threads
+
+       passphrases is either a single passphrase for all the mnemonics
+       or an iterable with one passphrase per mnemonic (ValueError is
+       raised if the passphrases are more or fewer than the mnemonics).
+       If ordered, seeds are yielded in input order; otherwise
+       (index, seed) tuples are yielded as soon as they are completed.
+       workers defaults to the number of CPUs.
+    """
+
+    return _seeds_from_mnemonics(seed_from_mnemonic, mnemonics,
+                                 passphrases, workers, ordered)
+
 # TODO: re-evaluate style
 
 
@@ -29,6 +29,22 @@ class Point(NamedTuple):
     x: int = 1
     y: int = 0 # no affine point has y=0 coordinate
 
+
+class ValidatedPoint(Point):
+    """ Elliptic curve point already known to be on the curve ec
+
+        It is only produced by checked constructors (e.g. mult results
+        or decompressed octets) and it is trusted by Curve.require_on_curve
+        without re-checking; plain tuples are still checked.
+        It compares equal to the corresponding Point.
+    """
+    ec: 'Curve'
+
+    def __reduce__(self):
+        # trust is not serialized: unpickled points are plain Points
+        return Point, (self[0], self[1])
+
+
 # infinity point in Jacobian coordinates is Inf = (int, int, 0)
 # it can be checked with 'Inf[2] == 0'
 _JacPoint = Tuple[int, int, int]
@@ -94,7 +110,7 @@ class Curve:
             raise ValueError("Generator must a be a tuple[int, int]")
         if not self.is_on_curve(G):
             raise ValueError("Generator is not on the 'x^3 + a*x + b' curve")
-        self.G = Point(int(G[0]), int(G[1]))
+        self.G = self._validated(int(G[0]), int(G[1]))
         self.GJ = self.G[0], self.G[1], 1  # Jacobian coordinates
 
         # 5. Check that n is prime.
@@ -157,22 +173,28 @@ class Curve:
         result += f", {self.t})"
         return result
 
+    def _validated(self, x: int = 1, y: int = 0) -> ValidatedPoint:
+        # point is assumed to be on curve
+        Q = ValidatedPoint(x, y)
+        Q.ec = self
+        return Q
+
     # methods using _p: they would become functions if _p goes public
 
     def opposite(self, Q: Point) -> Point:
         self.require_on_curve(Q)
         # % self._p is required to account for infinity point, i.e. Q[1]==0
-        return Point(Q[0], (self._p - Q[1]) % self._p)
+        return self._validated(Q[0], (self._p - Q[1]) % self._p)
 
     def _aff_from_jac(self, Q: _JacPoint) -> Point:
         # point is assumed to be on curve
         if Q[2] == 0:  # Infinity point in Jacobian coordinates
-            return Point()
+            return self._validated()
         else:
             Z2 = Q[2]*Q[2]
             x = (Q[0]*mod_inv(Z2, self._p)) % self._p
             y = (Q[1]*mod_inv(Z2*Q[2], self._p)) % self._p
-            return Point(x, y)
+            return self._validated(x, y)
 
     # methods using _a, _b, _p
 
@@ -181,7 +203,8 @@ class Curve:
         self.require_on_curve(Q2)
         # no Jacobian coordinates here as _aff_from_jac would cost 2 mod_inv
         # while _add_aff costs only one mod_inv
-        return self._add_aff(Q1, Q2)
+        R = self._add_aff(Q1, Q2)
+        return self._validated(R[0], R[1])
 
     def _add_jac(self, Q: _JacPoint, R: _JacPoint) -> _JacPoint:
         # points are assumed to be on curve
@@ -256,6 +279,10 @@ class Curve:
         return mod_sqrt(y2, self._p)
 
     def require_on_curve(self, Q: Point) -> None:
+        # trusted points do not need the cubic evaluation mod p
+        # _replace or the bare constructor give a ValidatedPoint without ec
+        if isinstance(Q, ValidatedPoint) and getattr(Q, 'ec', None) is self:
+            return
         if not self.is_on_curve(Q):
             raise ValueError("Point not on curve")
 
@@ -298,6 +325,36 @@ class Curve:
         return root if legendre == quad_res else self._p - root
 
 
+def _aff_from_jac_batch(ec: Curve,
+                        JPoints: Sequence[_JacPoint]) -> List[Point]:
+    # simultaneous inversion (Montgomery's trick): a single mod_inv
+    # and 3(n-1) multiplications instead of n mod_inv
+    # points are assumed to be on curve
+
+    # prefix products of the non-zero Z coordinates
+    prods: List[int] = list()
+    acc = 1
+    for Q in JPoints:
+        if Q[2] != 0:
+            acc = acc * Q[2] % ec._p
+        prods.append(acc)
+
+    inv = mod_inv(acc, ec._p)
+    result: List[Point] = [ec._validated()] * len(JPoints)
+    for i in range(len(JPoints) - 1, -1, -1):
+        Q = JPoints[i]
+        if Q[2] == 0:  # Infinity point in Jacobian coordinates
+            continue
+        # inverse of Q[2]
+        Z1 = inv * (prods[i-1] if i > 0 else 1) % ec._p
+        inv = inv * Q[2] % ec._p
+        Z2 = Z1 * Z1
+        x = Q[0] * Z2 % ec._p
+        y = Q[1] * Z2 * Z1 % ec._p
+        result[i] = ec._validated(x, y)
+    return result
+
+
 def mult(ec: Curve, n: int, Q: Point) -> Point:
     # this function is used by the Curve class; it might be a method...
     # but it does not need to
@@ -34,10 +34,11 @@
      signature)
 """
 
-from typing import Tuple
+from typing import Tuple, Iterator
 
 from btclib.curve import Curve
 from btclib.dsa import ECDS, _to_sig
+from btclib.utils import Buffer
 
 
 sighash_all = b'\x01'
@@ -47,6 +48,9 @@ sighash_all_anyonecanpay = b'\x81'
 sighash_none_anyonecanpay = b'\x82'
 sighash_single_anyonecanpay = b'\x83'
 
+# preallocated 1-byte sighash values
+_sighashes = [bytes([i]) for i in range(256)]
+
 
 def _bytes_from_scalar(scalar: int) -> bytes:
     # scalar is assumed to be in [1, n-1]
@@ -77,32 +81,55 @@ def encode(ec: Curve, sig: ECDS, sighash: bytes = sighash_all) -> bytes:
     return b'\x30' + len(enc).to_bytes(1, "big") + enc + sighash
 
 
-def decode(ec: Curve, sig: bytes) -> Tuple[ECDS, bytes]:
-    """Decode strict DER-encoded signature representation"""
+def _buffer(sig: Buffer) -> Buffer:
+    # zero-copy view of the input, indexable as unsigned bytes
+    if isinstance(sig, bytes):
+        return sig
+    sig = memoryview(sig)
+    if sig.format != 'B' or sig.ndim != 1:
+        sig = sig.cast('B')
+    return sig
+
+
+def decode(ec: Curve,
+           sig: Buffer) -> Tuple[ECDS, bytes]:
+    """Decode strict DER-encoded signature representation
+
+       bytearray and memoryview inputs are parsed without copying them.
+    """
+
+    buf = sig if type(sig) is bytes else _buffer(sig)
+    r, s, sighash = _decode(ec, buf, 0, len(buf))
+    return (r, s), _sighashes[sighash]
+
+
+def _decode(ec: Curve, sig: Buffer, i: int,
+            sigsize: int) -> Tuple[int, int, int]:
+    # decode the sigsize bytes signature starting at offset i of sig,
+    # returning r, s, and the sighash value
 
     maxsize = ec.nsize * 2 + 7
-    sigsize = len(sig)
     if not 8 < sigsize <= maxsize:
         errmsg = f"DER signature size ({sigsize}) must be in "
         errmsg += f"[9, {maxsize}]"
         raise ValueError(errmsg)
 
-    if sig[0] != 0x30:
+    if sig[i] != 0x30:
         raise ValueError("DER signature must be of type 0x30 (compound)")
 
     # sigsize checks
-    if sig[1] + 3 != sigsize:
+    if sig[i+1] + 3 != sigsize:
         m = "Declared signature size does not match with actual signature size"
         raise ValueError(m)
 
-    sizeR = sig[3]  # size of the r scalar
+    sizeR = sig[i+3]  # size of the r scalar
     if sizeR == 0:
         raise ValueError("Zero-size integers are not allowed for r")
 
     if 5 + sizeR >= sigsize:
         raise ValueError("Size of the s scalar must be inside the signature")
 
-    sizeS = sig[5 + sizeR]  # size of the s scalar
+    sizeS = sig[i+5+sizeR]  # size of the s scalar
     if sizeS == 0:
         raise ValueError("Zero-size integers are not allowed for s")
 
@@ -110,32 +137,62 @@ def decode(ec: Curve, sig: bytes) -> Tuple[ECDS, bytes]:
         raise ValueError("Signature size does not match with size of scalars")
 
     # scalar r
-    if sig[2] != 0x02:
+    if sig[i+2] != 0x02:
         raise ValueError("r scalar must be an integer")
-    
-    if sig[4] & 0x80:
+
+    if sig[i+4] & 0x80:
         raise ValueError("Negative numbers are not allowed for r")
 
     # Null bytes at the start of a scalar are not allowed, unless the
     # scalar would otherwise be interpreted as a negative number
-    if sizeR > 1 and sig[4] == 0x00 and not (sig[5] & 0x80):
+    if sizeR > 1 and sig[i+4] == 0x00 and not (sig[i+5] & 0x80):
         raise ValueError("Invalid null bytes at the start of r")
 
-    r = int.from_bytes(sig[4:4+sizeR], 'big')
+    r = int.from_bytes(sig[i+4:i+4+sizeR], 'big')
 
     # scalar s (offset=2+sizeR with respect to r)
-    if sig[sizeR + 4] != 0x02:
+    if sig[i+sizeR+4] != 0x02:
         raise ValueError("s scalar must be an integer")
 
-    if sig[sizeR + 6] & 0x80:
+    if sig[i+sizeR+6] & 0x80:
         raise ValueError("Negative numbers are not allowed for s")
 
     # Null bytes at the start of a scalar are not allowed, unless the
     # scalar would otherwise be interpreted as a negative number
-    if sizeS > 1 and sig[sizeR + 6] == 0x00 and not (sig[sizeR + 7] & 0x80):
+    if sizeS > 1 and sig[i+sizeR+6] == 0x00 and not (sig[i+sizeR+7] & 0x80):
         raise ValueError("Invalid null bytes at the start of s")
 
-    s = int.from_bytes(sig[6+sizeR:6+sizeR+sizeS], 'big')
-
-    # _to_sig checks that the signature is valid for the given Curve
-    return  _to_sig(ec, (r, s)), sig[sigsize-1:]
+    s = int.from_bytes(sig[i+6+sizeR:i+6+sizeR+sizeS], 'big')
+
+    # check that the signature is valid for the given Curve
+    r, s = _to_sig(ec, (r, s))
+
+    return r, s, sig[i+sigsize-1]
+
+
+def iter_decode(ec: Curve,
+                buf: Buffer
+                ) -> Iterator[Tuple[int, int, bytes]]:
+    """Yield (r, s, sighash) from concatenated length-prefixed signatures
+
+       Each signature (including its sighash byte) is preceded by its
+       1-byte size, as in script pushes. The buffer is not copied and
+       every signature is strictly (BIP66) checked: a ValueError reports
+       the offset of the first invalid one.
+    """
+
+    buf = _buffer(buf)
+    size = len(buf)
+    sighashes = _sighashes
+    i = 0
+    while i < size:
+        sigsize = buf[i]
+        i += 1
+        if i + sigsize > size:
+            raise ValueError(f"truncated signature at offset {i-1}")
+        try:
+            r, s, sighash = _decode(ec, buf, i, sigsize)
+        except ValueError as e:
+            raise ValueError(f"invalid signature at offset {i-1}: {e}")
+        yield r, s, sighashes[sighash]
+        i += sigsize
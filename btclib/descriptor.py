@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2019 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"""Output script descriptors
+
+   https://github.com/bitcoin/bitcoin/blob/master/doc/descriptors.md
+
+   Supported descriptors are pkh(KEY), wpkh(KEY), sh(wpkh(KEY)),
+   multi(k,KEY,...), sortedmulti(k,KEY,...), and their sh/wsh wrappings.
+   KEY is a hex-encoded compressed public key or an extended public key,
+   optionally preceded by its origin ([fingerprint/path]) and followed by
+   a derivation path, possibly ending with /* for ranged descriptors.
+   A trailing '#checksum' is accepted but not verified.
+   Addresses are Base58 for P2PKH and P2SH, bech32 for native segwit.
+
+   Descriptors are parsed once: the extended key is derived up to the
+   ranged step and cached, then ranges are lazily expanded, with all the
+   child public keys of a chunk computed by bip32.derive_range.
+"""
+
+from hashlib import sha256
+from typing import List, Optional, Iterator
+
+from btclib import base58, bech32
+from btclib.bip32 import ExtendedKey, derive, derive_range
+from btclib.curves import secp256k1 as ec
+from btclib.utils import point_from_octets, h160
+
+# chunk of indexes derived at once when lazily expanding ranges
+CHUNK_SIZE = 100
+
+P2PKH_VERSIONS = [b'\x00', b'\x6F']  # mainnet, testnet
+P2SH_VERSIONS = [b'\x05', b'\xC4']   # mainnet, testnet
+
+
+class KeyExpression:
+    """Descriptor key, possibly an (origin-annotated) ranged extended key"""
+
+    def __init__(self, key: str) -> None:
+        self.origin: Optional[str] = None
+        if key.startswith('['):
+            end = key.find(']')
+            if end == -1:
+                raise ValueError(f"unterminated key origin: {key}")
+            self.origin = key[1:end]
+            fingerprint = self.origin.split('/')[0]
+            if len(bytes.fromhex(fingerprint)) != 4:
+                raise ValueError(f"invalid origin fingerprint: {fingerprint}")
+            key = key[end+1:]
+
+        steps = key.split('/')
+        self.ranged = steps[-1] == '*'
+        if steps[-1] in ("*'", "*h", "*H"):
+            raise ValueError("hardened ranged derivation not supported")
+        path = steps[1:-1] if self.ranged else steps[1:]
+
+        self.pubkey: Optional[bytes] = None
+        self.xkey: Optional[ExtendedKey] = None
+        if len(steps[0]) == 66:
+            if len(steps) > 1:
+                raise ValueError(f"derivation from a public key: {key}")
+            self.pubkey = bytes.fromhex(steps[0])
+            point_from_octets(ec, self.pubkey)  # check it is a valid point
+        else:
+            xkey = ExtendedKey.from_xkey(steps[0])
+            if xkey.is_private:
+                raise ValueError("private keys are not supported")
+            # derived once and cached
+            if path:
+                path = [step.replace('h', "'") for step in path]
+                xkey = derive(xkey, './' + '/'.join(path))
+            self.xkey = xkey
+            if not self.ranged:
+                self.pubkey = xkey.key
+
+    def pubkeys(self, start: int, count: int) -> List[bytes]:
+        """Compressed public keys for the indexes in [start, start+count)"""
+
+        if self.ranged:
+            return derive_range(self.xkey, start, count)
+        return [self.pubkey] * count
+
+
+def _split_args(args: str) -> List[str]:
+    # split at top-level commas only
+    result: List[str] = list()
+    depth = 0
+    current = ''
+    for c in args:
+        if c in '([':
+            depth += 1
+        elif c in ')]':
+            depth -= 1
+        if c == ',' and depth == 0:
+            result.append(current)
+            current = ''
+        else:
+            current += c
+    result.append(current)
+    return result
+
+
+def _multisig_script(m: int, pubkeys: List[bytes]) -> bytes:
+    script = bytes([0x50 + m])                   # OP_m
+    for pubkey in pubkeys:
+        script += bytes([len(pubkey)]) + pubkey
+    script += bytes([0x50 + len(pubkeys)])       # OP_n
+    return script + b'\xae'                      # OP_CHECKMULTISIG
+
+
+class Descriptor:
+    """Parsed output script descriptor"""
+
+    def __init__(self, descriptor: str) -> None:
+        self.descriptor = descriptor
+        desc = descriptor.split('#')[0].strip()
+
+        # script wrappers, outermost first
+        self.wrappers: List[str] = list()
+        while desc.startswith(('sh(', 'wsh(')):
+            if not desc.endswith(')'):
+                raise ValueError(f"invalid descriptor: {descriptor}")
+            wrapper, desc = desc.split('(', 1)
+            self.wrappers.append(wrapper)
+            desc = desc[:-1]
+        if self.wrappers not in ([], ['sh'], ['wsh'], ['sh', 'wsh']):
+            raise ValueError(f"invalid script nesting: {descriptor}")
+
+        if '(' not in desc or not desc.endswith(')'):
+            raise ValueError(f"invalid descriptor: {descriptor}")
+        self.script_type, args = desc.split('(', 1)
+        args = args[:-1]
+
+        self.threshold = 0
+        if self.script_type in ('pkh', 'wpkh'):
+            if self.script_type == 'wpkh' and 'wsh' in self.wrappers:
+                raise ValueError(f"invalid script nesting: {descriptor}")
+            self.keys = [KeyExpression(args)]
+        elif self.script_type in ('multi', 'sortedmulti'):
+            args_list = _split_args(args)
+            self.threshold = int(args_list[0])
+            self.keys = [KeyExpression(key) for key in args_list[1:]]
+            if not 0 < self.threshold <= len(self.keys) <= 16:
+                m = f"invalid {self.threshold}-of-{len(self.keys)} multisig"
+                raise ValueError(m)
+        else:
+            raise ValueError(f"unknown script type: {self.script_type}")
+
+        self.ranged = any(key.ranged for key in self.keys)
+
+    def _inner_scripts(self, start: int, count: int) -> List[bytes]:
+        # one pubkeys list per key: each key is range-derived only once
+        pubkeys = [key.pubkeys(start, count) for key in self.keys]
+        if self.script_type == 'pkh':
+            return [b'\x76\xa9\x14' + h160(pk) + b'\x88\xac'
+                    for pk in pubkeys[0]]
+        if self.script_type == 'wpkh':
+            return [b'\x00\x14' + h160(pk) for pk in pubkeys[0]]
+        scripts: List[bytes] = list()
+        for pks in zip(*pubkeys):
+            pks = sorted(pks) if self.script_type == 'sortedmulti' else pks
+            scripts.append(_multisig_script(self.threshold, list(pks)))
+        return scripts
+
+    def _wrap(self, script: bytes) -> bytes:
+        for wrapper in reversed(self.wrappers):
+            if wrapper == 'wsh':
+                script = b'\x00\x20' + sha256(script).digest()
+            else:  # sh
+                script = b'\xa9\x14' + h160(script) + b'\x87'
+        return script
+
+    def scripts(self,
+                start: int = 0,
+                count: Optional[int] = None) -> Iterator[bytes]:
+        """Lazily yield the output scripts for indexes from start
+
+           Non-ranged descriptors yield a single script; ranged descriptors
+           yield count scripts, or an endless stream if count is None.
+        """
+
+        if not self.ranged:
+            yield self._wrap(self._inner_scripts(0, 1)[0])
+            return
+
+        stop = None if count is None else start + count
+        i = start
+        while stop is None or i < stop:
+            n = CHUNK_SIZE if stop is None else min(CHUNK_SIZE, stop - i)
+            for script in self._inner_scripts(i, n):
+                yield self._wrap(script)
+            i += n
+
+    def addresses(self,
+                  start: int = 0,
+                  count: Optional[int] = None,
+                  testnet: bool = False) -> Iterator[bytes]:
+        """Lazily yield the Base58 (P2PKH, P2SH) or bech32 addresses"""
+
+        if not self.wrappers and self.script_type not in ('pkh', 'wpkh'):
+            raise ValueError("bare multisig descriptors have no address")
+        network = 1 if testnet else 0
+        hrp = 'tb' if testnet else 'bc'
+        for script in self.scripts(start, count):
+            if script[0] == 0x00:     # P2WPKH or P2WSH
+                yield bech32.segwit_address(hrp, 0, script[2:])
+                continue
+            if script[0] == 0x76:     # P2PKH
+                payload = P2PKH_VERSIONS[network] + script[3:23]
+            else:                     # P2SH
+                payload = P2SH_VERSIONS[network] + script[2:22]
+            yield base58.encode_check(payload)
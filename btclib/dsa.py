@@ -14,10 +14,11 @@
    with bitcoin canonical 'low-s' encoding for ECDSA signatures
 """
 
-from typing import Tuple, Sequence, Optional, Callable, Any
+from typing import Tuple, Sequence, Optional, Callable, Any, Union, List
 
 from btclib.numbertheory import mod_inv
 from btclib.curve import Point, Curve, _mult_jac, _double_mult, double_mult
+from btclib.keys import PrivateKey, PublicKey
 from btclib.utils import int_from_bits
 from btclib.rfc6979 import _rfc6979
 
@@ -27,7 +28,7 @@ ECDS = Tuple[int, int]  # Tuple[scalar, scalar]
 def sign(ec: Curve,
          hf: Callable[[Any], Any],
          msg: bytes,
-         d: int,
+         d: Union[int, PrivateKey],
          k: Optional[int] = None) -> ECDS:
     """ECDSA signing operation according to SEC 1
 
@@ -48,6 +49,9 @@ def sign(ec: Curve,
     # H(m) is transformed into an integer modulo ec.n using int_from_bits:
     e = int_from_bits(ec, mhd)                        # 5
 
+    if isinstance(d, PrivateKey):
+        d = d.d
+
     # The secret key d: an integer in the range 1..n-1.
     # SEC 1 v.2 section 3.2.1
     if not 0 < d < ec.n:
@@ -91,7 +95,7 @@ def _sign(ec: Curve, e: int, d: int, k: int) -> ECDS:
 def verify(ec: Curve,
            hf: Callable[[Any], Any],
            msg: bytes,
-           P: Point,
+           P: Union[Point, PublicKey],
            sig: ECDS) -> bool:
     """ECDSA veryfying operation to SEC 1
 
@@ -109,7 +113,7 @@ def verify(ec: Curve,
 def _verify(ec: Curve,
             hf: Callable[[Any], Any],
             msg: bytes,
-            P: Point,
+            P: Union[Point, PublicKey],
             sig: ECDS) -> bool:
     # Private function for test/dev purposes
     # It raises Errors, while verify should always return True or False
@@ -122,9 +126,13 @@ def _verify(ec: Curve,
     return _verhlp(ec, e, P, sig)
 
 
-def _verhlp(ec: Curve, e: int, P: Point, sig: ECDS) -> bool:
+def _verhlp(ec: Curve, e: int, P: Union[Point, PublicKey],
+            sig: ECDS) -> bool:
     # Private function for test/dev purposes
 
+    if isinstance(P, PublicKey):
+        P = P.Q  # already validated
+
     # Fail if r is not [1, n-1]
     # Fail if s is not [1, n-1]
     r, s = _to_sig(ec, sig)                                # 1
@@ -216,3 +224,136 @@ def _to_sig(ec: Curve, sig: ECDS) -> ECDS:
         raise ValueError(f"s ({hex(r)}) not in [1, n-1]")
 
     return r, s
+
+
+# compact serialization: r || s, each scalar as nsize big-endian bytes
+# (64 bytes for secp256k1); the recoverable one is prefixed by the
+# Bitcoin signed-message header byte 27 + recid (+ 4 if compressed)
+
+def serialize(ec: Curve, sig: ECDS) -> bytes:
+    """Compact fixed-size r||s serialization"""
+
+    r, s = _to_sig(ec, sig)
+    return r.to_bytes(ec.nsize, 'big') + s.to_bytes(ec.nsize, 'big')
+
+
+def deserialize(ec: Curve, data: Union[bytes, bytearray, memoryview]) -> ECDS:
+    """Parse (and check) a compact fixed-size r||s signature"""
+
+    if len(data) != 2 * ec.nsize:
+        m = f"compact signature size ({len(data)}) must be {2*ec.nsize}"
+        raise ValueError(m)
+    return _to_sig(ec, (int.from_bytes(data[:ec.nsize], 'big'),
+                        int.from_bytes(data[ec.nsize:], 'big')))
+
+
+def serialize_many(ec: Curve, sigs: Sequence[ECDS]) -> bytearray:
+    """Contiguous buffer of compact signatures"""
+
+    size = ec.nsize
+    ints = [x for sig in sigs for x in sig]
+    # bulk range check, then search the invalid signature (if any)
+    if ints and not (0 < min(ints) and max(ints) < ec.n):
+        for i, x in enumerate(ints):
+            if not 0 < x < ec.n:
+                raise ValueError(f"invalid signature {i // 2}")
+    return bytearray(b''.join([x.to_bytes(size, 'big') for x in ints]))
+
+
+def deserialize_many(ec: Curve,
+                     buf: Union[bytes, bytearray, memoryview]) -> List[ECDS]:
+    """Parse a contiguous buffer of compact signatures
+
+       bytes, bytearray, array, and memoryview buffers are accepted.
+       Scalars are range-checked in bulk: a ValueError reports the
+       index of the first invalid signature.
+    """
+
+    # one copy, then C-level slicing and conversion of all scalars
+    data = bytes(buf)
+    size = ec.nsize
+    if len(data) % (2 * size):
+        m = f"buffer size ({len(data)}) not a multiple of {2*size}"
+        raise ValueError(m)
+    scalars = [data[i:i+size] for i in range(0, len(data), size)]
+    ints = list(map(int.from_bytes, scalars, ['big'] * len(scalars)))
+    # bulk range check, then search the invalid signature (if any)
+    if ints and not (0 < min(ints) and max(ints) < ec.n):
+        for i, x in enumerate(ints):
+            if not 0 < x < ec.n:
+                raise ValueError(f"invalid signature {i // 2}")
+    return list(zip(ints[0::2], ints[1::2]))
+
+
+def recovery_id(ec: Curve,
+                hf: Callable[[Any], Any],
+                msg: bytes,
+                P: Union[Point, PublicKey],
+                sig: ECDS) -> int:
+    """Return the id (in [0, 3]) that allows recovering P from sig
+
+       bit 0 is the parity of y(R), bit 1 is set if x(R) = r + n.
+    """
+
+    if isinstance(P, PublicKey):
+        P = P.Q
+    e = int_from_bits(ec, hf(msg).digest())
+    for recid in range(4):
+        try:
+            Q = _recover(ec, e, sig, recid)
+        except ValueError:
+            continue
+        if Q == P:
+            return recid
+    raise ValueError("public key not recoverable from signature")
+
+
+def _recover(ec: Curve, e: int, sig: ECDS, recid: int) -> Point:
+    r, s = _to_sig(ec, sig)
+    x = r + (recid >> 1) * ec.n
+    if x >= ec._p:
+        raise ValueError(f"invalid recovery id ({recid}) for r")
+    R = x, ec.y_odd(x, recid & 1)
+    r1 = mod_inv(r, ec.n)
+    Q = double_mult(ec, r1*s, R, -r1*e, ec.G)
+    if Q[1] == 0:
+        raise ValueError("recovered public key is infinite")
+    return Q
+
+
+def serialize_recoverable(ec: Curve, sig: ECDS, recid: int,
+                          compressed: bool = True) -> bytes:
+    """Compact recoverable (header || r || s) serialization"""
+
+    if not 0 <= recid < 4:
+        raise ValueError(f"invalid recovery id ({recid})")
+    header = 27 + recid + (4 if compressed else 0)
+    return bytes([header]) + serialize(ec, sig)
+
+
+def deserialize_recoverable(ec: Curve,
+                            data: Union[bytes, bytearray, memoryview]
+                            ) -> Tuple[ECDS, int, bool]:
+    """Parse a compact recoverable signature: (sig, recid, compressed)"""
+
+    if len(data) != 2 * ec.nsize + 1:
+        m = f"recoverable signature size ({len(data)}) "
+        m += f"must be {2*ec.nsize+1}"
+        raise ValueError(m)
+    header = data[0]
+    if not 27 <= header < 35:
+        raise ValueError(f"invalid recoverable signature header ({header})")
+    header -= 27
+    return deserialize(ec, data[1:]), header & 3, header >= 4
+
+
+def pubkey_from_recoverable(ec: Curve,
+                            hf: Callable[[Any], Any],
+                            msg: bytes,
+                            data: Union[bytes, bytearray, memoryview]
+                            ) -> Point:
+    """Recover the public key from a compact recoverable signature"""
+
+    sig, recid, _ = deserialize_recoverable(ec, data)
+    e = int_from_bits(ec, hf(msg).digest())
+    return _recover(ec, e, sig, recid)
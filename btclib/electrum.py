@@ -12,11 +12,14 @@
 
 from hashlib import sha512, pbkdf2_hmac
 import hmac
+# count is a parameter name of versioned_mnemonics
+from itertools import count as count_from
+from typing import Iterable, Iterator, Optional, Union, Dict, List, Tuple
 
-from btclib.entropy import Entropy, GenericEntropy, int_from_entropy, \
-    str_from_entropy
-from btclib.mnemonic import mnemonic_dict
+from btclib.entropy import Entropy, GenericEntropy, int_from_entropy
+from btclib.mnemonic import mnemonic_dict, _seeds_from_mnemonics
 from btclib import bip32
+from btclib.utils import imap
 
 ELECTRUM_MNEMONIC_VERSIONS = {'standard': '01',
                               'segwit': '100',
@@ -24,32 +27,129 @@ ELECTRUM_MNEMONIC_VERSIONS = {'standard': '01',
 
 # entropy can be expresses as binary string, bytes-like, or int
 
+# word lists as utf8 bytes, per language
+_word_bytes: Dict[str, List[bytes]] = dict()
+
+
+def _check_eversion(eversion: str) -> None:
+    if eversion not in ELECTRUM_MNEMONIC_VERSIONS:
+        m = f"mnemonic version '{eversion}' not in electrum allowed "
+        m += f"mnemonic versions {list(ELECTRUM_MNEMONIC_VERSIONS.keys())}"
+        raise ValueError(m)
+
+
+def _versioned_mnemonics(int_entropy: int,
+                         stop: Optional[int],
+                         lang: str,
+                         eversion: str) -> Iterator[Tuple[int, str]]:
+    """Yield (entropy, mnemonic) for the versioned entropies in [int_entropy, stop)
+
+       The word indexes are the base-n digits of the entropy (n being the
+       word list length): incrementing the entropy only changes the last
+       word, but on carry. HMAC-SHA512 is pre-keyed (the inner and outer
+       hash states are computed once), the inner state is updated with
+       the leading words once per carry, and only the last word is hashed
+       for each candidate.
+    """
+
+    words = _word_bytes.get(lang)
+    if words is None:
+        words = [w.encode('utf8') for w in mnemonic_dict.word_list(lang)]
+        _word_bytes[lang] = words
+    n = len(words)
+    # the version is a prefix of the hex digest
+    version = ELECTRUM_MNEMONIC_VERSIONS[eversion]
+    version_int = int(version, 16)
+    version_shift = 16 - 4 * len(version)
+    key = b"Seed version".ljust(128, b'\x00')
+    inner = sha512(bytes(c ^ 0x36 for c in key))
+    outer = sha512(bytes(c ^ 0x5C for c in key))
+
+    while stop is None or int_entropy < stop:
+        head, last = divmod(int_entropy, n)
+        # leading words (none for a single word mnemonic)
+        leading = list()
+        while head:
+            head, index = divmod(head, n)
+            leading.append(words[index])
+        prefix = b' '.join(reversed(leading)) + b' ' if leading else b''
+        inner_prefix = inner.copy()
+        inner_prefix.update(prefix)
+        end = n if stop is None else min(n, last + stop - int_entropy)
+        base = int_entropy - last
+        for i in range(last, end):
+            h = inner_prefix.copy()
+            h.update(words[i])
+            o = outer.copy()
+            o.update(h.digest())
+            d = o.digest()
+            if ((d[0] << 8) | d[1]) >> version_shift == version_int:
+                yield base + i, (prefix + words[i]).decode('utf8')
+        int_entropy = base + end
+
 
 def mnemonic_from_raw_entropy(raw_entropy: GenericEntropy,
                               lang: str,
                               eversion: str) -> str:
+    """First mnemonic of the given version from raw_entropy onward
+
+       The mnemonic entropy is the first integer (not lower than the raw
+       entropy) whose mnemonic HMAC has the version prefix.
+    """
+
     # electrum considers entropy as integer, losing any leading zero
     # https://github.com/spesmilo/electrum/blob/master/lib/mnemonic.py
     int_entropy = int_from_entropy(raw_entropy)
+    _check_eversion(eversion)
+    _, mnemonic = next(_versioned_mnemonics(int_entropy, None, lang, eversion))
+    return mnemonic
 
-    if eversion not in ELECTRUM_MNEMONIC_VERSIONS:
-        m = f"mnemonic version '{eversion}' not in electrum allowed "
-        m += f"mnemonic versions {list(ELECTRUM_MNEMONIC_VERSIONS.keys())}"
-        raise ValueError(m)
-    invalid = True
-    while invalid:
-        str_entropy = str_from_entropy(int_entropy)
-        indexes = mnemonic_dict.indexes_from_entropy(str_entropy, lang)
-        mnemonic = mnemonic_dict.mnemonic_from_indexes(indexes, lang)
-        # version validity check
-        s = hmac.new(b"Seed version", mnemonic.encode(
-            'utf8'), sha512).hexdigest()
-        if s.startswith(ELECTRUM_MNEMONIC_VERSIONS[eversion]):
-            invalid = False
-        # next trial
-        int_entropy += 1
 
-    return mnemonic
+def _scan_chunk(task: Tuple[int, int, str, str]) -> List[Tuple[int, str]]:
+    start, stop, lang, eversion = task
+    return list(_versioned_mnemonics(start, stop, lang, eversion))
+
+
+def versioned_mnemonics(raw_entropy: GenericEntropy,
+                        count: int,
+                        lang: str,
+                        eversion: str,
+                        processes: Optional[int] = None,
+                        chunk_size: int = 1 << 14) -> Iterator[str]:
+    """Yield the first count versioned mnemonics from raw_entropy onward
+
+       The first one is mnemonic_from_raw_entropy(raw_entropy, ...),
+       each following one is the next versioned mnemonic.
+       With processes > 1, consecutive entropy ranges of chunk_size
+       are scanned in parallel; mnemonics are yielded in entropy order.
+    """
+
+    int_entropy = int_from_entropy(raw_entropy)
+    _check_eversion(eversion)
+    if chunk_size < 1:
+        raise ValueError(f"invalid chunk size ({chunk_size})")
+    if count < 1:
+        return
+    if processes is None or processes < 2:
+        mnemonics = _versioned_mnemonics(int_entropy, None, lang, eversion)
+        for _, (_, mnemonic) in zip(range(count), mnemonics):
+            yield mnemonic
+        return
+
+    # consecutive entropy ranges, scanned in order
+    tasks = ((start, start + chunk_size, lang, eversion)
+             for start in count_from(int_entropy, chunk_size))
+    results = imap(_scan_chunk, tasks, processes)
+    try:
+        for chunk in results:
+            for _, mnemonic in chunk:
+                yield mnemonic
+                count -= 1
+                if count == 0:
+                    return
+    finally:
+        results.close()
+
 
 def entropy_from_mnemonic(mnemonic: str, lang: str) -> Entropy:
     """entropy is returned as binary string"""
@@ -67,6 +167,24 @@ def seed_from_mnemonic(mnemonic: str, passphrase: str) -> bytes:
     return pbkdf2_hmac(hash_name, password, salt, iterations, dksize)
 
 
+def seeds_from_mnemonics(mnemonics: Iterable[str],
+                         passphrases: Union[str, Iterable[str]] = '',
+                         workers: Optional[int] = None,
+                         ordered: bool = True) -> Iterator:
+    """Derive the seeds of many mnemonics with a pool of threads
+
+       passphrases is either a single passphrase for all the mnemonics
+       or an iterable with one passphrase per mnemonic (ValueError is
+       raised if the passphrases are more or fewer than the mnemonics).
+       If ordered, seeds are yielded in input order; otherwise
+       (index, seed) tuples are yielded as soon as they are completed.
+       workers defaults to the number of CPUs.
+    """
+
+    return _seeds_from_mnemonics(seed_from_mnemonic, mnemonics,
+                                 passphrases, workers, ordered)
+
+
 def mprv_from_mnemonic(mnemonic: str,
                        passphrase: str,
                        xversion: bytes) -> bytes:
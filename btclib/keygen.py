@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2019 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"""Bulk secp256k1 keypair generation
+
+   Private keys are drawn from os.urandom in large chunks.
+   Public keys are computed with fixed-base multiplication: a table of
+   the multiples j*256^i*G (for each byte position i and byte value j)
+   is precomputed once per process, so that k*G is the sum of 32 table
+   points, with no point doubling.
+   Each chunk of public keys is normalized to affine coordinates with a
+   single (simultaneous) modular inversion; points are not re-validated.
+
+   Keypairs are generated (and serialized) in chunks, possibly by a pool
+   of worker processes, while the calling process writes the already
+   serialized chunks through a buffered writer.
+
+   Output formats are 'csv' (prvkey hex, pubkey hex, WIF, address) and
+   'binary': after an 8 bytes magic header and a 1 byte compressed flag,
+   fixed-size records made of the 32 bytes private key and the
+   (33 or 65 bytes) public key.
+"""
+
+import os
+from typing import List, Optional, Iterator, NamedTuple, Tuple
+
+from btclib import base58
+from btclib.curve import _JacPoint, _aff_from_jac_batch
+from btclib.curves import secp256k1 as ec
+from btclib.utils import h160, imap
+
+MAGIC = b'BTCLKEY1'
+FORMATS = ('csv', 'binary')
+
+# table[i][j] = j * 256^i * G, as Jacobian points with Z = 1
+_table: List[List[_JacPoint]] = list()
+
+
+class KeyPair(NamedTuple):
+    prvkey: int
+    pubkey: bytes
+    wif: bytes
+    address: bytes
+
+
+def _base_table() -> List[List[_JacPoint]]:
+    # lazily computed once per process
+    if not _table:
+        JPoints: List[_JacPoint] = list()
+        BJ: _JacPoint = (ec.G[0], ec.G[1], 1)
+        for _ in range(32):
+            PJ = BJ
+            for _ in range(1, 256):
+                JPoints.append(PJ)
+                PJ = ec._add_jac(PJ, BJ)
+            BJ = PJ  # 256 * BJ
+        Points = _aff_from_jac_batch(ec, JPoints)
+        for i in range(32):
+            row = [(1, 1, 0)] + [(x, y, 1) for x, y in
+                                 Points[i*255:(i+1)*255]]
+            _table.append(row)
+    return _table
+
+
+def _mult_base_jac(k: int) -> _JacPoint:
+    """Fixed-base multiplication k*G, in Jacobian coordinates"""
+
+    table = _base_table()
+    RJ: _JacPoint = (1, 1, 0)
+    for row, j in zip(table, k.to_bytes(32, 'little')):
+        if j:
+            RJ = ec._add_jac(RJ, row[j])
+    return RJ
+
+
+def _pubkey(k: int) -> bytes:
+    # compressed public key, with fixed-base multiplication
+    x, y = _aff_from_jac_batch(ec, [_mult_base_jac(k)])[0]
+    return bytes([2 + (y & 1)]) + x.to_bytes(32, 'big')
+
+
+def _prvkeys(count: int) -> List[int]:
+    # rejection sampling of [1, n-1] from large os.urandom chunks
+    prvkeys: List[int] = list()
+    while len(prvkeys) < count:
+        missing = count - len(prvkeys)
+        buffer = os.urandom(32 * missing)
+        for i in range(0, len(buffer), 32):
+            k = int.from_bytes(buffer[i:i+32], 'big')
+            if 0 < k < ec.n:
+                prvkeys.append(k)
+    return prvkeys
+
+
+def _keypairs(count: int, compressed: bool,
+              prvkeys: Optional[List[int]] = None) -> List[KeyPair]:
+    if prvkeys is None:
+        prvkeys = _prvkeys(count)
+    Points = _aff_from_jac_batch(ec, [_mult_base_jac(k) for k in prvkeys])
+    keypairs: List[KeyPair] = list()
+    suffix = b'\x01' if compressed else b''
+    for k, (x, y) in zip(prvkeys, Points):
+        if compressed:
+            pubkey = bytes([2 + (y & 1)]) + x.to_bytes(32, 'big')
+        else:
+            pubkey = b'\x04' + x.to_bytes(32, 'big') + y.to_bytes(32, 'big')
+        wif = base58.encode_check(b'\x80' + k.to_bytes(32, 'big') + suffix)
+        address = base58.encode_check(b'\x00' + h160(pubkey))
+        keypairs.append(KeyPair(k, pubkey, wif, address))
+    return keypairs
+
+
+def _serialize(keypairs: List[KeyPair], fmt: str) -> bytes:
+    if fmt == 'csv':
+        return b''.join(b'%064x,%s,%s,%s\n' % (kp.prvkey,
+                                              kp.pubkey.hex().encode(),
+                                              kp.wif, kp.address)
+                        for kp in keypairs)
+    return b''.join(kp.prvkey.to_bytes(32, 'big') + kp.pubkey
+                    for kp in keypairs)
+
+
+def _keypairs_chunk(args: Tuple[int, bool, Optional[str]]):
+    count, compressed, fmt = args
+    keypairs = _keypairs(count, compressed)
+    return keypairs if fmt is None else _serialize(keypairs, fmt)
+
+
+def _chunk_args(count: int, chunk_size: int, compressed: bool,
+                fmt: Optional[str]) -> Iterator[Tuple[int, bool, Optional[str]]]:
+    for start in range(0, count, chunk_size):
+        yield min(chunk_size, count - start), compressed, fmt
+
+
+def _map_chunks(count: int, chunk_size: int, compressed: bool,
+                fmt: Optional[str], processes: Optional[int]) -> Iterator:
+    if chunk_size < 1:
+        raise ValueError(f"invalid chunk size ({chunk_size})")
+    args = _chunk_args(count, chunk_size, compressed, fmt)
+    return imap(_keypairs_chunk, args, processes)
+
+
+def keypairs(count: int,
+             compressed: bool = True,
+             processes: Optional[int] = None,
+             chunk_size: int = 10000) -> Iterator[KeyPair]:
+    """Lazily yield count fresh (prvkey, pubkey, WIF, address) keypairs"""
+
+    for chunk in _map_chunks(count, chunk_size, compressed, None, processes):
+        yield from chunk
+
+
+def write_keypairs(filename: str,
+                   count: int,
+                   fmt: str = 'csv',
+                   compressed: bool = True,
+                   processes: Optional[int] = None,
+                   chunk_size: int = 10000) -> int:
+    """Write count fresh keypairs to file, returning the bytes written
+
+       The file contains plaintext private keys: it is created readable
+       and writable by the owner only.
+       With processes > 1, chunks are generated and serialized by worker
+       processes while the calling process writes the previous ones.
+    """
+
+    if fmt not in FORMATS:
+        raise ValueError(f"invalid format ({fmt})")
+    written = 0
+    # plaintext private keys: owner-only permissions
+    fd = os.open(filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with open(fd, 'wb', buffering=1 << 20) as f:
+        if fmt == 'binary':
+            written += f.write(MAGIC + (b'\x01' if compressed else b'\x00'))
+        for data in _map_chunks(count, chunk_size, compressed, fmt, processes):
+            written += f.write(data)
+    return written
+
+
+def read_keypairs(filename: str) -> Iterator[KeyPair]:
+    """Lazily yield the keypairs of a binary keypair file
+
+       WIFs and addresses are recomputed, public keys are not validated.
+    """
+
+    with open(filename, 'rb', buffering=1 << 20) as f:
+        header = f.read(len(MAGIC) + 1)
+        if header[:len(MAGIC)] != MAGIC:
+            raise ValueError("invalid keypair file: wrong magic bytes")
+        compressed = header[-1] == 1
+        size = 32 + (33 if compressed else 65)
+        suffix = b'\x01' if compressed else b''
+        while True:
+            record = f.read(size)
+            if not record:
+                return
+            if len(record) != size:
+                raise ValueError("invalid keypair file: truncated record")
+            prv = record[:32]
+            pubkey = record[32:]
+            wif = base58.encode_check(b'\x80' + prv + suffix)
+            address = base58.encode_check(b'\x00' + h160(pubkey))
+            yield KeyPair(int.from_bytes(prv, 'big'), pubkey, wif, address)
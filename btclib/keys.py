@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2019 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"""Private and public key objects
+
+   Each representation (point, SEC octets, hash160, address, WIF)
+   is computed on first use and then cached: repeated conversions cost
+   nothing after the first one.
+   wifaddress, bip32 and dsa functions accept these objects too.
+"""
+
+from typing import Union, Optional, Dict
+
+from btclib import base58
+from btclib.curve import Point, ValidatedPoint, Curve, mult
+from btclib.curves import secp256k1
+from btclib.utils import octets, point_from_octets, octets_from_point, \
+    octets_from_int, h160
+
+
+class PublicKey:
+    """Public key, with lazily computed and cached representations"""
+
+    __slots__ = ('ec', 'compressed', '_Q', '_sec', '_h160', '_addresses')
+
+    def __init__(self,
+                 key: Union[Point, octets],
+                 compressed: Optional[bool] = None,
+                 ec: Curve = secp256k1) -> None:
+        self.ec = ec
+        self._Q: Optional[Point] = None
+        self._sec: Dict[bool, bytes] = dict()
+        self._h160: Optional[bytes] = None
+        self._addresses: Dict[bytes, bytes] = dict()
+        if isinstance(key, tuple):
+            ec.require_on_curve(key)
+            if key[1] == 0:
+                raise ValueError("public key is infinite")
+            # a ValidatedPoint from _replace or the constructor has no ec
+            if (isinstance(key, ValidatedPoint) and
+                    getattr(key, 'ec', None) is ec):
+                self._Q = key
+            else:
+                self._Q = ec._validated(key[0], key[1])
+            self.compressed = True if compressed is None else compressed
+        else:
+            if isinstance(key, str):
+                key = bytes.fromhex(key)
+            key = bytes(key)
+            if key[0] not in (2, 3, 4):
+                raise ValueError("not a compressed/uncompressed public key")
+            key_compressed = key[0] != 4
+            self.compressed = key_compressed if compressed is None else compressed
+            # the point is only decoded (i.e. validated) now
+            self._Q = point_from_octets(ec, key)
+            self._sec[key_compressed] = key
+
+    @property
+    def Q(self) -> Point:
+        return self._Q
+
+    def sec(self, compressed: Optional[bool] = None) -> bytes:
+        """SEC 1 serialization, compressed or not"""
+
+        if compressed is None:
+            compressed = self.compressed
+        o = self._sec.get(compressed)
+        if o is None:
+            o = octets_from_point(self.ec, self._Q, compressed)
+            self._sec[compressed] = o
+        return o
+
+    @property
+    def pubkey(self) -> bytes:
+        return self.sec()
+
+    @property
+    def h160(self) -> bytes:
+        if self._h160 is None:
+            self._h160 = h160(self.sec())
+        return self._h160
+
+    def address(self, version: bytes = b'\x00') -> bytes:
+        """Base58 (P2PKH) address"""
+
+        address = self._addresses.get(version)
+        if address is None:
+            address = base58.encode_check(version + self.h160)
+            self._addresses[version] = address
+        return address
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, PublicKey):
+            return NotImplemented
+        return (self.ec.G == other.ec.G and self._Q == other._Q and
+                self.compressed == other.compressed)
+
+    def __hash__(self) -> int:
+        return hash((self._Q, self.compressed))
+
+    def __repr__(self) -> str:
+        return f"PublicKey('{self.sec().hex()}')"
+
+
+class PrivateKey:
+    """Private key, with lazily computed and cached representations"""
+
+    __slots__ = ('ec', 'd', 'compressed', '_wif', '_public_key')
+
+    def __init__(self,
+                 key: Union[int, octets],
+                 compressed: bool = True,
+                 ec: Curve = secp256k1) -> None:
+        self.ec = ec
+        self._wif: Optional[bytes] = None
+        self._public_key: Optional[PublicKey] = None
+        if isinstance(key, int):
+            d = key
+        else:
+            # WIF: its own compression flag overrides compressed
+            payload = base58.decode_check(key)
+            if payload[0] != 0x80:
+                raise ValueError("Not a private key WIF: missing leading 0x80")
+            if len(payload) == ec.nsize + 2:
+                if payload[-1] != 0x01:
+                    raise ValueError("Not a compressed WIF: missing trailing 0x01")
+                compressed = True
+            elif len(payload) == ec.nsize + 1:
+                compressed = False
+            else:
+                raise ValueError(f"Not a WIF: wrong size ({len(payload)})")
+            d = int.from_bytes(payload[1:ec.nsize+1], 'big')
+            self._wif = key.encode() if isinstance(key, str) else bytes(key)
+        if not 0 < d < ec.n:
+            raise ValueError(f"private key {hex(d)} not in [1, n-1]")
+        self.d = d
+        self.compressed = compressed
+
+    @property
+    def wif(self) -> bytes:
+        """Wallet Import Format"""
+
+        if self._wif is None:
+            payload = b'\x80' + octets_from_int(self.d, self.ec.nsize)
+            if self.compressed:
+                payload += b'\x01'
+            self._wif = base58.encode_check(payload)
+        return self._wif
+
+    @property
+    def public_key(self) -> PublicKey:
+        if self._public_key is None:
+            Q = mult(self.ec, self.d, self.ec.G)
+            self._public_key = PublicKey(Q, self.compressed, self.ec)
+        return self._public_key
+
+    @property
+    def Q(self) -> Point:
+        return self.public_key.Q
+
+    def address(self, version: bytes = b'\x00') -> bytes:
+        return self.public_key.address(version)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, PrivateKey):
+            return NotImplemented
+        return (self.ec.G == other.ec.G and self.d == other.d and
+                self.compressed == other.compressed)
+
+    def __hash__(self) -> int:
+        return hash((self.d, self.compressed))
+
+    def __repr__(self) -> str:
+        # never leak the private key in logs/tracebacks
+        return f"PrivateKey(<{'compressed' if self.compressed else 'uncompressed'}>)"
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2019 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"""Compact memory-mapped wallet key store
+
+   Derived keys are stored once, so that services can reload them at
+   startup instead of re-deriving them.
+   After an 8 bytes magic header, the file is a sequence of fixed-size
+   blocks, each made of BLOCK_RECORDS fixed-size records, a 4 bytes count
+   of the used records, and the sha256 integrity checksum of the block.
+   Only the last block can be partially filled: appends rewrite it
+   in place and then add new blocks.
+   Before that, the store size and the last partial block are saved to
+   an undo journal (filename + '.journal'), removed once the append is
+   on disk: if an append is interrupted, the journal is rolled back
+   when the store is opened again, restoring the previous records.
+
+   Record layout (RECORD_SIZE bytes):
+
+   [  0:  1] path depth (at most MAX_DEPTH)
+   [  1: 33] path indexes, 4 bytes each, zero padded
+   [ 33: 66] compressed public key
+   [ 66: 86] hash160 of the public key
+   [ 86: 87] 0x01 if a private key is stored, 0x00 otherwise
+   [ 87:119] private key, encrypted if a store key is provided
+
+   Private key encryption is a one-time pad: the private key is XORed
+   with HMAC-SHA256(store key, public key), which is unique per record.
+   The store key should be derived from a password with a proper KDF
+   (e.g. hashlib.pbkdf2_hmac).
+   This is not authenticated encryption: the block checksum only
+   detects accidental corruption. A wrong store key is detected when
+   reading a private key, as its public key does not match the stored one.
+"""
+
+import hmac
+import mmap
+import os
+from hashlib import sha256
+from typing import Sequence, Optional, List, NamedTuple, Union, Set
+
+from btclib.bip32 import ExtendedKey, derive_range, ckd
+from btclib.curves import secp256k1 as ec
+from btclib.keygen import _pubkey
+from btclib.utils import octets, h160
+
+MAGIC = b'BTCLKST1'
+JOURNAL_SUFFIX = '.journal'
+MAX_DEPTH = 8
+RECORD_SIZE = 119
+BLOCK_RECORDS = 64
+BLOCK_SIZE = BLOCK_RECORDS * RECORD_SIZE + 4 + 32
+
+
+class KeyRecord(NamedTuple):
+    path: Sequence[int]
+    pubkey: bytes
+    h160: bytes
+    prvkey: Optional[int]
+
+
+def _pad(key: bytes, pubkey: bytes) -> bytes:
+    return hmac.new(key, pubkey, sha256).digest()
+
+
+def _xor(a: bytes, b: bytes) -> bytes:
+    return (int.from_bytes(a, 'big') ^ int.from_bytes(b, 'big')).to_bytes(32, 'big')
+
+
+
+def _write_synced(filename: str, data: bytes) -> None:
+    # owner-only permissions, data on disk when returning
+    fd = os.open(filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with open(fd, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+class KeyStore:
+    """Append-only, memory-mapped store of fixed-size key records"""
+
+    def __init__(self, filename: str, key: Optional[bytes] = None) -> None:
+        self.filename = filename
+        self._key = key
+        if not os.path.exists(filename):
+            # encrypted private keys: owner-only permissions
+            fd = os.open(filename, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with open(fd, 'wb') as f:
+                f.write(MAGIC)
+        self._file = open(filename, 'r+b')
+        self._rollback()
+        size = os.fstat(self._file.fileno()).st_size
+        if size < len(MAGIC) or (size - len(MAGIC)) % BLOCK_SIZE:
+            self._file.close()
+            raise ValueError(f"invalid key store size ({size})")
+        self._file.seek(0)
+        if self._file.read(len(MAGIC)) != MAGIC:
+            self._file.close()
+            raise ValueError("invalid key store: wrong magic bytes")
+        self._map: Optional[mmap.mmap] = None
+        self._verified: Set[int] = set()
+        self._remap()
+
+    def _journal(self) -> None:
+        # undo journal of an append: store size and last partial block
+        b, count = divmod(self._n, BLOCK_RECORDS)
+        size = len(MAGIC) + self._nblocks * BLOCK_SIZE
+        data = size.to_bytes(8, 'big') + (self._block(b) if count else b'')
+        _write_synced(self.filename + JOURNAL_SUFFIX,
+                      data + sha256(data).digest())
+
+    def _rollback(self) -> None:
+        # undo an interrupted append, if any
+        journal = self.filename + JOURNAL_SUFFIX
+        if not os.path.exists(journal):
+            return
+        with open(journal, 'rb') as f:
+            data = f.read()
+        data, checksum = data[:-32], data[-32:]
+        # an incomplete journal means that the store was not modified yet
+        if len(data) >= 8 and sha256(data).digest() == checksum:
+            size = int.from_bytes(data[:8], 'big')
+            tail = data[8:]
+            if tail:
+                self._file.seek(size - BLOCK_SIZE)
+                self._file.write(tail)
+            self._file.truncate(size)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        os.remove(journal)
+
+    def _remap(self) -> None:
+        if self._map is not None:
+            self._map.close()
+        size = os.fstat(self._file.fileno()).st_size
+        self._nblocks = (size - len(MAGIC)) // BLOCK_SIZE
+        self._n = 0
+        if self._nblocks:
+            self._map = mmap.mmap(self._file.fileno(), 0,
+                                  access=mmap.ACCESS_READ)
+            last = self._block(self._nblocks - 1)
+            count = int.from_bytes(last[-36:-32], 'big')
+            self._n = (self._nblocks - 1) * BLOCK_RECORDS + count
+        else:
+            self._map = None
+
+    def __enter__(self) -> 'KeyStore':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __len__(self) -> int:
+        return self._n
+
+    def _block(self, b: int) -> bytes:
+        offset = len(MAGIC) + b * BLOCK_SIZE
+        return self._map[offset:offset + BLOCK_SIZE]
+
+    def _verify_block(self, b: int) -> bool:
+        block = self._block(b)
+        return sha256(block[:-32]).digest() == block[-32:]
+
+    def verify(self) -> List[int]:
+        """Return the indexes of the corrupted blocks"""
+
+        return [b for b in range(self._nblocks) if not self._verify_block(b)]
+
+    def _record(self, i: int) -> bytes:
+        if not 0 <= i < self._n:
+            raise IndexError(f"record index {i} not in [0, {self._n})")
+        b, r = divmod(i, BLOCK_RECORDS)
+        # blocks are verified on first access
+        if b not in self._verified:
+            if not self._verify_block(b):
+                raise ValueError(f"corrupted key store block {b}")
+            self._verified.add(b)
+        offset = len(MAGIC) + b * BLOCK_SIZE + r * RECORD_SIZE
+        return self._map[offset:offset + RECORD_SIZE]
+
+    def __getitem__(self, i: int) -> KeyRecord:
+        record = self._record(i)
+        depth = record[0]
+        path = [int.from_bytes(record[1+4*j:5+4*j], 'big')
+                for j in range(depth)]
+        pubkey = record[33:66]
+        prvkey = None
+        if record[86]:
+            if self._key is None:
+                raise ValueError("missing key store key")
+            prv = _xor(record[87:119], _pad(self._key, pubkey))
+            prvkey = int.from_bytes(prv, 'big')
+            # the one-time pad cannot fail: check the decrypted key
+            if not 0 < prvkey < ec.n or _pubkey(prvkey) != pubkey:
+                raise ValueError("wrong key store key")
+        return KeyRecord(path, pubkey, record[66:86], prvkey)
+
+    def h160(self, i: int) -> bytes:
+        """hash160 of the i-th record, without any decryption"""
+
+        return self._record(i)[66:86]
+
+    def pubkey(self, i: int) -> bytes:
+        return self._record(i)[33:66]
+
+    def _encode(self, path: Sequence[int], pubkey: bytes,
+                prvkey: Optional[int]) -> bytes:
+        if len(path) > MAX_DEPTH:
+            raise ValueError(f"path depth ({len(path)}) > {MAX_DEPTH}")
+        if len(pubkey) != 33 or pubkey[0] not in (2, 3):
+            raise ValueError("not a compressed public key")
+        record = bytes([len(path)])
+        record += b''.join(i.to_bytes(4, 'big') for i in path)
+        record += b'\x00' * 4 * (MAX_DEPTH - len(path))
+        record += pubkey + h160(pubkey)
+        if prvkey is None:
+            record += b'\x00' * 33
+        else:
+            if self._key is None:
+                raise ValueError("missing key store key")
+            if not 0 < prvkey < ec.n:
+                raise ValueError(f"private key {hex(prvkey)} not in [1, n-1]")
+            prv = prvkey.to_bytes(32, 'big')
+            record += b'\x01' + _xor(prv, _pad(self._key, pubkey))
+        return record
+
+    def extend(self, records: Sequence[KeyRecord]) -> None:
+        """Append records; their hash160 is recomputed from the pubkey"""
+
+        encoded = [self._encode(r.path, r.pubkey, r.prvkey) for r in records]
+        if not encoded:
+            return
+
+        # refill the last (partial) block, then add new blocks
+        b, count = divmod(self._n, BLOCK_RECORDS)
+        old: List[bytes] = list()
+        if count:
+            # a new checksum must not hide a corrupted block
+            if not self._verify_block(b):
+                raise ValueError(f"corrupted key store block {b}")
+            block = self._block(b)
+            old = [block[r*RECORD_SIZE:(r+1)*RECORD_SIZE]
+                   for r in range(count)]
+        pending = old + encoded
+        self._journal()
+        # the file is not written while it is memory-mapped
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.seek(len(MAGIC) + b * BLOCK_SIZE)
+        for start in range(0, len(pending), BLOCK_RECORDS):
+            chunk = pending[start:start + BLOCK_RECORDS]
+            data = b''.join(chunk)
+            data += b'\x00' * RECORD_SIZE * (BLOCK_RECORDS - len(chunk))
+            data += len(chunk).to_bytes(4, 'big')
+            self._file.write(data + sha256(data).digest())
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        os.remove(self.filename + JOURNAL_SUFFIX)
+        self._verified.discard(b)
+        self._remap()
+
+    def append(self, path: Sequence[int], pubkey: bytes,
+               prvkey: Optional[int] = None) -> None:
+        self.extend([KeyRecord(path, pubkey, b'', prvkey)])
+
+    def append_range(self,
+                     xkey: Union[octets, ExtendedKey],
+                     path: Sequence[int],
+                     start: int,
+                     count: int) -> None:
+        """Derive and append the children [start, start+count) of xkey
+
+           path is the derivation path of xkey, used as records path prefix;
+           private keys are stored only for private extended keys.
+        """
+
+        if not isinstance(xkey, ExtendedKey):
+            xkey = ExtendedKey.from_xkey(xkey)
+        path = list(path)
+        records: List[KeyRecord] = list()
+        if xkey.is_private:
+            for i in range(start, start + count):
+                child = ckd(xkey, i)
+                records.append(KeyRecord(path + [i], child.pubkey, b'',
+                                         child.prvkey))
+        else:
+            pubkeys = derive_range(xkey, start, count)
+            for i, pubkey in enumerate(pubkeys, start):
+                records.append(KeyRecord(path + [i], pubkey, b'', None))
+        self.extend(records)
@@ -10,11 +10,20 @@
 
 """
 Mnemonic class for converting entropy into a mnemonic sentence
+
+When a wordlist is loaded, a word to index dictionary and a 4-letter
+prefix to index dictionary are built, so that lookups are O(1);
+a combined word to (language, index) map allows language detection.
 """
 
 import math
 import os
-from typing import Union, List
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future, wait, \
+    FIRST_COMPLETED
+from itertools import repeat, zip_longest
+from typing import Union, List, Dict, Tuple, Optional, Callable, Iterable, \
+    Iterator, Deque
 
 from btclib.entropy import Entropy
 
@@ -45,6 +54,11 @@ class Mnemonic:
         self._dictionary = dict(zip(self.languages, values))
         self._bits_per_word = dict(zip(self.languages, values))
         self._language_length = dict(zip(self.languages, values))
+        # word -> index and 4-letter prefix -> index, per language
+        self._word_index: Dict[str, Dict[str, int]] = dict()
+        self._prefix_index: Dict[str, Dict[str, int]] = dict()
+        # word -> [(language, index), ...] for all loaded languages
+        self._words: Dict[str, List[Tuple[str, int]]] = dict()
 
     def _load_lang(self, lang: str, filename: str = None) -> None:
         """ Load the language worlidst if it has not been loaded yet """
@@ -69,6 +83,11 @@ class Mnemonic:
             # http://www.graphics.stanford.edu/~seander/bithacks.html
             # Determining if an integer is a power of 2
             if nwords & (nwords - 1) != 0:
+                if filename is not None:
+                    # do not leave an unloadable language registered
+                    self.languages.remove(lang)
+                    del self.language_files[lang], self._dictionary[lang]
+                    del self._bits_per_word[lang], self._language_length[lang]
                 errMsg = f"dictionary length ({nwords}) must be a power of two"
                 raise ValueError(errMsg)
 
@@ -77,6 +96,17 @@ class Mnemonic:
             # clean up and normalization are missing, but removal of \n
             self._dictionary[lang] = [line[:-1] for line in lines]
 
+            words = self._dictionary[lang]
+            self._word_index[lang] = {w: i for i, w in enumerate(words)}
+            prefixes: Dict[str, int] = dict()
+            for i, w in enumerate(words):
+                # ambiguous prefixes are marked with -1
+                prefixes[w[:4]] = -1 if w[:4] in prefixes else i
+            self._prefix_index[lang] = {p: i for p, i in prefixes.items()
+                                        if i != -1}
+            for i, w in enumerate(words):
+                self._words.setdefault(w, []).append((lang, i))
+
     def bits_per_word(self, lang: str) -> int:
         self._load_lang(lang)
         return self._bits_per_word[lang]
@@ -124,13 +154,48 @@ class Mnemonic:
             words.append(word)
         return ' '.join(words)
 
-    def indexes_from_mnemonic(self, mnemonic: str, lang: str) -> List[int]:
+    def indexes_from_mnemonic(self, mnemonic: str,
+                              lang: Optional[str] = None) -> List[int]:
+        """Word indexes of the mnemonic; lang is detected if not given"""
+
+        if lang is None:
+            lang = self.detect_language(mnemonic)
+        self._load_lang(lang)
+
+        word_index = self._word_index[lang]
+        try:
+            return [word_index[w] for w in mnemonic.split()]
+        except KeyError as e:
+            raise ValueError(f"{e} is not in the '{lang}' word list")
+
+    def index_from_prefix(self, prefix: str, lang: str) -> int:
+        """Index of the word uniquely identified by its first 4 letters"""
+
         self._load_lang(lang)
+        i = self._prefix_index[lang].get(prefix[:4])
+        if i is None or not self._dictionary[lang][i].startswith(prefix):
+            raise ValueError(f"'{prefix}' is not a '{lang}' word prefix")
+        return i
+
+    def detect_language(self, mnemonic: str) -> str:
+        """Return the first language whose word list has all the words
+
+           Languages are checked in self.languages order.
+        """
 
+        for lang in self.languages:
+            self._load_lang(lang)
         words = mnemonic.split()
-        dictionary = self._dictionary[lang]
-        indexes = [dictionary.index(w) for w in words]
-        return indexes
+        if not words:
+            raise ValueError("empty mnemonic")
+        # only the languages having the first word are candidates
+        candidates = set(lang for lang, _ in self._words.get(words[0], ()))
+        for lang in self.languages:
+            if lang in candidates:
+                word_index = self._word_index[lang]
+                if all(w in word_index for w in words):
+                    return lang
+        raise ValueError("unknown mnemonic language")
 
     def entropy_from_indexes(self, indexes: List[int], lang: str) -> Entropy:
         self._load_lang(lang)
@@ -151,3 +216,70 @@ class Mnemonic:
 
 
 mnemonic_dict = Mnemonic()
+
+
+def _pairs(mnemonics: Iterable[str],
+           passphrases: Iterable[str]) -> Iterator[Tuple[str, str]]:
+    # zip, raising ValueError (instead of truncating) on different lengths
+    missing = object()
+    for mnemonic, passphrase in zip_longest(mnemonics, passphrases,
+                                            fillvalue=missing):
+        if mnemonic is missing or passphrase is missing:
+            raise ValueError("different numbers of mnemonics and passphrases")
+        yield mnemonic, passphrase
+
+
+def _seeds_from_mnemonics(seed_from_mnemonic: Callable[[str, str], bytes],
+                          mnemonics: Iterable[str],
+                          passphrases: Union[str, Iterable[str]],
+                          workers: Optional[int],
+                          ordered: bool) -> Iterator:
+    # hashlib.pbkdf2_hmac releases the GIL, so derivations in different
+    # threads are not serialized by it.
+    # At most 4*workers seeds are in flight, so that mnemonics can be
+    # a (long) stream.
+
+    if isinstance(passphrases, str):
+        items = enumerate(zip(mnemonics, repeat(passphrases)))
+    else:
+        items = enumerate(_pairs(mnemonics, passphrases))
+    if workers is not None and workers < 1:
+        raise ValueError(f"invalid number of workers ({workers})")
+    if workers == 1:
+        for i, (mnemonic, passphrase) in items:
+            seed = seed_from_mnemonic(mnemonic, passphrase)
+            yield seed if ordered else (i, seed)
+        return
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    with ThreadPoolExecutor(workers) as executor:
+        window = 4 * workers
+        futures: Dict[Future, int] = dict()
+
+        def submit() -> bool:
+            for i, (mnemonic, passphrase) in items:
+                f = executor.submit(seed_from_mnemonic, mnemonic, passphrase)
+                futures[f] = i
+                if ordered:
+                    pending.append(f)
+                return True
+            return False
+
+        pending: Deque[Future] = deque()
+        while len(futures) < window and submit():
+            pass
+        if ordered:
+            while pending:
+                f = pending.popleft()
+                seed = f.result()
+                del futures[f]
+                submit()
+                yield seed
+        else:
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for f in done:
+                    i = futures.pop(f)
+                    submit()
+                    yield i, f.result()
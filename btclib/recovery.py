@@ -0,0 +1,603 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2019 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"""Recovery of BIP39 mnemonics and passphrases
+
+   MnemonicRecovery searches the missing or misspelled words of a BIP39
+   mnemonic, PassphraseRecovery the passphrase of a BIP39 or electrum
+   mnemonic; in both cases a known address or extended key is required.
+
+   The mnemonic template has a '?' for each missing word, while a word
+   not in the word list is treated as misspelled: its candidates are the
+   words within a small edit distance (and the word sharing its first
+   four letters, if any).
+
+   Candidates are enumerated as integer entropies and first filtered by
+   the (cheap) BIP39 checksum, so that only about 1 in 2^(words/3) of
+   them reaches the expensive stage: PBKDF2 seed, BIP32 derivation and
+   comparison with the known address or extended key.
+   If the last word is missing, its checksum bits are computed instead of
+   searched, so that no candidate is wasted.
+
+   BIP32 derivation is private-key only along hardened steps: public keys
+   are computed (with fixed-base multiplication) only when needed, and
+   the chain code is compared before the key when the target is an
+   extended key.
+
+   Candidate passphrases are streamed from word lists, mutated by simple
+   rules and deduplicated, then checked in batches.
+
+   The candidate space is split in shards, processed by a pool of worker
+   processes; the number of completed candidates can be checkpointed to
+   a JSON file, so that an interrupted search can be resumed.
+   The known secrets (mnemonic template, passphrase, or mnemonic) are
+   not stored in the checkpoint: only their salted PBKDF2 hash is,
+   to check that the checkpoint belongs to the same recovery.
+"""
+
+import hmac
+import json
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from hashlib import sha256, sha512, pbkdf2_hmac
+from hmac import HMAC
+from itertools import islice, tee
+from typing import Optional, Tuple, List, Callable, Iterator, \
+    Sequence, Union, Iterable, Dict
+
+from btclib import base58, bech32, bip32, bip39, electrum
+from btclib.bip39 import _allowed_raw_entr_bits
+from btclib.curve import _aff_from_jac_batch
+from btclib.curves import secp256k1 as ec
+from btclib.keygen import _mult_base_jac, _pubkey
+from btclib.mnemonic import mnemonic_dict
+from btclib.utils import h160, imap, load_checkpoint, save_checkpoint
+
+# ('xkey', indexes, chain code, pubkey) or ('h160', indexes, h160, gap)
+Target = Tuple
+# (start, stop) of a shard of the candidate space
+Shard = Tuple[int, int]
+Template = Union[str, Sequence[Union[str, Sequence[str]]]]
+
+# PBKDF2 iterations of the checkpoint hash of the secrets
+_KDF_ITERATIONS = 100000
+
+
+def _derive(seed: bytes, indexes: Sequence[bytes]) -> Tuple[int, bytes]:
+    """Private key and chain code at path, from the BIP32 seed"""
+
+    h = HMAC(b"Bitcoin seed", seed, sha512).digest()
+    k = int.from_bytes(h[:32], 'big')
+    chain_code = h[32:]
+    for index in indexes:
+        if index[0] >= 0x80:
+            data = b'\x00' + k.to_bytes(32, 'big') + index
+        else:
+            data = _pubkey(k) + index
+        h = HMAC(chain_code, data, sha512).digest()
+        k = (k + int.from_bytes(h[:32], 'big')) % ec.n
+        chain_code = h[32:]
+    return k, chain_code
+
+
+def _match(seed: bytes, target: Target) -> bool:
+    """Check the BIP32 seed against the target"""
+
+    kind, indexes, value, extra = target
+    k, chain_code = _derive(seed, indexes)
+    if kind == 'xkey':
+        return chain_code == value and _pubkey(k) == extra
+    # normal children [0, gap) of the chain key: one batch inversion
+    parent = _pubkey(k)
+    ChildrenJ = list()
+    for i in range(extra):
+        h = HMAC(chain_code, parent + i.to_bytes(4, 'big'), sha512).digest()
+        child = (k + int.from_bytes(h[:32], 'big')) % ec.n
+        ChildrenJ.append(_mult_base_jac(child))
+    for x, y in _aff_from_jac_batch(ec, ChildrenJ):
+        if h160(bytes([2 + (y & 1)]) + x.to_bytes(32, 'big')) == value:
+            return True
+    return False
+
+
+def _parse_target(target: Union[str, bytes],
+                  path: Optional[str] = None,
+                  gap: int = 20,
+                  eversion: Optional[str] = None) -> Target:
+    """Parse an address (P2PKH or P2WPKH) or an extended key target
+
+       Without path, the BIP44 (P2PKH, xpub) or BIP84 (P2WPKH, zpub)
+       first account is assumed: its external chain for addresses,
+       the account itself for extended keys at depth 3;
+       a master extended key is compared with the master key.
+       For an electrum mnemonic version (eversion), the account is
+       m ('standard') or m/0' ('segwit') instead.
+    """
+
+    if isinstance(target, str):
+        target = target.encode()
+    target = target.strip()
+    if gap < 1:
+        raise ValueError(f"invalid address gap ({gap})")
+    electrum_account = "m/0'" if eversion == 'segwit' else 'm'
+
+    if target[:3].lower() in (b'bc1', b'tb1'):
+        wver, wprog = bech32.witness_from_address(target)
+        if wver != 0 or len(wprog) != 20:
+            raise ValueError("segwit target is not a P2WPKH address")
+        coin = 0 if target[:2].lower() == b'bc' else 1
+        default = f"m/84'/{coin}'/0'/0"
+        if eversion is not None:
+            default = electrum_account + '/0'
+        kind, value, extra = 'h160', wprog, gap
+    else:
+        payload = base58.decode_check(target)
+        if len(payload) == 21:
+            if payload[:1] not in bip32.ADDRESS:
+                raise ValueError("target is not a P2PKH address")
+            coin = bip32.ADDRESS.index(payload[:1])
+            default = f"m/44'/{coin}'/0'/0"
+            if eversion is not None:
+                default = electrum_account + '/0'
+            kind, value, extra = 'h160', payload[1:], gap
+        elif len(payload) == 78:
+            xkey = bip32.ExtendedKey(payload[:4], payload[4], payload[5:9],
+                                     payload[9:13], payload[13:45],
+                                     payload[45:])
+            if xkey.version in bip32.PUB:
+                i = bip32.PUB.index(xkey.version)
+            elif xkey.version in bip32.PRV:
+                i = bip32.PRV.index(xkey.version)
+            else:
+                raise ValueError("invalid extended key version")
+            if xkey.depth == 0:
+                default = 'm'
+            elif xkey.depth == 3 and xkey.index[0] >= 0x80:
+                purpose = 84 if i == 2 else 44
+                coin = 1 if i == 1 else 0
+                account = int.from_bytes(xkey.index, 'big') - 0x80000000
+                default = f"m/{purpose}'/{coin}'/{account}'"
+            else:
+                default = None
+            if eversion is not None:
+                depth = electrum_account.count('/')
+                default = electrum_account if xkey.depth == depth else None
+            if path is not None and path.count('/') != xkey.depth:
+                m = f"path depth ({path.count('/')}) != "
+                m += f"extended key depth ({xkey.depth})"
+                raise ValueError(m)
+            kind, value, extra = 'xkey', xkey.chain_code, xkey.pubkey
+        else:
+            raise ValueError(f"invalid target size ({len(payload)})")
+
+    if path is None:
+        if default is None:
+            raise ValueError("derivation path required for this target")
+        path = default
+    absolute, indexes = bip32._indexes_from_path(path)
+    if not absolute:
+        raise ValueError(f"derivation path must be absolute: {path}")
+    return kind, indexes, value, extra
+
+
+def _distance(a: str, b: str) -> int:
+    # Levenshtein edit distance
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+def word_candidates(word: str, lang: str = 'en',
+                    max_distance: int = 1) -> List[str]:
+    """Word list words that could be meant by a (misspelled) word
+
+       A word list word is returned as the only candidate; otherwise
+       the candidates are the words within max_distance edits, plus the
+       word uniquely identified by the first four letters (if any).
+    """
+
+    words = mnemonic_dict.word_list(lang)
+    word_index = mnemonic_dict._word_index[lang]
+    if word in word_index:
+        return [word]
+    candidates = set(w for w in words
+                     if abs(len(w) - len(word)) <= max_distance and
+                     _distance(word, w) <= max_distance)
+    i = mnemonic_dict._prefix_index[lang].get(word[:4])
+    if i is not None and len(word) >= 4:
+        candidates.add(words[i])
+    return sorted(candidates, key=word_index.__getitem__)
+
+
+def _shard_mnemonics(task) -> Tuple[Optional[str], int]:
+    (nwords, base, slots, derive_last, lang,
+     start, stop, passphrase, target) = task
+    words = mnemonic_dict.word_list(lang)
+    checksum_bits = nwords // 3
+    mask = (1 << checksum_bits) - 1
+    cs_shift = 8 - checksum_bits
+    raw_size = (nwords * 11 - checksum_bits) // 8
+
+    # mixed-radix digits of start, the last slot varying fastest
+    radixes = [len(values) for _, values in slots]
+    digits = [0] * len(slots)
+    n = start
+    for j in reversed(range(len(slots))):
+        n, digits[j] = divmod(n, radixes[j])
+
+    survivors = 0
+    for _ in range(start, stop):
+        entropy = base
+        for (shift, values), d in zip(slots, digits):
+            entropy |= values[d] << shift
+        # next candidate
+        j = len(digits) - 1
+        while j >= 0:
+            digits[j] += 1
+            if digits[j] < radixes[j]:
+                break
+            digits[j] = 0
+            j -= 1
+
+        raw_entr = (entropy >> checksum_bits).to_bytes(raw_size, 'big')
+        checksum = sha256(raw_entr).digest()[0] >> cs_shift
+        if derive_last:
+            entropy |= checksum
+        elif entropy & mask != checksum:
+            continue
+
+        survivors += 1
+        mnemonic = ' '.join(words[(entropy >> 11 * i) & 0x7FF]
+                            for i in reversed(range(nwords)))
+        if _match(bip39.seed_from_mnemonic(mnemonic, passphrase), target):
+            return mnemonic, survivors
+    return None, survivors
+
+
+class _Recovery(ABC):
+    """Sharded search loop with checkpoints, shared by the recoveries
+
+       Subclasses provide _params (identifying the search in the
+       checkpoint), _secret (the secrets of the search, only stored as
+       a salted hash), _tasks yielding ((start, stop), task) in order,
+       and _worker, a module level function returning (found, survivors).
+    """
+
+    _worker: Callable[[tuple], Tuple[Optional[str], int]]
+
+    def __init__(self, checkpoint: Optional[str]) -> None:
+        self.checkpoint = checkpoint
+        self.done = 0       # enumerated candidates, including resumed ones
+        self.survivors = 0  # candidates that reached the seed derivation
+        self.rate = 0.0     # candidates per second in the current run
+        self._salt = os.urandom(16)
+        self._digest: Optional[str] = None
+        if checkpoint is not None:
+            state = load_checkpoint(checkpoint, self._params())
+            if state is not None:
+                self._salt = bytes.fromhex(state['salt'])
+                if not hmac.compare_digest(state['secret'],
+                                           self._secret_digest()):
+                    raise ValueError("checkpoint of a different recovery")
+                self.done = state['done']
+                self.survivors = state['survivors']
+
+    @abstractmethod
+    def _params(self) -> dict:
+        pass
+
+    @abstractmethod
+    def _secret(self) -> str:
+        pass
+
+    def _secret_digest(self) -> str:
+        if self._digest is None:
+            digest = pbkdf2_hmac('sha256', self._secret().encode(),
+                                 self._salt, _KDF_ITERATIONS)
+            self._digest = digest.hex()
+        return self._digest
+
+    @abstractmethod
+    def _tasks(self) -> Iterator[Tuple[Shard, tuple]]:
+        pass
+
+    def save(self) -> None:
+        """Atomically write the search progress to the checkpoint file"""
+
+        if self.checkpoint is None:
+            return
+        state = {'salt': self._salt.hex(), 'secret': self._secret_digest(),
+                 'done': self.done, 'survivors': self.survivors}
+        save_checkpoint(self.checkpoint, self._params(), state)
+
+    def search(self,
+               processes: Optional[int] = None,
+               max_candidates: Optional[int] = None,
+               callback: Optional[Callable[['_Recovery'], None]] = None,
+               checkpoint_interval: float = 60.0) -> Optional[str]:
+        """Return the recovered secret, None if not found
+
+           Shards are completed (and checkpointed) in order; the search
+           stops after (at least) max_candidates candidates enumerated
+           in this run, if max_candidates is given.
+           callback (if any) is called after each shard, e.g. to report
+           the progress and the candidates-per-second rate.
+        """
+
+        # the shard of each task, in submission order
+        shards, tasks = tee(self._tasks())
+        results = imap(self._worker, (task for _, task in tasks), processes)
+        t0 = last_save = time.time()
+        checked = 0
+        try:
+            for (shard, _), (found, survivors) in zip(shards, results):
+                start, stop = shard
+                self.done = stop
+                self.survivors += survivors
+                checked += stop - start
+                elapsed = time.time() - t0
+                self.rate = checked / elapsed if elapsed else 0.0
+                if callback is not None:
+                    callback(self)
+                if found is not None:
+                    self.save()
+                    return found
+                if max_candidates is not None and checked >= max_candidates:
+                    break
+                if time.time() - last_save >= checkpoint_interval:
+                    self.save()
+                    last_save = time.time()
+        finally:
+            results.close()
+        self.save()
+        return None
+
+
+class MnemonicRecovery(_Recovery):
+    """Sharded search of the missing/misspelled words of a BIP39 mnemonic
+
+       template is a mnemonic string, or a sequence of words, where each
+       word can be '?' (missing), a misspelled word, or an explicit
+       sequence of candidate words.
+       target is a known P2PKH/P2WPKH address or extended key, see
+       _parse_target for the default derivation paths; gap is the number
+       of addresses checked along the chain.
+    """
+
+    _worker = staticmethod(_shard_mnemonics)
+
+    def __init__(self,
+                 template: Template,
+                 target: Union[str, bytes],
+                 path: Optional[str] = None,
+                 gap: int = 20,
+                 passphrase: str = '',
+                 lang: str = 'en',
+                 max_distance: int = 1,
+                 shard_size: int = 4096,
+                 checkpoint: Optional[str] = None) -> None:
+        if isinstance(template, str):
+            template = template.split()
+        nwords = len(template)
+        if nwords % 3 or (nwords * 11 * 32) // 33 not in _allowed_raw_entr_bits:
+            raise ValueError(f"invalid number of mnemonic words ({nwords})")
+        if shard_size < 1:
+            raise ValueError(f"invalid shard size ({shard_size})")
+
+        words = mnemonic_dict.word_list(lang)
+        word_index = mnemonic_dict._word_index[lang]
+        self.nwords = nwords
+        self.base = 0
+        self.slots: List[Tuple[int, List[int]]] = list()
+        self.derive_last = False
+        self._template: List[Union[str, List[str]]] = list()
+        for pos, word in enumerate(template):
+            shift = 11 * (nwords - 1 - pos)
+            if word == '?':
+                candidates = words
+            elif isinstance(word, str):
+                candidates = word_candidates(word, lang, max_distance)
+                if not candidates:
+                    raise ValueError(f"no candidates for '{word}'")
+            else:
+                candidates = list(word)
+                if any(w not in word_index for w in candidates):
+                    raise ValueError(f"unknown candidate words in {candidates}")
+            self._template.append(word if isinstance(word, str)
+                                  else candidates)
+            if len(candidates) == 1:
+                self.base |= word_index[candidates[0]] << shift
+            elif word == '?' and pos == nwords - 1:
+                # the checksum bits are computed, not searched
+                self.derive_last = True
+                checksum_bits = nwords // 3
+                values = list(range(1 << (11 - checksum_bits)))
+                self.slots.append((checksum_bits, values))
+            else:
+                values = [word_index[w] for w in candidates]
+                self.slots.append((shift, values))
+
+        self.lang = lang
+        self.passphrase = passphrase
+        self.target = _parse_target(target, path, gap)
+        self._target_params = [target if isinstance(target, str)
+                               else target.decode(), path, gap]
+        self.shard_size = shard_size
+
+        self.total = 1    # candidates to be enumerated
+        for _, values in self.slots:
+            self.total *= len(values)
+        super().__init__(checkpoint)
+
+    def _params(self) -> dict:
+        return {'recovery': 'mnemonic', 'lang': self.lang,
+                'target': self._target_params, 'total': self.total}
+
+    def _secret(self) -> str:
+        return json.dumps([self._template, self.passphrase])
+
+    def _tasks(self) -> Iterator[Tuple[Shard, tuple]]:
+        for start in range(self.done, self.total, self.shard_size):
+            stop = min(start + self.shard_size, self.total)
+            yield (start, stop), (self.nwords, self.base, self.slots,
+                                  self.derive_last, self.lang, start, stop,
+                                  self.passphrase, self.target)
+
+
+RULES = ('case', 'leet', 'digits', 'symbols')
+_LEET = str.maketrans('aeiost', '431057')
+_SYMBOLS = '!@#$%&*?.'
+
+
+def _check_rules(rules: Sequence[str]) -> None:
+    for rule in rules:
+        if rule not in RULES:
+            raise ValueError(f"unknown mutation rule ({rule})")
+
+
+def passphrase_candidates(words: Iterable[str],
+                          rules: Sequence[str] = (),
+                          dedup_size: int = 1 << 20) -> Iterator[str]:
+    """Deduplicated candidate passphrases: the words and their mutations
+
+       rules is a subset of RULES: 'case' adds the lower, upper and
+       capitalized variants, 'leet' the a->4, e->3, i->1, o->0, s->5, t->7
+       variants; 'digits' (0-9, 00-99) and 'symbols' (one of !@#$%&*?.)
+       add suffixed variants.
+       Trailing newlines are removed, so that an open word list file can
+       be used as words.
+       Only the last dedup_size distinct candidates (about 100 bytes each)
+       are remembered for deduplication: older duplicates are yielded
+       again, which only wastes their check.
+    """
+
+    _check_rules(rules)
+    if dedup_size < 1:
+        raise ValueError(f"invalid deduplication size ({dedup_size})")
+    suffixes = ['']
+    if 'digits' in rules:
+        suffixes += [str(i) for i in range(10)]
+        suffixes += [f'{i:02}' for i in range(100)]
+    if 'symbols' in rules:
+        suffixes += list(_SYMBOLS)
+    seen: Dict[str, None] = OrderedDict()
+    for word in words:
+        word = word.rstrip('\r\n')
+        variants = [word]
+        if 'case' in rules:
+            variants += [word.lower(), word.upper(), word.capitalize()]
+        if 'leet' in rules:
+            variants += [v.translate(_LEET) for v in variants]
+        for variant in variants:
+            for suffix in suffixes:
+                candidate = variant + suffix
+                if candidate not in seen:
+                    seen[candidate] = None
+                    if len(seen) > dedup_size:
+                        seen.popitem(last=False)
+                    yield candidate
+
+
+def _electrum_version(mnemonic: str) -> str:
+    s = hmac.new(b"Seed version", mnemonic.encode(), sha512).hexdigest()
+    for eversion in ('standard', 'segwit'):
+        if s.startswith(electrum.ELECTRUM_MNEMONIC_VERSIONS[eversion]):
+            return eversion
+    raise ValueError(f"unmanaged electrum mnemonic version ({s[:3]})")
+
+
+def _batch_passphrases(task) -> Tuple[Optional[str], int]:
+    scheme, mnemonic, passphrases, target = task
+    if scheme == 'bip39':
+        seed_from_mnemonic = bip39.seed_from_mnemonic
+    else:
+        seed_from_mnemonic = electrum.seed_from_mnemonic
+    for i, passphrase in enumerate(passphrases):
+        if _match(seed_from_mnemonic(mnemonic, passphrase), target):
+            return passphrase, i + 1
+    return None, len(passphrases)
+
+
+class PassphraseRecovery(_Recovery):
+    """Parallel search of the passphrase of a BIP39/electrum mnemonic
+
+       Candidates are the passphrase_candidates of words and rules,
+       checked in batches of batch_size by the worker processes.
+       On resume, the first done candidates are generated again and
+       skipped: words must be the same, in the same order (and a
+       re-iterable sequence or file, if search is called again).
+       target, path and gap are as in MnemonicRecovery; electrum
+       default paths depend on the mnemonic version.
+    """
+
+    _worker = staticmethod(_batch_passphrases)
+
+    def __init__(self,
+                 mnemonic: str,
+                 target: Union[str, bytes],
+                 words: Iterable[str],
+                 rules: Sequence[str] = (),
+                 scheme: str = 'bip39',
+                 path: Optional[str] = None,
+                 gap: int = 20,
+                 lang: Optional[str] = None,
+                 batch_size: int = 64,
+                 checkpoint: Optional[str] = None) -> None:
+        mnemonic = ' '.join(mnemonic.split())
+        if scheme == 'bip39':
+            if lang is None:
+                lang = mnemonic_dict.detect_language(mnemonic)
+            # invalid mnemonics are rejected upfront
+            bip39.raw_entropy_from_mnemonic(mnemonic, lang)
+            eversion = None
+        elif scheme == 'electrum':
+            eversion = _electrum_version(mnemonic)
+        else:
+            raise ValueError(f"unknown mnemonic scheme ({scheme})")
+        _check_rules(rules)
+        if batch_size < 1:
+            raise ValueError(f"invalid batch size ({batch_size})")
+
+        self.mnemonic = mnemonic
+        self.scheme = scheme
+        self.words = words
+        self.rules = tuple(rules)
+        self.target = _parse_target(target, path, gap, eversion)
+        self._target_params = [target if isinstance(target, str)
+                               else target.decode(), path, gap]
+        self.batch_size = batch_size
+        super().__init__(checkpoint)
+
+    def _params(self) -> dict:
+        return {'recovery': 'passphrase', 'scheme': self.scheme,
+                'target': self._target_params, 'rules': list(self.rules)}
+
+    def _secret(self) -> str:
+        return self.mnemonic
+
+    def _tasks(self) -> Iterator[Tuple[Shard, tuple]]:
+        candidates = passphrase_candidates(self.words, self.rules)
+        candidates = islice(candidates, self.done, None)
+        start = self.done
+        while True:
+            batch = list(islice(candidates, self.batch_size))
+            if not batch:
+                return
+            stop = start + len(batch)
+            yield (start, stop), (self.scheme, self.mnemonic, batch,
+                                  self.target)
+            start = stop
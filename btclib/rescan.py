@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2019 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"""Watch-only wallet rescan over a stream of output scripts/addresses
+
+   Each input item (one per line in a flat file) can be a Base58 or
+   P2WPKH bech32 address, an hex-encoded P2PKH output script
+   (76a914{h160}88ac), or an hex-encoded P2WPKH output script (0014{h160}).
+   The hash160 set is derived from the account extended public keys and
+   the derivation window of each chain is dynamically extended, so that
+   gap_limit addresses are always available after the last hit.
+   Items are matched in stream order: an item can only match addresses
+   already in the derivation window when it is read.
+"""
+
+from collections import deque
+from typing import Sequence, Optional, Tuple, List, Dict, Iterable, \
+    Iterator, NamedTuple, Deque
+
+from btclib import base58, bech32
+from btclib.bip32 import ExtendedKey, derive_range, ckd
+from btclib.utils import octets, chunks, imap
+
+
+class Match(NamedTuple):
+    """Item matching a derived address"""
+    line: int     # 0-based position in the input stream
+    item: bytes
+    account: int  # position in the xpub list
+    chain: int
+    index: int
+
+
+def h160_from_output(item: octets) -> Optional[bytes]:
+    """Return the hash160 of an address or output script, None if invalid"""
+
+    if isinstance(item, str):
+        item = item.encode()
+    item = item.strip()
+    size = len(item)
+    try:
+        if size == 50 and item[:6] == b'76a914' and item[46:] == b'88ac':
+            return bytes.fromhex(item[6:46].decode())       # P2PKH script
+        if size == 44 and item[:4] == b'0014':
+            return bytes.fromhex(item[4:].decode())         # P2WPKH script
+        if item[:4].lower() in (b'bc1q', b'tb1q'):         # P2WPKH address
+            wver, wprog = bech32.witness_from_address(item)
+            return wprog if len(wprog) == 20 else None
+        payload = base58.decode_check(item, 21)             # address
+        return payload[1:]
+    except Exception:
+        return None
+
+
+def _h160s_from_outputs(items: Sequence[bytes]) -> List[Optional[bytes]]:
+    return [h160_from_output(item) for item in items]
+
+
+class Scanner:
+    """Streaming matcher of output scripts/addresses against xpubs"""
+
+    def __init__(self,
+                 xpubs: Sequence[octets],
+                 chains: Sequence[int] = (0, 1),
+                 gap_limit: int = 20) -> None:
+        if gap_limit < 1:
+            raise ValueError(f"invalid gap limit ({gap_limit})")
+        self.gap_limit = gap_limit
+        self._xchains: Dict[Tuple[int, int], ExtendedKey] = dict()
+        # number of derived addresses per (account, chain)
+        self._derived: Dict[Tuple[int, int], int] = dict()
+        self._h160s: Dict[bytes, Tuple[int, int, int]] = dict()
+        for account, xpub in enumerate(xpubs):
+            xaccount = ExtendedKey.from_xkey(xpub)
+            for chain in chains:
+                self._xchains[(account, chain)] = ckd(xaccount, chain)
+                self._derived[(account, chain)] = 0
+                self._extend(account, chain, gap_limit)
+
+    def _extend(self, account: int, chain: int, n: int) -> None:
+        # derive the (account, chain) window up to n addresses
+        start = self._derived[(account, chain)]
+        if n <= start:
+            return
+        xchain = self._xchains[(account, chain)]
+        h160s = derive_range(xchain, start, n - start, 'h160')
+        for index, h in enumerate(h160s, start):
+            self._h160s[h] = account, chain, index
+        self._derived[(account, chain)] = n
+
+    def __len__(self) -> int:
+        """Number of derived addresses in the current window"""
+        return len(self._h160s)
+
+    def _match(self, line: int, item: bytes,
+               h: Optional[bytes]) -> Optional[Match]:
+        if h is None:
+            return None
+        path = self._h160s.get(h)
+        if path is None:
+            return None
+        account, chain, index = path
+        # hit near the gap limit: extend the derivation window
+        self._extend(account, chain, index + 1 + self.gap_limit)
+        return Match(line, item, account, chain, index)
+
+    def scan(self,
+             items: Iterable[octets],
+             processes: Optional[int] = None,
+             chunk_size: int = 10000) -> Iterator[Match]:
+        """Yield the matches found in a stream of outputs/addresses
+
+           With processes > 1, items are decoded to hash160 in a pool of
+           worker processes, while matching (and window extension) stays
+           in the calling process, preserving the stream order.
+        """
+
+        items = ((i.encode() if isinstance(i, str) else i).strip()
+                 for i in items)
+        if processes is None or processes < 2:
+            for line, item in enumerate(items):
+                match = self._match(line, item, h160_from_output(item))
+                if match is not None:
+                    yield match
+            return
+
+        line = 0
+        # chunks and h160s are both returned in order
+        chunk_list: Deque[List[bytes]] = deque()
+
+        def tracked() -> Iterator[List[bytes]]:
+            for chunk in chunks(items, chunk_size):
+                chunk_list.append(chunk)
+                yield chunk
+
+        for h160s in imap(_h160s_from_outputs, tracked(), processes):
+            chunk = chunk_list.popleft()
+            for item, h in zip(chunk, h160s):
+                match = self._match(line, item, h)
+                if match is not None:
+                    yield match
+                line += 1
+
+    def scan_file(self,
+                  filename: str,
+                  processes: Optional[int] = None,
+                  chunk_size: int = 10000) -> Iterator[Match]:
+        """Yield the matches found in a file with one output per line
+
+           The file is streamed: it is never loaded all at once.
+        """
+
+        with open(filename, 'rb') as f:
+            yield from self.scan(f, processes, chunk_size)
@@ -15,12 +15,15 @@
 
 import heapq
 import random
-from typing import Tuple, Sequence, Optional, Callable, Any
+import time
+from hashlib import sha256
+from typing import Tuple, Sequence, Optional, Callable, Any, List, Dict, Union
 
 from btclib.numbertheory import mod_inv, legendre_symbol
 from btclib.curve import Point, Curve, mult, _mult_jac, double_mult, _double_mult, \
-    _jac_from_aff, _multi_mult
-from btclib.utils import int_from_bits, octets_from_point, octets_from_int
+    _jac_from_aff, _multi_mult, _JacPoint
+from btclib.utils import int_from_bits, octets_from_point, octets_from_int, \
+    int_from_octets
 from btclib.rfc6979 import rfc6979
 
 ECSS = Tuple[int, int]  # Tuple[field element, scalar]
@@ -162,6 +165,141 @@ def _verify(ec: Curve,
     return R[0] == (R[2]*R[2]*r % ec._p)
 
 
+# BIP340 tagged hashes: sha256(sha256(tag) || sha256(tag) || data)
+# the sha256 midstate after the 64-byte tag prefix is computed only once
+# per tag and then copied, saving two compression function evaluations
+_tag_midstates: Dict[str, Any] = dict()
+
+
+def tagged_hash(tag: str, *data: bytes) -> bytes:
+    """BIP340 tagged hash, starting from a cached tag midstate"""
+
+    midstate = _tag_midstates.get(tag)
+    if midstate is None:
+        tag_hash = sha256(tag.encode()).digest()
+        midstate = sha256(tag_hash + tag_hash)
+        _tag_midstates[tag] = midstate
+    h = midstate.copy()
+    for d in data:
+        h.update(d)
+    return h.digest()
+
+
+def _bip340_e(ec: Curve, r: int, x: int, msg: bytes) -> int:
+    # Let e = int(hashBIP0340/challenge(bytes(r) || bytes(P) || m)) mod n.
+    h = tagged_hash("BIP0340/challenge", octets_from_int(r, ec.psize),
+                    octets_from_int(x, ec.psize), msg)
+    return int_from_bits(ec, h)
+
+
+def xonly_pubkey(ec: Curve, d: int) -> int:
+    """Return the x-only public key, i.e. the x-coordinate of dG"""
+
+    if not 0 < d < ec.n:
+        raise ValueError(f"private key {hex(d)} not in [1, n-1]")
+    return mult(ec, d, ec.G)[0]
+
+
+def bip340_sign(ec: Curve,
+                msg: bytes,
+                d: int,
+                aux: bytes = b'\x00' * 32) -> ECSS:
+    """ECSSA signing operation according to BIP340
+
+       Public keys are x-only (the even y-coordinate is implied) and the
+       nonce is derived with a single tagged hash, without the HMAC-DRBG
+       of rfc6979; hash function is sha256.
+
+       https://github.com/bitcoin/bips/blob/master/bip-0340.mediawiki
+    """
+
+    # The message msg: a 32-byte array
+    _ensure_msg_size(sha256, msg)
+    if len(aux) != 32:
+        raise ValueError(f"auxiliary random data of wrong size: {len(aux)}")
+
+    # The secret key d': an integer in the range 1..n-1.
+    if not 0 < d < ec.n:
+        raise ValueError(f"private key {hex(d)} not in [1, n-1]")
+    P = mult(ec, d, ec.G)
+    # Let d = d' if has_even_y(P), otherwise let d = n - d'.
+    if P[1] % 2:
+        d = ec.n - d
+    bPx = octets_from_int(P[0], ec.psize)
+
+    # Let t be the byte-wise xor of bytes(d) and hashBIP0340/aux(a).
+    t = int_from_octets(tagged_hash("BIP0340/aux", aux)) ^ d
+    bt = octets_from_int(t, ec.nsize)
+    # Let rand = hashBIP0340/nonce(t || bytes(P) || m).
+    rand = tagged_hash("BIP0340/nonce", bt, bPx, msg)
+    # Let k' = int(rand) mod n; fail if k' = 0.
+    k = int_from_octets(rand) % ec.n
+    if k == 0:
+        raise ValueError("ephemeral key k = 0, failed to sign")
+
+    # Let R = k'G.
+    RJ = _mult_jac(ec, k, ec.GJ)
+    R = ec._aff_from_jac(RJ)
+    # Let k = k' if has_even_y(R), otherwise let k = n - k'.
+    if R[1] % 2:
+        k = ec.n - k
+
+    e = _bip340_e(ec, R[0], P[0], msg)
+    s = (k + e*d) % ec.n
+    # The signature is bytes(R) || bytes((k + ed) mod n).
+    return R[0], s
+
+
+def bip340_verify(ec: Curve,
+                  msg: bytes,
+                  x: Union[int, bytes],
+                  sig: ECSS) -> bool:
+    """ECSSA verification according to BIP340
+
+       https://github.com/bitcoin/bips/blob/master/bip-0340.mediawiki
+    """
+
+    # try/except wrapper for the Errors raised by _bip340_verify
+    try:
+        return _bip340_verify(ec, msg, x, sig)
+    except Exception:
+        return False
+
+
+def _bip340_verify(ec: Curve,
+                   msg: bytes,
+                   x: Union[int, bytes],
+                   sig: ECSS) -> bool:
+    # This raises Exceptions, while verify should always return True or False
+
+    _ensure_msg_size(sha256, msg)
+
+    # Let P = lift_x(int(pk)); fail if that fails.
+    if isinstance(x, bytes):
+        x = int_from_octets(x)
+    P = x, ec.y_odd(x, 0)
+
+    # Let r = int(sig[0:32]); fail if r ≥ p.
+    # Let s = int(sig[32:64]); fail if s ≥ n.
+    r, s = _to_sig(ec, sig)
+    if not 0 <= r < ec._p:
+        raise ValueError(f"r ({hex(r)}) not in [0, p-1]")
+
+    e = _bip340_e(ec, r, x, msg)
+    # Let R = sG - eP.
+    RJ = _double_mult(ec, s, ec.GJ, -e, (P[0], P[1], 1))
+
+    # Fail if is_infinite(R).
+    if RJ[2] == 0:
+        raise ValueError("sG - eP is infinite")
+    R = ec._aff_from_jac(RJ)
+    # Fail if not has_even_y(R).
+    if R[1] % 2:
+        raise ValueError("(sG - eP).y is odd")
+    # Fail if x(R) ≠ r.
+    return R[0] == r
+
+
 def _pubkey_recovery(ec: Curve,
                      hf: Callable[[Any], Any],
                      e: int,
@@ -243,18 +381,50 @@ def _batch_verify(ec: Curve,
     if batch_size == 1:
         return _verify(ec, hf, ms[0], P[0], sig[0])
 
-    t = 0
-    scalars: Sequence(int) = list()
-    points: Sequence[Point] = list()
-    for i in range(batch_size):
-        r, s = _to_sig(ec, sig[i])
-        _ensure_msg_size(hf, ms[i])
-        ec.require_on_curve(P[i])
-        e = _e(ec, hf, r, P[i], ms[i])
-        # raises an error if y does not exist
-        # no need to check for quadratic residue
-        y = ec.y(r)
+    terms = [_batch_term(ec, hf, ms[i], P[i], sig[i])
+             for i in range(batch_size)]
+    return _batch_check(ec, terms)
+
+
+# (s, e, R, P) with R and P in Jacobian coordinates
+_BatchTerm = Tuple[int, int, _JacPoint, _JacPoint]
+
+
+def _batch_term(ec: Curve,
+                hf: Callable[[Any], Any],
+                m: bytes,
+                P: Point,
+                sig: ECSS) -> _BatchTerm:
+    # validate a single (m, P, sig) entry and compute, once and for all,
+    # what the batch equation needs: raises an error for invalid entries
+
+    r, s = _to_sig(ec, sig)
+    _ensure_msg_size(hf, m)
+    ec.require_on_curve(P)
+    if P[1] == 0:
+        raise ValueError("public key is infinite")
+    e = _e(ec, hf, r, P, m)
+    # raises an error if y does not exist
+    # no need to check for quadratic residue
+    y = ec.y(r)
+    return s, e, (r, y, 1), _jac_from_aff(P)
+
 
+def _batch_check(ec: Curve, terms: Sequence[_BatchTerm]) -> bool:
+    # check the batch equation tG = sum(a_i*R_i + a_i*e_i*P_i)
+    # for already validated terms
+
+    if len(terms) == 1:
+        # Bos-Coster would be inefficient with a = 1:
+        # check R = sG - eP instead
+        s, e, RJ, PJ = terms[0]
+        TJ = _double_mult(ec, s, ec.GJ, -e, PJ)
+        return _jac_equality(ec, TJ, RJ)
+
+    t = 0
+    scalars: List[int] = list()
+    points: List[_JacPoint] = list()
+    for i, (s, e, RJ, PJ) in enumerate(terms):
         # a in [1, n-1]
         # deterministically generated using a CSPRNG seeded by a
         # cryptographic hash (e.g., SHA256) of all inputs of the
@@ -262,18 +432,280 @@ def _batch_verify(ec: Curve,
         # run of the batch verification algorithm
         a = (1 if i == 0 else (1+random.getrandbits(ec.nlen)) % ec.n)
         scalars.append(a)
-        points.append(_jac_from_aff((r, y)))
+        points.append(RJ)
         scalars.append(a * e % ec.n)
-        points.append(_jac_from_aff(P[i]))
+        points.append(PJ)
         t += a * s
 
     TJ = _mult_jac(ec, t, ec.GJ)
     RHSJ = _multi_mult(ec, scalars, points)
+    return _jac_equality(ec, TJ, RHSJ)
 
-    # return T == RHS, checked in Jacobian coordinates
-    RHSZ2 = RHSJ[2] * RHSJ[2]
+
+def _jac_equality(ec: Curve, TJ: _JacPoint, RJ: _JacPoint) -> bool:
+    # return T == R, checked in Jacobian coordinates
+    RZ2 = RJ[2] * RJ[2]
     TZ2 = TJ[2] * TJ[2]
-    if (TJ[0] * RHSZ2)  % ec._p != (RHSJ[0] * TZ2) % ec._p:
+    if (TJ[0] * RZ2) % ec._p != (RJ[0] * TZ2) % ec._p:
         return False
 
-    return (TJ[1] * RHSZ2 * RHSJ[2]) % ec._p == (RHSJ[1] * TZ2 * TJ[2]) % ec._p
+    return (TJ[1] * RZ2 * RJ[2]) % ec._p == (RJ[1] * TZ2 * TJ[2]) % ec._p
+
+
+def batch_verify_detailed(ec: Curve,
+                          hf: Callable[[Any], Any],
+                          ms: Sequence[bytes],
+                          P: Sequence[Point],
+                          sig: Sequence[ECSS]) -> List[int]:
+    """ECSSA batch verification returning the indexes of invalid signatures
+
+       Failing (sub-)batches are recursively bisected until the invalid
+       signatures are isolated; challenges, lifted R points, and validated
+       public keys are computed only once and reused at every level.
+       An empty list is returned if all signatures are valid.
+    """
+
+    # the bitcoin proposed standard is only valid for curves
+    # whose prime p = 3 % 4
+    if not ec.pIsThreeModFour:
+        errmsg = 'curve prime p must be equal to 3 (mod 4)'
+        raise ValueError(errmsg)
+
+    batch_size = len(P)
+    if len(ms) != batch_size:
+        errMsg = f"mismatch between number of pubkeys ({batch_size}) "
+        errMsg += f"and number of messages ({len(ms)})"
+        raise ValueError(errMsg)
+    if len(sig) != batch_size:
+        errMsg = f"mismatch between number of pubkeys ({batch_size}) "
+        errMsg += f"and number of signatures ({len(sig)})"
+        raise ValueError(errMsg)
+
+    invalid: List[int] = list()
+    terms: List[_BatchTerm] = list()
+    indexes: List[int] = list()
+    for i in range(batch_size):
+        try:
+            terms.append(_batch_term(ec, hf, ms[i], P[i], sig[i]))
+            indexes.append(i)
+        except Exception:
+            invalid.append(i)
+
+    if indexes:
+        invalid += _batch_bisect(ec, terms, indexes, 0, len(indexes), False)
+    return sorted(invalid)
+
+
+def _batch_bisect(ec: Curve,
+                  terms: Sequence[_BatchTerm],
+                  indexes: Sequence[int],
+                  start: int,
+                  stop: int,
+                  known_invalid: bool) -> List[int]:
+    # return the indexes of the invalid terms in terms[start:stop];
+    # known_invalid avoids re-checking a sub-batch whose sibling passed
+    # while their parent failed: it must contain an invalid signature
+
+    if not known_invalid and _batch_check(ec, terms[start:stop]):
+        return []
+    if stop - start == 1:
+        return [indexes[start]]
+
+    middle = (start + stop) // 2
+    invalid = _batch_bisect(ec, terms, indexes, start, middle, False)
+    # if the first half is valid, the second half must be invalid
+    invalid += _batch_bisect(ec, terms, indexes, middle, stop, not invalid)
+    return invalid
+
+
+class BatchVerifier:
+    """Incremental ECSSA batch verification accumulator
+
+       Signatures are added one at a time: each add immediately validates
+       the entry, computes its challenge e, lifts r to a point, and
+       accumulates the generator scalar t, so that the final multi scalar
+       multiplication is the only deferred work.
+       The batch is automatically flushed when batch_size entries have been
+       accumulated or, if max_latency is provided, when the oldest pending
+       entry has been waiting for at least max_latency seconds.
+       The latency budget is checked by add and by poll: a stream that
+       stops sending entries should call poll (e.g. from a timer) or
+       finalize, which always flushes.
+       Invalid entries are identified by their (0-based) addition order.
+    """
+
+    def __init__(self,
+                 ec: Curve,
+                 hf: Callable[[Any], Any],
+                 batch_size: int = 64,
+                 max_latency: Optional[float] = None) -> None:
+
+        # the bitcoin proposed standard is only valid for curves
+        # whose prime p = 3 % 4
+        if not ec.pIsThreeModFour:
+            errmsg = 'curve prime p must be equal to 3 (mod 4)'
+            raise ValueError(errmsg)
+        if batch_size < 1:
+            raise ValueError(f"invalid batch size ({batch_size})")
+
+        self.ec = ec
+        self.hf = hf
+        self.batch_size = batch_size
+        self.max_latency = max_latency
+
+        self.count = 0
+        self.invalid: List[int] = list()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._terms: List[_BatchTerm] = list()
+        self._indexes: List[int] = list()
+        self._t = 0
+        self._scalars: List[int] = list()
+        self._points: List[_JacPoint] = list()
+        self._start = 0.0
+
+    def add(self, m: bytes, P: Point, sig: ECSS) -> int:
+        """Add a (message, pubkey, signature) entry, returning its index"""
+
+        i = self.count
+        self.count += 1
+        try:
+            term = _batch_term(self.ec, self.hf, m, P, sig)
+        except Exception:
+            self.invalid.append(i)
+            return i
+
+        if not self._terms:
+            self._start = time.monotonic()
+        s, e, RJ, PJ = term
+        # a in [1, n-1], see _batch_check
+        a = (1 if not self._terms else
+             (1+random.getrandbits(self.ec.nlen)) % self.ec.n)
+        self._scalars.append(a)
+        self._points.append(RJ)
+        self._scalars.append(a * e % self.ec.n)
+        self._points.append(PJ)
+        self._t += a * s
+        self._terms.append(term)
+        self._indexes.append(i)
+
+        if len(self._terms) >= self.batch_size:
+            self.flush()
+        else:
+            self.poll()
+        return i
+
+    def poll(self) -> bool:
+        """Flush if the oldest pending entry exceeded the latency budget
+
+           Return False if the flushed entries are not all valid.
+        """
+
+        if self.max_latency is not None and self._terms:
+            if time.monotonic() - self._start >= self.max_latency:
+                return self.flush()
+        return True
+
+    @property
+    def pending(self) -> int:
+        """Number of entries not verified yet"""
+
+        return len(self._terms)
+
+    def flush(self) -> bool:
+        """Verify the pending entries, returning True if all are valid"""
+
+        terms, indexes = self._terms, self._indexes
+        if not terms:
+            return True
+
+        ec = self.ec
+        if len(terms) == 1:
+            valid = _batch_check(ec, terms)
+        else:
+            TJ = _mult_jac(ec, self._t, ec.GJ)
+            RHSJ = _multi_mult(ec, self._scalars, self._points)
+            valid = _jac_equality(ec, TJ, RHSJ)
+        if not valid:
+            self.invalid += _batch_bisect(ec, terms, indexes,
+                                          0, len(terms), True)
+        self._reset()
+        return valid
+
+    def finalize(self) -> List[int]:
+        """Flush pending entries and return the sorted invalid indexes"""
+
+        self.flush()
+        self.invalid.sort()
+        return self.invalid
+
+
+# compact serialization: r || s, with r as psize and s as nsize
+# big-endian bytes (64 bytes for secp256k1)
+
+def serialize(ec: Curve, sig: ECSS) -> bytes:
+    """Compact fixed-size r||s serialization"""
+
+    r, s = _to_sig(ec, sig)
+    if not 0 <= r < ec._p:
+        raise ValueError(f"r ({hex(r)}) not in [0, p-1]")
+    return r.to_bytes(ec.psize, 'big') + s.to_bytes(ec.nsize, 'big')
+
+
+def deserialize(ec: Curve, data: Union[bytes, bytearray, memoryview]) -> ECSS:
+    """Parse (and check) a compact fixed-size r||s signature"""
+
+    if len(data) != ec.psize + ec.nsize:
+        m = f"compact signature size ({len(data)}) "
+        m += f"must be {ec.psize + ec.nsize}"
+        raise ValueError(m)
+    r = int.from_bytes(data[:ec.psize], 'big')
+    if not r < ec._p:
+        raise ValueError(f"r ({hex(r)}) not in [0, p-1]")
+    return _to_sig(ec, (r, int.from_bytes(data[ec.psize:], 'big')))
+
+
+def serialize_many(ec: Curve, sigs: Sequence[ECSS]) -> bytearray:
+    """Contiguous buffer of compact signatures"""
+
+    psize, nsize = ec.psize, ec.nsize
+    # bulk range check, then search the invalid signature (if any)
+    if sigs and not (min(min(sig) for sig in sigs) >= 0 and
+                     max(sig[0] for sig in sigs) < ec._p and
+                     max(sig[1] for sig in sigs) < ec.n):
+        for i, (r, s) in enumerate(sigs):
+            if not (0 <= r < ec._p and 0 <= s < ec.n):
+                raise ValueError(f"invalid signature {i}")
+    return bytearray(b''.join([r.to_bytes(psize, 'big') +
+                               s.to_bytes(nsize, 'big') for r, s in sigs]))
+
+
+def deserialize_many(ec: Curve,
+                     buf: Union[bytes, bytearray, memoryview]) -> List[ECSS]:
+    """Parse a contiguous buffer of compact signatures
+
+       bytes, bytearray, array, and memoryview buffers are accepted.
+       Scalars are range-checked in bulk: a ValueError reports the
+       index of the first invalid signature.
+    """
+
+    # one copy, then C-level slicing and conversion of all scalars
+    data = bytes(buf)
+    psize = ec.psize
+    size = psize + ec.nsize
+    if len(data) % size:
+        m = f"buffer size ({len(data)}) not a multiple of {size}"
+        raise ValueError(m)
+    count = len(data) // size
+    rs = [data[i:i+psize] for i in range(0, len(data), size)]
+    ss = [data[i:i+ec.nsize] for i in range(psize, len(data), size)]
+    big = ['big'] * count
+    r_ints = list(map(int.from_bytes, rs, big))
+    s_ints = list(map(int.from_bytes, ss, big))
+    # bulk range check, then search the invalid signature (if any)
+    if count and not (max(r_ints) < ec._p and max(s_ints) < ec.n):
+        for i in range(count):
+            if not (r_ints[i] < ec._p and s_ints[i] < ec.n):
+                raise ValueError(f"invalid signature {i}")
+    return list(zip(r_ints, s_ints))
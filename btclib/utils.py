@@ -12,25 +12,161 @@
 Assorted conversion utilities
 """
 
-from typing import Union
+import json
+import os
+from collections import OrderedDict, deque
+from multiprocessing import Pool
+from multiprocessing.pool import AsyncResult
+from threading import Lock
+from typing import Union, Dict, Optional, Hashable, Any, Iterable, \
+    Iterator, List, Callable, Deque
 from hashlib import sha256, new
 
 from btclib.curve import Curve, Point
 
 octets = Union[str, bytes]
+# binary data, possibly accessed without copying it
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+class LRUCache:
+    """Thread-safe bounded LRU cache, with hit/miss statistics
+
+       Entries are grouped in partitions (e.g. one per curve), each with
+       its own size limit; the default limit is maxsize.
+       A size limit equal to zero disables the cache (or the partition).
+    """
+
+    def __init__(self, maxsize: int = 0) -> None:
+        if maxsize < 0:
+            raise ValueError(f"negative cache size ({maxsize})")
+        self.maxsize = maxsize
+        self._maxsizes: Dict[Hashable, int] = dict()
+        self._entries: Dict[Hashable, OrderedDict] = dict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def set_maxsize(self, maxsize: int,
+                    partition: Optional[Hashable] = None) -> None:
+        """Set the default size limit, or the size limit of a partition"""
+
+        if maxsize < 0:
+            raise ValueError(f"negative cache size ({maxsize})")
+        with self._lock:
+            if partition is None:
+                self.maxsize = maxsize
+                partitions = list(self._entries)
+            else:
+                self._maxsizes[partition] = maxsize
+                partitions = [partition] if partition in self._entries else []
+            for p in partitions:
+                self._shrink(p)
+
+    def _maxsize(self, partition: Optional[Hashable]) -> int:
+        return self._maxsizes.get(partition, self.maxsize)
+
+    def _shrink(self, partition: Optional[Hashable]) -> None:
+        # lock is assumed to be held
+        entries = self._entries[partition]
+        maxsize = self._maxsize(partition)
+        while len(entries) > maxsize:
+            entries.popitem(last=False)
+
+    def _get(self, partition: Optional[Hashable], key: Hashable) -> Any:
+        # None if missing
+        with self._lock:
+            entries = self._entries.get(partition)
+            if entries is not None and key in entries:
+                entries.move_to_end(key)
+                self.hits += 1
+                return entries[key]
+            self.misses += 1
+            return None
+
+    def _put(self, partition: Optional[Hashable], key: Hashable,
+             value: Any) -> None:
+        with self._lock:
+            if self._maxsize(partition) == 0:
+                return
+            entries = self._entries.setdefault(partition, OrderedDict())
+            entries[key] = value
+            entries.move_to_end(key)
+            self._shrink(partition)
+
+    def clear(self) -> None:
+        """Empty the cache and reset the statistics"""
+
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(entries) for entries in self._entries.values())
+
+
+class PointCache(LRUCache):
+    """Thread-safe bounded LRU cache of SEC 1 decoded points
+
+       Points are cached per curve, keyed by their octets encoding, to avoid
+       the modular square root (compressed points) or the on-curve check
+       (uncompressed points) when the same public keys are decoded again
+       and again. A maxsize equal to zero disables the cache.
+    """
+
+    def set_maxsize(self, maxsize: int, ec: Optional[Curve] = None) -> None:
+        """Set the default size limit, or the size limit for a given curve"""
+
+        super().set_maxsize(maxsize, ec)
+
+    def curve_maxsize(self, ec: Curve) -> int:
+        return self._maxsize(ec)
+
+    def get(self, ec: Curve, o: bytes) -> Optional[Point]:
+        return self._get(ec, o)
+
+    def put(self, ec: Curve, o: bytes, P: Point) -> None:
+        self._put(ec, o, P)
+
+    def enabled(self, ec: Curve) -> bool:
+        return self._maxsize(ec) > 0
+
+
+# disabled by default: use point_cache.set_maxsize to enable it
+point_cache = PointCache()
 
 
 def point_from_octets(ec: Curve, o: octets) -> Point:
     """Return a tuple (Px, Py) that belongs to the curve
 
        SEC 1 v.2, section 2.3.4
+
+       If point_cache is enabled, the decoded point is looked up first.
     """
     if isinstance(o, str):
         o = bytes.fromhex(o)
 
+    if not point_cache.enabled(ec):
+        return _point_from_octets(ec, o)
+
+    o = bytes(o)
+    P = point_cache.get(ec, o)
+    if P is None:
+        P = _point_from_octets(ec, o)
+        point_cache.put(ec, o, P)
+    return P
+
+
+def _point_from_octets(ec: Curve, o: bytes) -> Point:
     bsize = len(o) # bytes
     if bsize == 1 and o[0] == 0x00:     # infinity point
-        return Point()
+        return ec._validated()
 
     if bsize == ec.psize+1:             # compressed point
         if o[0] not in (0x02, 0x03):
@@ -39,7 +175,7 @@ def point_from_octets(ec: Curve, o: octets) -> Point:
         Px = int.from_bytes(o[1:], 'big')
         try:
             Py = ec.y_odd(Px, o[0] % 2)  # also check Px validity
-            return Point(Px, Py)
+            return ec._validated(Px, Py)
         except:
             raise ValueError("point not on curve")
     else:                               # uncompressed point
@@ -50,9 +186,9 @@ def point_from_octets(ec: Curve, o: octets) -> Point:
         if o[0] != 0x04:
             raise ValueError("not an uncompressed point")
         Px = int.from_bytes(o[1:ec.psize+1], 'big')
-        P = Point(Px, int.from_bytes(o[ec.psize+1:], 'big'))
-        if ec.is_on_curve(P):
-            return P
+        Py = int.from_bytes(o[ec.psize+1:], 'big')
+        if ec.is_on_curve((Px, Py)):
+            return ec._validated(Px, Py)
         else:
             raise ValueError("point not on curve")
 
@@ -136,3 +272,71 @@ def h160(o: octets) -> bytes:
 
 def double_sha256(s: bytes) -> bytes:
     return sha256(sha256(s).digest()).digest()
+
+
+def chunks(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Split items in lists of size elements (the last one may be shorter)"""
+
+    if size < 1:
+        raise ValueError(f"invalid chunk size ({size})")
+    chunk: List[Any] = list()
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = list()
+    if chunk:
+        yield chunk
+
+
+def imap(func: Callable, args: Iterable[Any],
+         processes: Optional[int] = None) -> Iterator[Any]:
+    """Lazily map func over args, in a process pool if processes > 1
+
+       Results are always returned in args order; in a pool, func
+       must be a module level function (or a partial of it) to be pickled.
+       At most 2*processes args are in flight, so that args can be
+       an unbounded stream; closing the iterator terminates the pool.
+    """
+
+    if processes is None or processes < 2:
+        yield from map(func, args)
+        return
+    with Pool(processes) as pool:
+        pending: Deque[AsyncResult] = deque()
+        for arg in args:
+            pending.append(pool.apply_async(func, (arg,)))
+            if len(pending) >= 2 * processes:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+
+def load_checkpoint(filename: str, params: dict) -> Optional[dict]:
+    """Return the state saved in a JSON checkpoint file, if any
+
+       ValueError is raised if the checkpoint was saved with different
+       params, i.e. by a different search.
+    """
+
+    if not os.path.exists(filename):
+        return None
+    with open(filename, 'r') as f:
+        checkpoint = json.load(f)
+    if checkpoint['params'] != params:
+        raise ValueError("checkpoint of a different search")
+    return checkpoint['state']
+
+
+def save_checkpoint(filename: str, params: dict, state: dict) -> None:
+    """Atomically write params and state to a JSON checkpoint file
+
+       The file is created readable and writable by the owner only,
+       as search progress can be secret (e.g. private keys).
+    """
+
+    tmp = filename + '.tmp'
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with open(fd, 'w') as f:
+        json.dump({'params': params, 'state': state}, f)
+    os.replace(tmp, filename)
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2019 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+"""Vanity address search
+
+   Base58 (P2PKH) addresses are searched for a given prefix and/or suffix.
+   Candidate private keys are consecutive integers k, k+1, k+2, ...
+   from random starting points: the public keys are computed walking
+   the curve, i.e. adding G at each step in Jacobian coordinates,
+   and each block of candidates is normalized to affine coordinates
+   with a single (simultaneous) modular inversion.
+   Only the starting point requires a scalar multiplication.
+
+   Each worker process walks its own independent stream; the search
+   progress (the offset reached by each stream) can be checkpointed to
+   a JSON file, so that an interrupted search can be resumed.
+"""
+
+import secrets
+import time
+from itertools import tee
+from typing import Optional, Tuple, List, Callable, Iterator
+
+from btclib import base58
+from btclib.curve import mult, _jac_from_aff, _aff_from_jac_batch
+from btclib.curves import secp256k1 as ec
+from btclib.utils import h160, imap, load_checkpoint, save_checkpoint
+
+# random starting points leave room for 2^64 steps before n
+_MAX_STEPS = 2**64
+
+Task = Tuple[int, int, bytes, bytes, bool, bytes]
+
+
+def _check_pattern(pattern: bytes) -> None:
+    for c in pattern:
+        # raise ValueError for invalid Base58 characters
+        base58.decode_to_int(bytes([c]))
+
+
+def _pubkeys(start: int, count: int, compressed: bool) -> List[bytes]:
+    """Public keys of the private keys in [start, start+count)"""
+
+    GJ = _jac_from_aff(ec.G)
+    PJ = _jac_from_aff(mult(ec, start, ec.G))
+    PointsJ = list()
+    for _ in range(count):
+        PointsJ.append(PJ)
+        PJ = ec._add_jac(PJ, GJ)
+    pubkeys: List[bytes] = list()
+    for x, y in _aff_from_jac_batch(ec, PointsJ):
+        if compressed:
+            pubkeys.append(bytes([2 + (y & 1)]) + x.to_bytes(32, 'big'))
+        else:
+            pubkeys.append(b'\x04' + x.to_bytes(32, 'big') +
+                           y.to_bytes(32, 'big'))
+    return pubkeys
+
+
+def _search_block(task: Task) -> List[Tuple[int, bytes]]:
+    start, count, prefix, suffix, compressed, version = task
+    matches: List[Tuple[int, bytes]] = list()
+    for i, pubkey in enumerate(_pubkeys(start, count, compressed)):
+        address = base58.encode_check(version + h160(pubkey))
+        if address.startswith(prefix) and address.endswith(suffix):
+            matches.append((start + i, address))
+    return matches
+
+
+class VanitySearch:
+    """Multi-stream vanity address search, with checkpoints
+
+       On match, search returns (private key, address); the private key
+       can be exported with wifaddress.wif_from_prvkey(prvkey, compressed).
+
+       The checkpoint file contains the private keys of the streams
+       (starting points and offsets): it is created readable and
+       writable by the owner only, and it must be kept as secret as
+       the found key.
+    """
+
+    def __init__(self,
+                 prefix: str = '',
+                 suffix: str = '',
+                 compressed: bool = True,
+                 version: bytes = b'\x00',
+                 block_size: int = 1024,
+                 checkpoint: Optional[str] = None) -> None:
+        self.prefix = prefix.encode() if isinstance(prefix, str) else prefix
+        self.suffix = suffix.encode() if isinstance(suffix, str) else suffix
+        _check_pattern(self.prefix + self.suffix)
+        if not self.prefix and not self.suffix:
+            raise ValueError("empty vanity pattern")
+        if len(version) != 1:
+            raise ValueError(f"invalid version size ({len(version)})")
+        if version == b'\x00' and self.prefix and self.prefix[:1] != b'1':
+            raise ValueError("mainnet address prefix must start with 1")
+        if block_size < 1:
+            raise ValueError(f"invalid block size ({block_size})")
+        self.compressed = compressed
+        self.version = version
+        self.block_size = block_size
+        self.checkpoint = checkpoint
+
+        # private key starting point and offset reached by each stream
+        self.starts: List[int] = list()
+        self.offsets: List[int] = list()
+        self.keys = 0     # checked keys, including resumed ones
+        self.rate = 0.0   # keys per second in the current run
+        if checkpoint is not None:
+            state = load_checkpoint(checkpoint, self._params())
+            if state is not None:
+                self.starts = state['starts']
+                self.offsets = state['offsets']
+                self.keys = state['keys']
+
+    def _params(self) -> dict:
+        return {'prefix': self.prefix.decode(),
+                'suffix': self.suffix.decode(),
+                'compressed': self.compressed,
+                'version': self.version.hex()}
+
+    def save(self) -> None:
+        """Atomically write the search progress to the checkpoint file"""
+
+        if self.checkpoint is None:
+            return
+        state = {'starts': self.starts, 'offsets': self.offsets,
+                 'keys': self.keys}
+        save_checkpoint(self.checkpoint, self._params(), state)
+
+    def _tasks(self, streams: int) -> Iterator[Tuple[int, Task]]:
+        # round-robin blocks of the streams, each starting where it was
+        while len(self.starts) < streams:
+            self.starts.append(1 + secrets.randbelow(ec.n - 1 - _MAX_STEPS))
+            self.offsets.append(0)
+        next_offsets = self.offsets[:streams]
+        while True:
+            for s in range(streams):
+                start = self.starts[s] + next_offsets[s]
+                next_offsets[s] += self.block_size
+                yield s, (start, self.block_size, self.prefix, self.suffix,
+                          self.compressed, self.version)
+
+    def search(self,
+               processes: Optional[int] = None,
+               max_keys: Optional[int] = None,
+               callback: Optional[Callable[['VanitySearch'], None]] = None,
+               checkpoint_interval: float = 60.0
+               ) -> Optional[Tuple[int, bytes]]:
+        """Return the first (private key, address) match found
+
+           The search stops without a match (returning None) after max_keys
+           keys checked in this run, if max_keys is given.
+           callback (if any) is called after each block, e.g. to report
+           the live keys-per-second rate.
+        """
+
+        streams = processes if processes is not None and processes > 1 else 1
+        # the stream of each block, in submission order
+        streams_blocks, tasks = tee(self._tasks(streams))
+        results = imap(_search_block, (task for _, task in tasks), streams)
+        t0 = last_save = time.time()
+        checked = 0
+        try:
+            for (s, _), matches in zip(streams_blocks, results):
+                self.offsets[s] += self.block_size
+                self.keys += self.block_size
+                checked += self.block_size
+                elapsed = time.time() - t0
+                self.rate = checked / elapsed if elapsed else 0.0
+                if callback is not None:
+                    callback(self)
+                if matches:
+                    self.save()
+                    return matches[0]
+                if max_keys is not None and checked >= max_keys:
+                    break
+                if time.time() - last_save >= checkpoint_interval:
+                    self.save()
+                    last_save = time.time()
+        finally:
+            results.close()
+        self.save()
+        return None
@@ -14,18 +14,25 @@ Implementation of Base58 encoding of private keys (wifs)
 and public keys (addresses)
 '''
 
-from typing import Tuple
+from typing import Tuple, Union, Any
 
-from btclib import base58
+from btclib import base58, bech32
 from btclib.curve import Point, mult
 from btclib.curves import secp256k1 as ec
+from btclib.keys import PrivateKey, PublicKey
 from btclib.utils import octets, int_from_octets, octets_from_int, \
                          octets_from_point, h160
 
 
-def wif_from_prvkey(prvkey: int, compressed: bool) -> bytes:
+def wif_from_prvkey(prvkey: Union[int, PrivateKey],
+                    compressed: bool) -> bytes:
     """private key to Wallet Import Format"""
 
+    if isinstance(prvkey, PrivateKey):
+        if prvkey.compressed == compressed:
+            return prvkey.wif               # cached
+        prvkey = prvkey.d
+
     if not 0 < prvkey < ec.n:
         raise ValueError(f"private key {hex(prvkey)} not in (0, n)")
 
@@ -35,9 +42,12 @@ def wif_from_prvkey(prvkey: int, compressed: bool) -> bytes:
     return base58.encode_check(payload)
 
 
-def prvkey_from_wif(wif: octets) -> Tuple[int, bool]:
+def prvkey_from_wif(wif: Union[octets, PrivateKey]) -> Tuple[int, bool]:
     """Wallet Import Format to (bytes) private key"""
 
+    if isinstance(wif, PrivateKey):
+        return wif.d, wif.compressed
+
     payload = base58.decode_check(wif)
     if payload[0] != 0x80:
         raise ValueError("Not a private key WIF: missing leading 0x80")
@@ -59,11 +69,16 @@ def prvkey_from_wif(wif: octets) -> Tuple[int, bool]:
     return prvkey, compressed
 
 
-def address_from_pubkey(Q: Point,
+def address_from_pubkey(Q: Union[Point, PublicKey],
                         compressed: bool,
                         version: bytes = b'\x00') -> bytes:
     """Public key to (bytes) address"""
 
+    if isinstance(Q, PublicKey):
+        if Q.compressed == compressed:
+            return Q.address(version)       # cached
+        return base58.encode_check(version + h160(Q.sec(compressed)))
+
     # also check that the Point is on curve
     pubkey = octets_from_point(ec, Q, compressed)
 
@@ -71,6 +86,34 @@ def address_from_pubkey(Q: Point,
     return base58.encode_check(vh160)
 
 
+def p2wpkh_address_from_pubkey(Q: Union[Point, octets, Any],
+                               hrp: str = 'bc') -> bytes:
+    """Public key to (bytes) native segwit v0 P2WPKH address
+
+       Q can be a Point, a compressed public key, or a key object
+       with a pubkey attribute (e.g. keystore.KeyRecord);
+       segwit v0 requires the compressed public key.
+    """
+
+    if isinstance(Q, PrivateKey):
+        Q = Q.public_key
+    if isinstance(Q, PublicKey):
+        if not Q.compressed:
+            raise ValueError("not a compressed public key")
+        return bech32.segwit_address(hrp, 0, Q.h160)    # cached
+
+    if isinstance(Q, tuple) and len(Q) == 2:
+        # also check that the Point is on curve
+        pubkey = octets_from_point(ec, Q, True)
+    else:
+        pubkey = getattr(Q, 'pubkey', Q)
+        if isinstance(pubkey, str):
+            pubkey = bytes.fromhex(pubkey)
+        if len(pubkey) != 33 or pubkey[0] not in (2, 3):
+            raise ValueError("not a compressed public key")
+    return bech32.segwit_address(hrp, 0, h160(pubkey))
+
+
 def _h160_from_address(addr: octets) -> bytes:
     payload = base58.decode_check(addr, 21)
     # FIXME: this is mainnet only
@@ -79,7 +122,9 @@ def _h160_from_address(addr: octets) -> bytes:
     return payload[1:]
 
 
-def address_from_wif(wif: octets) -> bytes:
+def address_from_wif(wif: Union[octets, PrivateKey]) -> bytes:
+    if isinstance(wif, PrivateKey):
+        return wif.address()                # cached
     prv, compressed = prvkey_from_wif(wif)
     pub = mult(ec, prv, ec.G)
     return address_from_pubkey(pub, compressed)
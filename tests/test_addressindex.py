@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2019 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+import os
+import tempfile
+import unittest
+
+from btclib import bip32
+from btclib.addressindex import build_index, extend_index, AddressIndex, \
+    MAGIC
+
+
+class TestAddressIndex(unittest.TestCase):
+    def test_index(self):
+        mprv = b"xprv9s21ZrQH143K3QTDL4LXw2F7HEK3wJUD2nW2nRk4stbPy6cq3jPPqjiChkVvvNKmPGJxWUtg6LnF5kejMRNNU3TGtRBeJgk33yuGBxrMPHi"
+        xpubs = [bip32.xpub_from_xprv(bip32.derive(mprv, f"m/44'/0'/{a}'"))
+                 for a in range(2)]
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, 'index.bin')
+            self.assertEqual(build_index(filename, xpubs, 3), 2*2*3)
+            with AddressIndex(filename) as index:
+                self.assertEqual(len(index), 12)
+                addr = bip32.address_from_xpub(bip32.derive(xpubs[1], "./1/2"))
+                self.assertEqual(index.lookup_address(addr), (1, 1, 2))
+                addr = bip32.address_from_xpub(bip32.derive(xpubs[0], "./0/4"))
+                self.assertIsNone(index.lookup_address(addr))
+                self.assertIsNone(index.lookup(b'\x00'*20))
+                self.assertIsNone(index.lookup(b'\xff'*20))
+                self.assertRaises(ValueError, index.lookup, b'\x00'*19)
+
+            # the gap limit moves
+            self.assertEqual(extend_index(filename, xpubs, 5), 2*2*5)
+            self.assertEqual(extend_index(filename, xpubs, 5), 2*2*5)
+            # not the xpubs of the index
+            self.assertRaises(ValueError, extend_index, filename, xpubs[:1], 6)
+            self.assertRaises(ValueError, extend_index, filename,
+                              xpubs[::-1], 6)
+            with AddressIndex(filename) as index:
+                self.assertEqual(index.lookup_address(addr), (0, 0, 4))
+                # the new records are merged into the sorted ones
+                records = list(index.records())
+                self.assertEqual(records, sorted(records))
+                for a, xpub in enumerate(xpubs):
+                    for c in (0, 1):
+                        for i in range(5):
+                            xkey = bip32.derive(xpub, f"./{c}/{i}")
+                            addr = bip32.address_from_xpub(xkey)
+                            self.assertEqual(index.lookup_address(addr),
+                                             (a, c, i))
+
+            # invalid index files
+            self.assertFalse(os.path.exists(filename + '.tmp'))
+            with open(filename, 'ab') as f:
+                f.write(b'\x00' * 31)
+            self.assertRaises(ValueError, AddressIndex, filename)
+            with open(filename, 'wb') as f:
+                f.write(MAGIC + b'\x00\x00\x00\x02' + b'\x00' * 8)
+            self.assertRaises(ValueError, AddressIndex, filename)
+            with open(filename, 'wb') as f:
+                f.write(MAGIC + b'\x00')
+            self.assertRaises(ValueError, AddressIndex, filename)
+            with open(filename, 'wb') as f:
+                f.write(b'\x00' * 40)
+            self.assertRaises(ValueError, AddressIndex, filename)
+
+
+if __name__ == "__main__":
+    # execute only if run as a script
+    unittest.main()
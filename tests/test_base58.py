@@ -47,6 +47,17 @@ class TestBase58CheckEncoding(unittest.TestCase):
         self.assertEqual(base58.decode_to_int(digits), number)
         self.assertEqual(base58.encode_from_int(number), digits[1:])
 
+    def test_chunks(self):
+        digits = b'123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
+        # lengths across chunk boundaries
+        for n in range(1, 25):
+            v = digits[1:2] + digits[-1:] * (n - 1)
+            i = 58**n - 1 - 58**(n-1) * (57 - 1)
+            self.assertEqual(base58.decode_to_int(v), i)
+            self.assertEqual(base58.encode_from_int(i), v)
+            self.assertEqual(base58.encode_from_int(58**n), b'2' + b'1' * n)
+            self.assertEqual(base58.decode_to_int(b'2' + b'1' * n), 58**n)
+
     def test_exceptions(self):
         # int is not hex-string or bytes
         self.assertRaises(TypeError, base58.encode_check, 3)
@@ -61,6 +72,46 @@ class TestBase58CheckEncoding(unittest.TestCase):
         invalidChecksum = encoded[:-4] + b'1111'
         self.assertRaises(ValueError, base58.decode_check, invalidChecksum, 4)
 
+        # invalid characters
+        for char in (b'0', b'O', b'I', b'l', b'\xff'):
+            self.assertRaises(ValueError, base58.decode, encoded + char)
+
+    def test_many(self):
+        payloads = [b'', b'\x00', b'\x00\x00test', b'\x80' + b'\x01'*32]
+        encoded = list(base58.encode_check_many(payloads))
+        self.assertEqual(encoded, [base58.encode_check(v) for v in payloads])
+        self.assertEqual(list(base58.encode_check_many([])), [])
+        self.assertRaises(TypeError, base58.encode_check_many, b'buffer')
+
+        values = encoded + [
+            encoded[3][:-1] + b'0',   # invalid character
+            b'1',                     # invalid size
+            encoded[3][:-4] + b'1111' # invalid checksum
+        ]
+        expected = [(base58.DECODE_OK, v) for v in payloads]
+        expected += [(base58.INVALID_CHARACTER, None),
+                     (base58.INVALID_SIZE, None),
+                     (base58.INVALID_CHECKSUM, None)]
+        self.assertEqual(list(base58.decode_check_many(values)), expected)
+        # newline-separated buffer, with spaces and str values
+        buffer = b'\n'.join(values) + b'\n'
+        self.assertEqual(list(base58.decode_check_many(buffer)), expected)
+        self.assertEqual(list(base58.decode_check_many(buffer.decode())), expected)
+        self.assertEqual(list(base58.decode_check_many(memoryview(buffer))), expected)
+        strings = [' ' + v.decode() for v in values]
+        self.assertEqual(list(base58.decode_check_many(strings)), expected)
+        # process pool
+        results = base58.decode_check_many(values, processes=2, chunk_size=2)
+        self.assertEqual(list(results), expected)
+        results = base58.encode_check_many(payloads, processes=2, chunk_size=3)
+        self.assertEqual(list(results), encoded)
+        results = base58.decode_check_many(values, chunk_size=0)
+        self.assertRaises(ValueError, list, results)
+
+        # output size
+        results = list(base58.decode_check_many(values[:4], 33))
+        self.assertEqual([status for status, _ in results], [2, 2, 2, 0])
+
     def test_wif(self):
         # https://en.bitcoin.it/wiki/Wallet_import_format
         prvkey = 0xC28FCA386C7A227600B2FE50B7CAE11EC86D3BF1FBE471BE89827E19D72AA1D
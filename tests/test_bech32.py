@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2019 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+import unittest
+
+from btclib import bech32
+from btclib.bech32 import encode, decode, segwit_address, \
+    witness_from_address, scriptpubkey_from_address, validate_many
+
+
+class TestBech32(unittest.TestCase):
+    def test_polymod_table(self):
+        # reference (bit by bit) BIP173 polymod
+        def polymod(values):
+            generator = [0x3b6a57b2, 0x26508e6d, 0x1ea119fa,
+                         0x3d4233dd, 0x2a1462b3]
+            chk = 1
+            for value in values:
+                top = chk >> 25
+                chk = (chk & 0x1ffffff) << 5 ^ value
+                for i in range(5):
+                    chk ^= generator[i] if ((top >> i) & 1) else 0
+            return chk
+
+        values = [i % 32 for i in range(0, 500, 7)]
+        self.assertEqual(bech32._polymod(values), polymod(values))
+
+    def test_valid_strings(self):
+        # BIP173 and BIP350 test vectors
+        for string in ("A12UEL5L", "a12uel5l",
+                       "an83characterlonghumanreadablepartthatcontainsthenumber1andtheexcludedcharactersbio1tt5tgs",
+                       "abcdef1qpzry9x8gf2tvdw0s3jn54khce6mua7lmqqqxw",
+                       "split1checkupstagehandshakeupstreamerranterredcaperred2y9e3w"):
+            hrp, data, spec = decode(string)
+            self.assertEqual(spec, bech32.BECH32)
+            self.assertEqual(encode(hrp, data, spec), string.lower().encode())
+        for string in ("A1LQFN3A", "a1lqfn3a",
+                       "abcdef1l7aum6echk45nj3s0wdvt2fg8x9yrzpqzd3ryx",
+                       "split1checkupstagehandshakeupstreamerranterredcaperredlc445v",
+                       "?1v759aa"):
+            hrp, data, spec = decode(string)
+            self.assertEqual(spec, bech32.BECH32M)
+            self.assertEqual(encode(hrp, data, spec), string.lower().encode())
+
+    def test_invalid_strings(self):
+        for string in ("\x201nwldj5",     # HRP character out of range
+                       "\x7f1axkwrx",     # HRP character out of range
+                       "an84characterslonghumanreadablepartthatcontainsthenumber1andtheexcludedcharactersbio1569pvx",
+                       "pzry9x0s0muk",    # no separator
+                       "1pzry9x0s0muk",   # empty HRP
+                       "x1b4n0q5v",       # invalid data character
+                       "li1dgmt3",        # too short checksum
+                       "de1lg7wt\xff",    # invalid character in checksum
+                       "A1G7SGD8",        # checksum with uppercase HRP
+                       "10a06t8",         # empty HRP
+                       "1qzzfhee",        # empty HRP
+                       "a12UEL5L"):       # mixed case
+            self.assertRaises(ValueError, decode, string)
+
+        self.assertRaises(ValueError, encode, 'a', [32], bech32.BECH32)
+        self.assertRaises(ValueError, encode, 'a', [], 'bech33')
+        self.assertRaises(ValueError, encode, 'a', [0] * 84, bech32.BECH32)
+
+    def test_segwit_addresses(self):
+        valid = [
+            ("BC1QW508D6QEJXTDG4Y5R3ZARVARY0C5XW7KV8F3T4",
+             "0014751e76e8199196d454941c45d1b3a323f1433bd6"),
+            ("tb1qrp33g0q5c5txsp9arysrx4k6zdkfs4nce4xj0gdcccefvpysxf3q0sl5k7",
+             "00201863143c14c5166804bd19203356da136c985678cd4d27a1b8c6329604903262"),
+            ("bc1pw508d6qejxtdg4y5r3zarvary0c5xw7kw508d6qejxtdg4y5r3zarvary0c5xw7kt5nd6y",
+             "5128751e76e8199196d454941c45d1b3a323f1433bd6751e76e8199196d454941c45d1b3a323f1433bd6"),
+            ("BC1SW50QGDZ25J", "6002751e"),
+            ("bc1zw508d6qejxtdg4y5r3zarvaryvaxxpcs",
+             "5210751e76e8199196d454941c45d1b3a323"),
+            ("tb1qqqqqp399et2xygdj5xreqhjjvcmzhxw4aywxecjdzew6hylgvsesrxh6hy",
+             "0020000000c4a5cad46221b2a187905e5266362b99d5e91c6ce24d165dab93e86433"),
+            ("tb1pqqqqp399et2xygdj5xreqhjjvcmzhxw4aywxecjdzew6hylgvsesf3hn0c",
+             "5120000000c4a5cad46221b2a187905e5266362b99d5e91c6ce24d165dab93e86433"),
+            ("bc1p0xlxvlhemja6c4dqv22uapctqupfhlxm9h8z3k2e72q4k9hcz7vqzk5jj0",
+             "512079be667ef9dcbbac55a06295ce870b07029bfcdb2dce28d959f2815b16f81798"),
+        ]
+        for address, script in valid:
+            script = bytes.fromhex(script)
+            self.assertEqual(scriptpubkey_from_address(address), script)
+            wver, wprog = witness_from_address(address)
+            hrp = address[:2].lower()
+            self.assertEqual(segwit_address(hrp, wver, wprog),
+                             address.lower().encode())
+
+        invalid = [
+            "tc1p0xlxvlhemja6c4dqv22uapctqupfhlxm9h8z3k2e72q4k9hcz7vq5zuyut",  # invalid HRP
+            "bc1p0xlxvlhemja6c4dqv22uapctqupfhlxm9h8z3k2e72q4k9hcz7vqh2y7hd",  # v1 with bech32
+            "tb1z0xlxvlhemja6c4dqv22uapctqupfhlxm9h8z3k2e72q4k9hcz7vqglt7rf",  # v2 with bech32
+            "BC1S0XLXVLHEMJA6C4DQV22UAPCTQUPFHLXM9H8Z3K2E72Q4K9HCZ7VQ54WELL",  # v16 with bech32
+            "bc1qw508d6qejxtdg4y5r3zarvary0c5xw7kemeawh",  # v0 with bech32m
+            "tb1q0xlxvlhemja6c4dqv22uapctqupfhlxm9h8z3k2e72q4k9hcz7vq24jc47",  # v0 with bech32m
+            "bc1p38j9r5y49hruaue7wxjce0updqjuyyx0kh56v8s25huc6995vvpql3jow4",  # invalid character
+            "BC130XLXVLHEMJA6C4DQV22UAPCTQUPFHLXM9H8Z3K2E72Q4K9HCZ7VQ7ZWS8R",  # invalid version
+            "bc1pw5dgrnzv",                  # invalid program length (1 byte)
+            "bc1p0xlxvlhemja6c4dqv22uapctqupfhlxm9h8z3k2e72q4k9hcz7v8n0nx0muaewav253zgeav",  # 41 bytes
+            "BC1QR508D6QEJXTDG4Y5R3ZARVARYV98GJ9P",  # invalid v0 program length
+            "tb1p0xlxvlhemja6c4dqv22uapctqupfhlxm9h8z3k2e72q4k9hcz7vq47Zagq",  # mixed case
+            "bc1p0xlxvlhemja6c4dqv22uapctqupfhlxm9h8z3k2e72q4k9hcz7v07qwwzcrf",  # zero padding > 4 bits
+            "tb1p0xlxvlhemja6c4dqv22uapctqupfhlxm9h8z3k2e72q4k9hcz7vpggkg4j",  # non-zero padding
+            "bc1gmk9yu",                     # empty data section
+        ]
+        for address in invalid:
+            self.assertRaises(ValueError, witness_from_address, address,
+                              'tb' if address[:2].lower() == 'tb' else 'bc')
+
+        # wrong HRP
+        address = valid[0][0]
+        self.assertRaises(ValueError, witness_from_address, address, 'tb')
+
+        self.assertRaises(ValueError, segwit_address, 'bc', 17, b'\x00' * 20)
+        self.assertRaises(ValueError, segwit_address, 'bc', 0, b'\x00' * 21)
+        self.assertRaises(ValueError, segwit_address, 'bc', 1, b'\x00')
+
+        # bulk validation
+        # (the invalid HRP address is valid if the HRP is not checked)
+        addresses = [v[0] for v in valid] + invalid[1:]
+        expected = [True] * len(valid) + [False] * len(invalid[1:])
+        self.assertEqual(validate_many(addresses), expected)
+        results = validate_many([valid[0][0], valid[1][0]], 'bc')
+        self.assertEqual(results, [True, False])
+
+
+if __name__ == "__main__":
+    # execute only if run as a script
+    unittest.main()
@@ -434,6 +434,83 @@ class TestBIP32(unittest.TestCase):
         self.assertRaises(ValueError, bip32.address_from_xpub, mprv)
         #address_from_xpub(mprv)
 
+    def test_extended_key(self):
+        mprv = b"xprv9s21ZrQH143K3QTDL4LXw2F7HEK3wJUD2nW2nRk4stbPy6cq3jPPqjiChkVvvNKmPGJxWUtg6LnF5kejMRNNU3TGtRBeJgk33yuGBxrMPHi"
+        mpub = bip32.xpub_from_xprv(mprv)
+        k = bip32.ExtendedKey.from_xkey(mprv)
+        self.assertTrue(k.is_private)
+        self.assertEqual(k.depth, 0)
+        self.assertEqual(k.xkey(), mprv)
+        self.assertEqual(base58.encode_check(k.serialize()), mprv)
+        K = bip32.ExtendedKey.from_xkey(mpub)
+        self.assertFalse(K.is_private)
+        self.assertEqual(k.Q, K.Q)
+        self.assertEqual(k.pubkey, K.pubkey)
+        self.assertRaises(ValueError, getattr, K, 'prvkey')
+
+        path = "m/0'/1/2'/2/1000000000"
+        xprv = bip32.derive(k, path)
+        self.assertIsInstance(xprv, bip32.ExtendedKey)
+        self.assertEqual(xprv.depth, 5)
+        self.assertEqual(xprv.xkey(), bip32.derive(mprv, path))
+        self.assertEqual(xprv.xkey(), b"xprvA41z7zogVVwxVSgdKUHDy1SKmdb533PjDz7J6N6mV6uS3ze1ai8FHa8kmHScGpWmj4WggLyQjgPie1rFSruoUihUZREPSL39UNdE3BBDu76")
+        xpub = bip32.derive(K, "./0/1")
+        self.assertEqual(xpub.xkey(), bip32.derive(mpub, "./0/1"))
+        self.assertEqual(bip32.ckd(K, 0).xkey(), bip32.ckd(mpub, 0))
+        self.assertEqual(bip32.derive(mpub, [0, 1]), xpub.xkey())
+
+    def test_derivation_cache(self):
+        mprv = b"xprv9s21ZrQH143K3QTDL4LXw2F7HEK3wJUD2nW2nRk4stbPy6cq3jPPqjiChkVvvNKmPGJxWUtg6LnF5kejMRNNU3TGtRBeJgk33yuGBxrMPHi"
+        paths = [f"m/84'/0'/0'/{c}/{i}" for c in (0, 1) for i in range(3)]
+        expected = [bip32.derive(mprv, path) for path in paths]
+
+        cache = bip32.derivation_cache
+        self.assertEqual(len(cache), 0)
+        cache.set_maxsize(16)
+        try:
+            for path, xkey in zip(paths, expected):
+                self.assertEqual(bip32.derive(mprv, path), xkey)
+            # m/84', m/84'/0', m/84'/0'/0', and the two chains
+            self.assertEqual(len(cache), 5)
+            self.assertEqual(cache.misses, 5)
+            self.assertEqual(cache.hits, 4*6 - 5)
+            # least recently used keys are evicted
+            cache.set_maxsize(2)
+            self.assertEqual(len(cache), 2)
+            self.assertEqual(bip32.derive(mprv, paths[0]), expected[0])
+        finally:
+            cache.set_maxsize(0)
+            cache.clear()
+        self.assertEqual(cache.hit_rate(), 0.0)
+
+        self.assertRaises(ValueError, bip32.DerivationCache, -1)
+        self.assertRaises(ValueError, cache.set_maxsize, -1)
+
+    def test_derive_range(self):
+        xpub = b"xpub661MyMwAqRbcFtXgS5sYJABqqG9YLmC4Q1Rdap9gSE8NqtwybGhePY2gZ29ESFjqJoCu1Rupje8YtGqsefD265TMg7usUDFdp6W1EGMcet8"
+        start = 0x7FFFFFF0
+        count = 16
+        children = [bip32.ckd(xpub, i) for i in range(start, start + count)]
+        pubkeys = [base58.decode_check(x, 78)[45:] for x in children]
+        self.assertEqual(bip32.derive_range(xpub, start, count), pubkeys)
+        k = bip32.ExtendedKey.from_xkey(xpub)
+        self.assertEqual(bip32.derive_range(k, start, count), pubkeys)
+        addresses = [bip32.address_from_xpub(x) for x in children]
+        self.assertEqual(
+            bip32.derive_range(xpub, start, count, 'address'), addresses)
+        h160s = [base58.decode_check(a)[1:] for a in addresses]
+        self.assertEqual(bip32.derive_range(xpub, start, count, 'h160'), h160s)
+        self.assertEqual(bip32.derive_range(xpub, 0, 0), [])
+
+        # hardened range
+        self.assertRaises(ValueError, bip32.derive_range, xpub, start, count+1)
+        self.assertRaises(ValueError, bip32.derive_range, xpub, -1, count)
+        # invalid output
+        self.assertRaises(ValueError, bip32.derive_range, xpub, 0, 1, 'wif')
+        # extended key is not a public one
+        xprv = b"xprv9s21ZrQH143K3QTDL4LXw2F7HEK3wJUD2nW2nRk4stbPy6cq3jPPqjiChkVvvNKmPGJxWUtg6LnF5kejMRNNU3TGtRBeJgk33yuGBxrMPHi"
+        self.assertRaises(ValueError, bip32.derive_range, xprv, 0, 1)
+
     def test_crack(self):
         parent_xpub = b'xpub6BabMgRo8rKHfpAb8waRM5vj2AneD4kDMsJhm7jpBDHSJvrFAjHJHU5hM43YgsuJVUVHWacAcTsgnyRptfMdMP8b28LYfqGocGdKCFjhQMV'
         child_xprv = b'xprv9xkG88dGyiurKbVbPH1kjdYrA8poBBBXa53RKuRGJXyruuoJUDd8e4m6poiz7rV8Z4NoM5AJNcPHN6aj8wRFt5CWvF8VPfQCrDUcLU5tcTm'
@@ -78,9 +78,63 @@ class TestBIP39(unittest.TestCase):
             seed = bip39.seed_from_mnemonic(mnemonic, "TREZOR").hex()
             self.assertEqual(seed, test_vector[2])
 
+    def test_validate_many(self):
+        filename = "bip39_test_vectors.json"
+        path_to_filename = os.path.join(os.path.dirname(__file__),
+                                        "./data/",
+                                        filename)
+        with open(path_to_filename, 'r') as f:
+            test_vectors = json.load(f)["english"]
+        mnemonics = [test_vector[1] for test_vector in test_vectors]
+        self.assertEqual(bip39.validate_many(mnemonics), [True] * len(mnemonics))
+        self.assertEqual(bip39.validate_many(mnemonics, "en"), [True] * len(mnemonics))
+
+        italian = bip39.mnemonic_from_raw_entropy(b'\x01' * 16, "it")
+        invalid = [
+            "abandon abandon atom trust ankle walnut oil across awake bunker divorce walnut",
+            "abandon abandon atom trust ankle walnut oil across awake bunker divorce",
+            mnemonics[0] + " abandon abandon abandon",
+            "abandon abandon atom trust ankle walnut oil across awake bunker divorce notaword",
+            "",
+        ]
+        results = bip39.validate_many(invalid + [italian])
+        self.assertEqual(results, [False] * len(invalid) + [True])
+        # wrong language
+        self.assertEqual(bip39.validate_many([italian], "en"), [False])
+        # consistency with raw_entropy_from_mnemonic
+        for m in invalid[:1] + mnemonics[:3]:
+            try:
+                bip39.raw_entropy_from_mnemonic(m, "en")
+                valid = True
+            except ValueError:
+                valid = False
+            self.assertEqual(bip39.validate_many([m]), [valid])
+
             # test_vector[3], i.e. the bip32 master private key from seed,
             # has been tested in bip32, as it does not belong here
 
+    def test_seeds_from_mnemonics(self):
+        mnemonics = [bip39.mnemonic_from_raw_entropy(i.to_bytes(16, 'big'), "en")
+                     for i in range(1, 21)]
+        passphrases = [str(i) for i in range(20)]
+        expected = [bip39.seed_from_mnemonic(m, p) for m, p in zip(mnemonics, passphrases)]
+        for workers in (None, 1, 3):
+            seeds = bip39.seeds_from_mnemonics(mnemonics, passphrases, workers)
+            self.assertEqual(list(seeds), expected)
+            seeds = bip39.seeds_from_mnemonics(iter(mnemonics), passphrases, workers, False)
+            self.assertEqual(sorted(seeds), list(enumerate(expected)))
+        # a single passphrase for all the mnemonics
+        seeds = bip39.seeds_from_mnemonics(mnemonics, "TREZOR", 2)
+        self.assertEqual(list(seeds), [bip39.seed_from_mnemonic(m, "TREZOR") for m in mnemonics])
+        self.assertEqual(list(bip39.seeds_from_mnemonics([])), [])
+        self.assertRaises(ValueError, list, bip39.seeds_from_mnemonics(mnemonics, '', 0))
+        # one passphrase per mnemonic
+        for workers in (1, 3):
+            seeds = bip39.seeds_from_mnemonics(mnemonics, passphrases[:-1], workers)
+            self.assertRaises(ValueError, list, seeds)
+            seeds = bip39.seeds_from_mnemonics(mnemonics[:-1], passphrases, workers)
+            self.assertRaises(ValueError, list, seeds)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -97,6 +97,39 @@ class TestDER(unittest.TestCase):
         sig2 = -1 , sig[1]
         self.assertRaises(ValueError, der.encode, ec, sig2, sighash_all)
 
+    def test_buffers(self):
+        sigs = [(2**255 - 1, 2**255 - 1), (2**247 - 1, 2**247 - 1),
+                (1, 1), (ec.n - 1, 0x80)]
+        sighashes = [der.sighash_all, der.sighash_none,
+                     der.sighash_single_anyonecanpay, der.sighash_all]
+        DERs = [der.encode(ec, sig, sighash)
+                for sig, sighash in zip(sigs, sighashes)]
+
+        for DER, sig, sighash in zip(DERs, sigs, sighashes):
+            for buf in (bytearray(DER), memoryview(DER)):
+                self.assertEqual(der.decode(ec, buf), (sig, sighash))
+        # zero-copy view inside a larger buffer
+        raw = b'\xff' * 5 + DERs[0] + b'\xff' * 5
+        view = memoryview(raw)[5:5+len(DERs[0])]
+        self.assertEqual(der.decode(ec, view), (sigs[0], sighashes[0]))
+        self.assertRaises(ValueError, der.decode, ec, memoryview(raw))
+
+        # concatenated length-prefixed signatures
+        buf = b''.join(bytes([len(DER)]) + DER for DER in DERs)
+        expected = [(r, s, sighash) for (r, s), sighash in zip(sigs, sighashes)]
+        for b in (buf, bytearray(buf), memoryview(buf)):
+            self.assertEqual(list(der.iter_decode(ec, b)), expected)
+        self.assertEqual(list(der.iter_decode(ec, b'')), [])
+
+        # truncated buffer
+        self.assertRaises(ValueError, list, der.iter_decode(ec, buf[:-1]))
+        # invalid (zero r) signature
+        bad = bytes([len(DERs[0])]) + DERs[0][:4] + b'\x00' * DERs[0][3] + DERs[0][4+DERs[0][3]:]
+        self.assertRaises(ValueError, list, der.iter_decode(ec, buf + bad))
+        # wrong size prefix
+        bad = bytes([len(DERs[0]) - 1]) + DERs[0]
+        self.assertRaises(ValueError, list, der.iter_decode(ec, bad))
+
 
 if __name__ == "__main__":
     # execute only if run as a script
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2019 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+import unittest
+from hashlib import sha256
+from itertools import islice
+
+from btclib import bip32, descriptor
+from btclib.bech32 import scriptpubkey_from_address
+from btclib.descriptor import Descriptor
+from btclib.utils import h160
+
+
+class TestDescriptor(unittest.TestCase):
+    def test_descriptors_md(self):
+        """https://github.com/bitcoin/bitcoin/blob/master/doc/descriptors.md"""
+
+        desc = Descriptor("pkh(02c6047f9441ed7d6d3045406e95c07cd85c778e4b8cef3ca7abac09b95c709ee5)")
+        self.assertEqual(list(desc.addresses()), [b'1cMh228HTCiwS8ZsaakH8A8wze1JR5ZsP'])
+        desc = Descriptor("sh(wpkh(03fff97bd5755eeea420453a14355235d382f6472f8568a18b2f057a1460297556))")
+        self.assertEqual(list(desc.addresses()), [b'3LKyvRN6SmYXGBNn8fcQvYxW9MGKtwcinN'])
+        desc = Descriptor("sh(multi(2,022f01e5e15cca351daff3843fb70f3c2f0a1bdd05e5af888a67784ef3e10a2a01,03acd484e2f0c7f65309ad178a9f559abde09796974c57e714c35f110dfc27ccbe))")
+        self.assertEqual(list(desc.addresses()), [b'3GtEB3yg3r5de2cDJG48SkQwxfxJumKQdN'])
+        # sortedmulti is independent of the keys order
+        desc = Descriptor("sh(sortedmulti(2,03acd484e2f0c7f65309ad178a9f559abde09796974c57e714c35f110dfc27ccbe,022f01e5e15cca351daff3843fb70f3c2f0a1bdd05e5af888a67784ef3e10a2a01))")
+        self.assertEqual(list(desc.addresses()), [b'3GtEB3yg3r5de2cDJG48SkQwxfxJumKQdN'])
+
+        pubkey = bytes.fromhex("02f9308a019258c31049344f85f89d5229b531c845836f99b08601f113bce036f9")
+        desc = Descriptor(f"wpkh({pubkey.hex()})#8zl0zxma")
+        self.assertEqual(list(desc.scripts()), [b'\x00\x14' + h160(pubkey)])
+        # BIP173 P2WPKH example
+        desc = Descriptor("wpkh(0279be667ef9dcbbac55a06295ce870b07029bfcdb2dce28d959f2815b16f81798)")
+        self.assertEqual(list(desc.addresses()), [b'bc1qw508d6qejxtdg4y5r3zarvary0c5xw7kv8f3t4'])
+        self.assertEqual(list(desc.addresses(testnet=True)), [b'tb1qw508d6qejxtdg4y5r3zarvary0c5xw7kxpjzsx'])
+
+        desc = Descriptor("wsh(multi(2,03a0434d9e47f3c86235477c7b1ae6ae5d3442d49b1943c2b752a68e2a47e247c7,03774ae7f858a9411e5ef4246b70c65aac5649980be5c17891bbec17895da008cb,03d01115d548e7561b15c38f004d734633687cf4419620095bc5b0f47070afe85a))")
+        address = list(desc.addresses())[0]
+        script = list(desc.scripts())[0]
+        self.assertEqual(scriptpubkey_from_address(address), script)
+
+        # bare multisig has no address
+        desc = Descriptor("multi(1,022f01e5e15cca351daff3843fb70f3c2f0a1bdd05e5af888a67784ef3e10a2a01)")
+        self.assertRaises(ValueError, list, desc.addresses())
+
+    def test_ranged(self):
+        mprv = b"xprv9s21ZrQH143K3QTDL4LXw2F7HEK3wJUD2nW2nRk4stbPy6cq3jPPqjiChkVvvNKmPGJxWUtg6LnF5kejMRNNU3TGtRBeJgk33yuGBxrMPHi"
+        xpubs = [bip32.xpub_from_xprv(bip32.derive(mprv, f"m/84'/0'/{a}'"))
+                 for a in range(2)]
+        fp = "3442193e"
+
+        desc = Descriptor(f"wpkh([{fp}/84h/0h/0h]{xpubs[0].decode()}/0/*)")
+        self.assertEqual(desc.keys[0].origin, f"{fp}/84h/0h/0h")
+        scripts = list(desc.scripts(5, 3))
+        for i, script in enumerate(scripts, 5):
+            xpub = bip32.derive(xpubs[0], f"./0/{i}")
+            pubkey = bip32.base58.decode_check(xpub, 78)[45:]
+            self.assertEqual(script, b'\x00\x14' + h160(pubkey))
+
+        # lazy endless expansion, across chunks
+        descriptor.CHUNK_SIZE = 2
+        try:
+            self.assertEqual(list(islice(desc.scripts(5), 3)), scripts)
+        finally:
+            descriptor.CHUNK_SIZE = 100
+
+        desc = Descriptor(f"pkh({xpubs[0].decode()}/1/*)")
+        xpub = bip32.derive(xpubs[0], "./1/7")
+        self.assertEqual(list(desc.addresses(7, 1)),
+                         [bip32.address_from_xpub(xpub)])
+
+        k0 = f"{xpubs[0].decode()}/0/*"
+        k1 = f"[{fp}/84'/0'/1']{xpubs[1].decode()}/0/*"
+        desc = Descriptor(f"wsh(sortedmulti(1,{k0},{k1}))")
+        for i, script in enumerate(desc.scripts(0, 4)):
+            pks = [bip32.base58.decode_check(bip32.derive(x, f"./0/{i}"), 78)[45:]
+                   for x in xpubs]
+            witness_script = b'\x51\x21' + min(pks) + b'\x21' + max(pks) + b'\x52\xae'
+            self.assertEqual(script, b'\x00\x20' + sha256(witness_script).digest())
+        desc = Descriptor(f"sh(wsh(multi(1,{k0},{k1})))")
+        self.assertEqual(len(list(desc.addresses(0, 3, True))), 3)
+
+    def test_exceptions(self):
+        pubkey = "02f9308a019258c31049344f85f89d5229b531c845836f99b08601f113bce036f9"
+        mprv = "xprv9s21ZrQH143K3QTDL4LXw2F7HEK3wJUD2nW2nRk4stbPy6cq3jPPqjiChkVvvNKmPGJxWUtg6LnF5kejMRNNU3TGtRBeJgk33yuGBxrMPHi"
+        invalid = [
+            f"wsh(wpkh({pubkey}))",
+            f"sh(sh(wpkh({pubkey})))",
+            f"wsh(sh(pkh({pubkey})))",
+            f"tr({pubkey})",
+            f"pkh({pubkey}",
+            f"sh(pkh({pubkey})",
+            "pkh",
+            f"multi(2,{pubkey})",
+            f"multi(0,{pubkey})",
+            f"pkh([abcd/0]{pubkey})",
+            f"pkh([abcdef01/0{pubkey})",
+            f"pkh({pubkey}/0)",
+            f"pkh({mprv}/0/*)",
+            f"pkh({bip32.xpub_from_xprv(mprv).decode()}/0/*')",
+            f"pkh({bip32.xpub_from_xprv(mprv).decode()}/0h/*)",
+        ]
+        for desc in invalid:
+            self.assertRaises(ValueError, Descriptor, desc)
+
+
+if __name__ == "__main__":
+    # execute only if run as a script
+    unittest.main()
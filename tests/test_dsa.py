@@ -9,6 +9,7 @@
 # or distributed except according to the terms contained in the LICENSE file.
 
 import unittest
+from array import array
 from hashlib import sha256, sha1
 
 from btclib.numbertheory import mod_inv
@@ -200,6 +201,57 @@ class TestDSA(unittest.TestCase):
             self.assertTrue(dsa.verify(ec, hf, msg, Q, sig))
             self.assertTrue(dsa._verify(ec, hf, msg, Q, sig))
 
+    def test_compact(self):
+        ec = secp256k1
+        hf = sha256
+        msg = 'Satoshi Nakamoto'.encode()
+        sigs = []
+        for q in (1, 2, ec.n - 1, 0xC28FCA386C7A227600B2FE50B7CAE11EC86D3BF1FBE471BE89827E19D72AA1D):
+            sig = dsa.sign(ec, hf, msg, q)
+            sigs.append(sig)
+            data = dsa.serialize(ec, sig)
+            self.assertEqual(len(data), 64)
+            self.assertEqual(dsa.deserialize(ec, data), sig)
+            self.assertEqual(dsa.deserialize(ec, bytearray(data)), sig)
+
+            # recoverable
+            Q = mult(ec, q, ec.G)
+            recid = dsa.recovery_id(ec, hf, msg, Q, sig)
+            for compressed in (True, False):
+                data = dsa.serialize_recoverable(ec, sig, recid, compressed)
+                self.assertEqual(len(data), 65)
+                self.assertEqual(dsa.deserialize_recoverable(ec, data),
+                                 (sig, recid, compressed))
+                self.assertEqual(dsa.pubkey_from_recoverable(ec, hf, msg, data), Q)
+        self.assertRaises(ValueError, dsa.serialize_recoverable, ec, sig, 4)
+        self.assertRaises(ValueError, dsa.deserialize_recoverable, ec, b'\x1a' + data[1:])
+        self.assertRaises(ValueError, dsa.deserialize_recoverable, ec, data[:-1])
+        self.assertRaises(ValueError, dsa.recovery_id, ec, hf, msg, ec.G, sig)
+
+        self.assertRaises(ValueError, dsa.deserialize, ec, data[2:])
+        self.assertRaises(ValueError, dsa.deserialize, ec, b'\x00' * 64)
+        self.assertRaises(ValueError, dsa.serialize, ec, (0, 1))
+
+        # contiguous buffers
+        buf = dsa.serialize_many(ec, sigs)
+        self.assertEqual(bytes(buf), b''.join(dsa.serialize(ec, sig) for sig in sigs))
+        self.assertEqual(dsa.deserialize_many(ec, buf), sigs)
+        self.assertEqual(dsa.deserialize_many(ec, bytes(buf)), sigs)
+        self.assertEqual(dsa.deserialize_many(ec, memoryview(buf)), sigs)
+        self.assertEqual(dsa.deserialize_many(ec, array('Q', buf)), sigs)
+        self.assertEqual(dsa.deserialize_many(ec, b''), [])
+        self.assertRaises(ValueError, dsa.deserialize_many, ec, buf[:-1])
+        bad = buf + ec.n.to_bytes(32, 'big') + b'\x00' * 31 + b'\x01'
+        self.assertRaises(ValueError, dsa.deserialize_many, ec, bad)
+        self.assertRaises(ValueError, dsa.serialize_many, ec, sigs + [(1, 0)])
+
+        # other curve sizes
+        ec = secp112r2
+        sig = dsa.sign(ec, hf, msg, 1)
+        data = dsa.serialize(ec, sig)
+        self.assertEqual(len(data), 2 * ec.nsize)
+        self.assertEqual(dsa.deserialize_many(ec, data * 2), [sig, sig])
+
 
 if __name__ == "__main__":
     # execute only if run as a script
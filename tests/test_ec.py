@@ -13,11 +13,12 @@ import random
 from typing import List
 
 from btclib.numbertheory import mod_sqrt
-from btclib.curve import Curve, Point, mult, double_mult, \
-    _jac_from_aff, _mult_jac, _mult_aff, multi_mult
+from btclib.curve import Curve, Point, ValidatedPoint, mult, double_mult, \
+    _jac_from_aff, _mult_jac, _mult_aff, multi_mult, _aff_from_jac_batch
 from btclib.curves import secp256k1, secp256r1, secp384r1, secp160r1, \
     secp112r1, all_curves, low_card_curves, ec23_31
-from btclib.utils import octets_from_point, point_from_octets
+from btclib.utils import octets_from_point, point_from_octets, PointCache, \
+    point_cache
 from btclib.pedersen import second_generator
 
 random.seed(42)
@@ -208,6 +209,89 @@ class TestEllipticCurve(unittest.TestCase):
         P = x, ec._p+1
         self.assertRaises(ValueError, ec.is_on_curve, P)
 
+    def test_point_cache(self):
+        ec = secp256k1
+        P = mult(ec, 3, ec.G)
+        Q = mult(ec, 5, ec.G)
+        P_bytes = octets_from_point(ec, P, True)
+        Q_bytes = octets_from_point(ec, Q, True)
+
+        # disabled by default
+        self.assertFalse(point_cache.enabled(ec))
+        self.assertEqual(point_from_octets(ec, P_bytes), P)
+        self.assertEqual(len(point_cache), 0)
+
+        point_cache.set_maxsize(1)
+        try:
+            self.assertEqual(point_from_octets(ec, P_bytes), P)
+            self.assertEqual(point_from_octets(ec, P_bytes.hex()), P)
+            self.assertEqual(point_cache.hits, 1)
+            self.assertEqual(point_cache.misses, 1)
+            self.assertEqual(point_cache.hit_rate(), 0.5)
+            # least recently used point is evicted
+            self.assertEqual(point_from_octets(ec, Q_bytes), Q)
+            self.assertEqual(len(point_cache), 1)
+            self.assertIsNone(point_cache.get(ec, P_bytes))
+            # invalid points are not cached
+            x = 0xEEFDEA4CDB677750A420FEE807EACF21EB9898AE79B9768766E4FAA04A2D4A34
+            invalid = b'\x03' + x.to_bytes(32, 'big')
+            self.assertRaises(ValueError, point_from_octets, ec, invalid)
+            self.assertEqual(len(point_cache), 1)
+        finally:
+            point_cache.set_maxsize(0)
+            point_cache.clear()
+        self.assertEqual(point_cache.hit_rate(), 0.0)
+
+        # per-curve size limits
+        cache = PointCache(2)
+        cache.set_maxsize(0, secp256r1)
+        self.assertTrue(cache.enabled(ec))
+        self.assertFalse(cache.enabled(secp256r1))
+        cache.put(ec, P_bytes, P)
+        cache.put(ec, Q_bytes, Q)
+        cache.put(secp256r1, P_bytes, P)
+        self.assertEqual(len(cache), 2)
+        cache.set_maxsize(1, ec)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.get(ec, Q_bytes), Q)
+
+        self.assertRaises(ValueError, PointCache, -1)
+        self.assertRaises(ValueError, cache.set_maxsize, -1)
+
+    def test_validated_point(self):
+        ec = secp256k1
+        P = mult(ec, 7, ec.G)
+        self.assertIsInstance(P, ValidatedPoint)
+        self.assertIs(P.ec, ec)
+        self.assertEqual(P, Point(P[0], P[1]))
+        self.assertIsInstance(ec.G, ValidatedPoint)
+        self.assertIsInstance(ec.add(P, ec.G), ValidatedPoint)
+        self.assertIsInstance(ec.opposite(P), ValidatedPoint)
+        self.assertIsInstance(double_mult(ec, 1, P, 2, ec.G), ValidatedPoint)
+        self.assertIsInstance(multi_mult(ec, [1, 2], [P, ec.G]), ValidatedPoint)
+        Q_bytes = octets_from_point(ec, P, True)
+        self.assertIsInstance(point_from_octets(ec, Q_bytes), ValidatedPoint)
+        Q_bytes = octets_from_point(ec, P, False)
+        self.assertIsInstance(point_from_octets(ec, Q_bytes), ValidatedPoint)
+        self.assertIsInstance(mult(ec, ec.n, ec.G), ValidatedPoint)
+
+        # a point validated on another curve is checked again
+        Q = mult(secp256r1, 7, secp256r1.G)
+        self.assertRaises(ValueError, ec.require_on_curve, Q)
+        self.assertRaises(ValueError, octets_from_point, ec, Q, True)
+
+        # a ValidatedPoint without ec (from _replace or the constructor)
+        # is checked again
+        for Q in (P._replace(y=P[1] + 1), ValidatedPoint(P[0], P[1] + 1)):
+            self.assertRaises(ValueError, ec.require_on_curve, Q)
+        ec.require_on_curve(ValidatedPoint(P[0], P[1]))
+
+        # trust is not pickled
+        import pickle
+        P2 = pickle.loads(pickle.dumps(P))
+        self.assertEqual(P2, P)
+        self.assertNotIsInstance(P2, ValidatedPoint)
+
     def test_opposite(self):
         for ec in all_curves:
             Q = mult(ec, ec._p, ec.G)  # just a random point, not Inf
@@ -309,6 +393,13 @@ class TestEllipticCurve(unittest.TestCase):
         checkInf = ec._aff_from_jac(_jac_from_aff(Inf))
         self.assertEqual(Inf, checkInf)
 
+        # simultaneous inversion
+        for ec in all_curves:
+            QJs = [_mult_jac(ec, q, ec.GJ) for q in (2, ec.n, 3, 5)]
+            checkQs = [ec._aff_from_jac(QJ) for QJ in QJs]
+            self.assertEqual(_aff_from_jac_batch(ec, QJs), checkQs)
+        self.assertEqual(_aff_from_jac_batch(ec, []), [])
+
     def test_add(self):
         for ec in all_curves:
             Q1 = mult(ec, ec._p, ec.G)  # just a random point, not Inf
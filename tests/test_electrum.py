@@ -11,9 +11,26 @@
 import unittest
 import os
 import json
+import hmac
+from hashlib import sha512
 
 from btclib import bip32
 from btclib import electrum
+from btclib.entropy import str_from_entropy
+from btclib.mnemonic import mnemonic_dict
+
+
+def reference_mnemonic(int_entropy, lang, eversion):
+    # the original (one mnemonic per candidate) algorithm
+    while True:
+        str_entropy = str_from_entropy(int_entropy)
+        indexes = mnemonic_dict.indexes_from_entropy(str_entropy, lang)
+        mnemonic = mnemonic_dict.mnemonic_from_indexes(indexes, lang)
+        s = hmac.new(b"Seed version", mnemonic.encode('utf8'), sha512).hexdigest()
+        if s.startswith(electrum.ELECTRUM_MNEMONIC_VERSIONS[eversion]):
+            return mnemonic
+        int_entropy += 1
+
 
 class TestMnemonicDictionaries(unittest.TestCase):
     def test_mnemonic(self):
@@ -73,6 +90,54 @@ class TestMnemonicDictionaries(unittest.TestCase):
             mnem = electrum.mnemonic_from_raw_entropy(entropy, lang, version)
             self.assertEqual(mnem, mnemonic)
 
+    def test_seeds_from_mnemonics(self):
+        mnemonics = [electrum.mnemonic_from_raw_entropy(i.to_bytes(16, 'big'), "en", 'standard')
+                     for i in range(1, 21)]
+        passphrases = [str(i) for i in range(20)]
+        expected = [electrum.seed_from_mnemonic(m, p) for m, p in zip(mnemonics, passphrases)]
+        for workers in (None, 1, 3):
+            seeds = electrum.seeds_from_mnemonics(mnemonics, passphrases, workers)
+            self.assertEqual(list(seeds), expected)
+            seeds = electrum.seeds_from_mnemonics(iter(mnemonics), passphrases, workers, False)
+            self.assertEqual(sorted(seeds), list(enumerate(expected)))
+        # a single passphrase for all the mnemonics
+        seeds = electrum.seeds_from_mnemonics(mnemonics, "TREZOR", 2)
+        self.assertEqual(list(seeds), [electrum.seed_from_mnemonic(m, "TREZOR") for m in mnemonics])
+        self.assertEqual(list(electrum.seeds_from_mnemonics([])), [])
+        self.assertRaises(ValueError, list, electrum.seeds_from_mnemonics(mnemonics, '', 0))
+        # one passphrase per mnemonic
+        for workers in (1, 3):
+            seeds = electrum.seeds_from_mnemonics(mnemonics, passphrases[:-1], workers)
+            self.assertRaises(ValueError, list, seeds)
+            seeds = electrum.seeds_from_mnemonics(mnemonics[:-1], passphrases, workers)
+            self.assertRaises(ValueError, list, seeds)
+
+    def test_versioned_mnemonics(self):
+        # carries, single word mnemonics, and growing number of words
+        entropies = (0, 5, 2048 - 3, 2048 * 5 - 2, 2**22 - 100, 2**128 - 1,
+                     2**132 - 50, 0x110aaaa03974d093eda670121023cd0772)
+        for lang in ('en', 'it'):
+            for eversion in ('standard', 'segwit', '2fa'):
+                for e in entropies:
+                    mnemonic = electrum.mnemonic_from_raw_entropy(e, lang, eversion)
+                    self.assertEqual(mnemonic, reference_mnemonic(e, lang, eversion))
+
+        # bulk generation: consecutive versioned mnemonics
+        e = 2**128 - 3000
+        expected = []
+        for _ in range(6):
+            mnemonic = reference_mnemonic(e, 'en', 'standard')
+            expected.append(mnemonic)
+            e = int(electrum.entropy_from_mnemonic(mnemonic, 'en'), 2) + 1
+        for processes in (None, 2):
+            mnemonics = electrum.versioned_mnemonics(2**128 - 3000, 6, 'en',
+                                                     'standard', processes, 512)
+            self.assertEqual(list(mnemonics), expected)
+        self.assertEqual(list(electrum.versioned_mnemonics(0, 0, 'en', 'segwit')), [])
+
+        self.assertRaises(ValueError, list, electrum.versioned_mnemonics(0, 1, 'en', 'std'))
+        self.assertRaises(ValueError, list, electrum.versioned_mnemonics(0, 1, 'en', 'segwit', 2, 0))
+
 
 if __name__ == "__main__":
     # execute only if run as a script
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2019 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+import os
+import tempfile
+import unittest
+
+from btclib import keygen
+from btclib.curve import mult, _aff_from_jac_batch
+from btclib.curves import secp256k1 as ec
+from btclib.utils import octets_from_point
+from btclib.wifaddress import wif_from_prvkey, address_from_pubkey
+
+
+class TestKeygen(unittest.TestCase):
+    def test_mult_base(self):
+        prvkeys = [1, 2, 255, 256, 257, 2**248, ec.n - 1, ec.n // 3]
+        Points = _aff_from_jac_batch(ec, [keygen._mult_base_jac(k) for k in prvkeys])
+        for k, Q in zip(prvkeys, Points):
+            self.assertEqual(Q, mult(ec, k, ec.G))
+
+    def test_keypairs(self):
+        for compressed in (True, False):
+            keypairs = list(keygen.keypairs(7, compressed, chunk_size=3))
+            self.assertEqual(len(keypairs), 7)
+            for kp in keypairs:
+                self.assertTrue(0 < kp.prvkey < ec.n)
+                Q = mult(ec, kp.prvkey, ec.G)
+                self.assertEqual(kp.pubkey, octets_from_point(ec, Q, compressed))
+                self.assertEqual(kp.wif, wif_from_prvkey(kp.prvkey, compressed))
+                self.assertEqual(kp.address, address_from_pubkey(Q, compressed))
+            self.assertEqual(len(set(kp.prvkey for kp in keypairs)), 7)
+
+        # worker processes
+        keypairs = list(keygen.keypairs(5, processes=2, chunk_size=2))
+        self.assertEqual(len(keypairs), 5)
+        for kp in keypairs:
+            Q = mult(ec, kp.prvkey, ec.G)
+            self.assertEqual(kp.address, address_from_pubkey(Q, True))
+
+        self.assertRaises(ValueError, list, keygen.keypairs(5, chunk_size=0))
+
+    def test_write_keypairs(self):
+        fd, filename = tempfile.mkstemp()
+        os.close(fd)
+        os.remove(filename)
+        try:
+            written = keygen.write_keypairs(filename, 5, 'csv', chunk_size=2)
+            self.assertEqual(written, os.path.getsize(filename))
+            if os.name == 'posix':
+                self.assertEqual(os.stat(filename).st_mode & 0o777, 0o600)
+            with open(filename, 'rb') as f:
+                lines = f.read().splitlines()
+            self.assertEqual(len(lines), 5)
+            for line in lines:
+                prv, pub, wif, address = line.split(b',')
+                prvkey = int(prv, 16)
+                self.assertEqual(wif, wif_from_prvkey(prvkey, True))
+                Q = mult(ec, prvkey, ec.G)
+                self.assertEqual(address, address_from_pubkey(Q, True))
+            # fixed width private keys, with leading zeros
+            data = keygen._serialize(keygen._keypairs(1, True, [5]), 'csv')
+            self.assertTrue(data.startswith(b'0' * 63 + b'5,'))
+
+            for compressed in (True, False):
+                keygen.write_keypairs(filename, 5, 'binary', compressed,
+                                      processes=2, chunk_size=2)
+                keypairs = list(keygen.read_keypairs(filename))
+                self.assertEqual(len(keypairs), 5)
+                for kp in keypairs:
+                    Q = mult(ec, kp.prvkey, ec.G)
+                    self.assertEqual(kp.pubkey, octets_from_point(ec, Q, compressed))
+                    self.assertEqual(kp.wif, wif_from_prvkey(kp.prvkey, compressed))
+                    self.assertEqual(kp.address, address_from_pubkey(Q, compressed))
+
+            # truncated file
+            with open(filename, 'rb+') as f:
+                f.truncate(os.path.getsize(filename) - 1)
+            self.assertRaises(ValueError, list, keygen.read_keypairs(filename))
+            # not a binary keypair file
+            keygen.write_keypairs(filename, 1, 'csv')
+            self.assertRaises(ValueError, list, keygen.read_keypairs(filename))
+
+            self.assertRaises(ValueError, keygen.write_keypairs, filename, 1, 'json')
+        finally:
+            os.remove(filename)
+
+
+if __name__ == "__main__":
+    # execute only if run as a script
+    unittest.main()
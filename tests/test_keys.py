@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2019 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+import pickle
+import unittest
+from hashlib import sha256
+
+from btclib import bip32, dsa
+from btclib.curve import mult
+from btclib.curves import secp256k1 as ec
+from btclib.keys import PrivateKey, PublicKey
+from btclib.utils import octets_from_point, h160
+from btclib.wifaddress import wif_from_prvkey, prvkey_from_wif, \
+    address_from_pubkey, address_from_wif, p2wpkh_address_from_pubkey
+
+
+class TestKeys(unittest.TestCase):
+    def test_private_key(self):
+        q = 0xC28FCA386C7A227600B2FE50B7CAE11EC86D3BF1FBE471BE89827E19D72AA1D
+        wif = b'KwdMAjGmerYanjeui5SHS7JkmpZvVipYvB2LJGU1ZxJwYvP98617'
+        uwif = b'5HueCGU8rMjxEXxiPuD5BDku4MkFqeZyd4dZ1jvhTVqvbTLvyTJ'
+
+        key = PrivateKey(q)
+        self.assertEqual(key.wif, wif)
+        self.assertEqual(PrivateKey(q, False).wif, uwif)
+        self.assertEqual(PrivateKey(wif), key)
+        self.assertEqual(PrivateKey(wif.decode()).d, q)
+        # the WIF compression flag overrides the default
+        self.assertEqual(PrivateKey(uwif), PrivateKey(q, False))
+        self.assertNotIn(hex(q)[2:], repr(key))
+
+        Q = mult(ec, q, ec.G)
+        self.assertEqual(key.Q, Q)
+        # cached
+        self.assertIs(key.public_key, key.public_key)
+        self.assertIs(key.address(), key.address())
+        self.assertEqual(key.address(), address_from_pubkey(Q, True))
+
+        self.assertRaises(ValueError, PrivateKey, 0)
+        self.assertRaises(ValueError, PrivateKey, ec.n)
+        self.assertRaises(ValueError, PrivateKey, b'1111111111111111111114oLvT2')
+
+        # pickling
+        self.assertEqual(pickle.loads(pickle.dumps(key)), key)
+
+    def test_public_key(self):
+        Q = mult(ec, 1, ec.G)
+        pubkey = octets_from_point(ec, Q, True)
+        upubkey = octets_from_point(ec, Q, False)
+
+        P = PublicKey(pubkey)
+        self.assertTrue(P.compressed)
+        self.assertEqual(P.Q, Q)
+        self.assertIs(P.sec(), pubkey)
+        self.assertEqual(P.sec(False), upubkey)
+        self.assertIs(P.sec(False), P.sec(False))
+        self.assertEqual(P.h160, h160(pubkey))
+        self.assertEqual(P.address(), address_from_pubkey(Q, True))
+        self.assertEqual(P.address(b'\x6f'), address_from_pubkey(Q, True, b'\x6f'))
+        self.assertEqual(PublicKey(Q), P)
+        self.assertEqual(PublicKey(pubkey.hex()), P)
+        self.assertEqual(hash(PublicKey(Q)), hash(P))
+
+        U = PublicKey(upubkey)
+        self.assertFalse(U.compressed)
+        self.assertEqual(U.h160, h160(upubkey))
+        self.assertNotEqual(U, P)
+        self.assertEqual(PublicKey(Q, False), U)
+
+        self.assertRaises(ValueError, PublicKey, b'\x05' + pubkey[1:])
+        self.assertRaises(ValueError, PublicKey, (1, 1))
+        self.assertRaises(ValueError, PublicKey, ec._validated())
+        # ValidatedPoints without ec are validated again
+        V = ec._validated(Q[0], Q[1])
+        self.assertEqual(PublicKey(V._replace()).Q, Q)
+        self.assertRaises(ValueError, PublicKey, V._replace(y=Q[1] + 1))
+
+    def test_fast_paths(self):
+        q = 0xC28FCA386C7A227600B2FE50B7CAE11EC86D3BF1FBE471BE89827E19D72AA1D
+        Q = mult(ec, q, ec.G)
+        for compressed in (True, False):
+            key = PrivateKey(q, compressed)
+            wif = wif_from_prvkey(q, compressed)
+            self.assertEqual(wif_from_prvkey(key, compressed), wif)
+            self.assertEqual(wif_from_prvkey(key, not compressed),
+                             wif_from_prvkey(q, not compressed))
+            self.assertEqual(prvkey_from_wif(key), (q, compressed))
+            self.assertEqual(address_from_wif(key), address_from_wif(wif))
+            P = key.public_key
+            for c in (True, False):
+                self.assertEqual(address_from_pubkey(P, c),
+                                 address_from_pubkey(Q, c))
+            if compressed:
+                self.assertEqual(p2wpkh_address_from_pubkey(key),
+                                 p2wpkh_address_from_pubkey(Q))
+                self.assertEqual(p2wpkh_address_from_pubkey(P),
+                                 p2wpkh_address_from_pubkey(Q))
+            else:
+                # segwit v0 requires the compressed public key
+                self.assertRaises(ValueError, p2wpkh_address_from_pubkey, key)
+                self.assertRaises(ValueError, p2wpkh_address_from_pubkey, P)
+
+        # dsa
+        key = PrivateKey(q)
+        msg = 'Satoshi Nakamoto'.encode()
+        sig = dsa.sign(ec, sha256, msg, key)
+        self.assertEqual(sig, dsa.sign(ec, sha256, msg, q))
+        self.assertTrue(dsa.verify(ec, sha256, msg, key.public_key, sig))
+        self.assertFalse(dsa.verify(ec, sha256, msg + b'!', key.public_key, sig))
+
+        # bip32
+        xprv = b"xprv9s21ZrQH143K3QTDL4LXw2F7HEK3wJUD2nW2nRk4stbPy6cq3jPPqjiChkVvvNKmPGJxWUtg6LnF5kejMRNNU3TGtRBeJgk33yuGBxrMPHi"
+        xkey = bip32.ExtendedKey.from_xkey(xprv)
+        prv = xkey.private_key()
+        self.assertEqual(prv.d, xkey.prvkey)
+        self.assertEqual(prv.Q, xkey.Q)
+        self.assertIs(xkey.private_key().Q, xkey.Q)
+        xpub = bip32.ExtendedKey.from_xkey(bip32.xpub_from_xprv(xprv))
+        P = xpub.public_key()
+        self.assertEqual(P.sec(), xpub.key)
+        self.assertIs(P.Q, xpub.Q)
+        self.assertEqual(P.address(), bip32.address_from_xpub(xpub.xkey()))
+        self.assertEqual(xkey.public_key(), P)
+
+
+if __name__ == "__main__":
+    # execute only if run as a script
+    unittest.main()
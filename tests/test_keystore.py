@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2019 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+import os
+import tempfile
+import unittest
+from hashlib import pbkdf2_hmac
+
+from btclib import bip32
+from btclib.keystore import KeyStore, MAGIC, BLOCK_RECORDS, BLOCK_SIZE, \
+    JOURNAL_SUFFIX
+from btclib.curves import secp256k1 as ec
+from btclib.utils import h160
+
+
+class TestKeyStore(unittest.TestCase):
+    def test_keystore(self):
+        mprv = b"xprv9s21ZrQH143K3QTDL4LXw2F7HEK3wJUD2nW2nRk4stbPy6cq3jPPqjiChkVvvNKmPGJxWUtg6LnF5kejMRNNU3TGtRBeJgk33yuGBxrMPHi"
+        xprv = bip32.derive(mprv, "m/44'/0'/0'/0")
+        xpub = bip32.xpub_from_xprv(xprv)
+        path = [0x8000002C, 0x80000000, 0x80000000, 0]
+        key = pbkdf2_hmac('sha256', b'password', b'salt', 1)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, 'keys.bin')
+            with KeyStore(filename, key) as store:
+                self.assertEqual(len(store), 0)
+                store.append_range(xprv, path, 0, 3)
+                n = BLOCK_RECORDS + 5
+                store.append_range(xpub, path, 3, n)
+                self.assertEqual(len(store), 3 + n)
+                self.assertEqual(store.verify(), [])
+                if os.name == 'posix':
+                    mode = os.stat(filename).st_mode & 0o777
+                    self.assertEqual(mode, 0o600)
+                # invalid private keys
+                pubkey = store.pubkey(0)
+                self.assertRaises(ValueError, store.append, [0], pubkey, 0)
+                self.assertRaises(ValueError, store.append, [0], pubkey, ec.n)
+                self.assertEqual(len(store), 3 + n)
+
+            # reload, without re-deriving
+            with KeyStore(filename, key) as store:
+                self.assertEqual(len(store), 3 + n)
+                for i in (0, 2, 3, BLOCK_RECORDS, n + 2):
+                    child = bip32.ckd(xprv, i)
+                    pubkey = bip32.ExtendedKey.from_xkey(child).pubkey
+                    record = store[i]
+                    self.assertEqual(record.path, path + [i])
+                    self.assertEqual(record.pubkey, pubkey)
+                    self.assertEqual(record.h160, h160(pubkey))
+                    self.assertEqual(store.pubkey(i), pubkey)
+                    self.assertEqual(store.h160(i), h160(pubkey))
+                    if i < 3:
+                        prvkey = bip32.ExtendedKey.from_xkey(child).prvkey
+                        self.assertEqual(record.prvkey, prvkey)
+                    else:
+                        self.assertIsNone(record.prvkey)
+                self.assertRaises(IndexError, store.__getitem__, 3 + n)
+                store.extend([])
+                self.assertEqual(len(store), 3 + n)
+
+            # a wrong store key is detected, not silently used
+            with KeyStore(filename, b'wrong') as store:
+                for i in (0, 1, 2):
+                    self.assertRaises(ValueError, store.__getitem__, i)
+                self.assertIsNone(store[3].prvkey)
+
+            # private keys are encrypted
+            with KeyStore(filename) as store:
+                self.assertRaises(ValueError, store.__getitem__, 0)
+                self.assertIsNone(store[3].prvkey)
+                pubkey = store.pubkey(0)
+                self.assertRaises(ValueError, store.append, [0], pubkey, 1)
+                # invalid records
+                self.assertRaises(ValueError, store.append, [0]*9, pubkey)
+                self.assertRaises(ValueError, store.append, [0], pubkey[1:])
+
+            # corrupted block
+            with open(filename, 'r+b') as f:
+                f.seek(len(MAGIC) + BLOCK_SIZE + 40)
+                f.write(b'\xff')
+            with KeyStore(filename, key) as store:
+                self.assertEqual(store.verify(), [1])
+                self.assertEqual(store[0].path, path + [0])
+                self.assertRaises(ValueError, store.__getitem__, BLOCK_RECORDS)
+                # the corrupted partial block is not refilled
+                pubkey = store.pubkey(0)
+                self.assertRaises(ValueError, store.append, [0], pubkey)
+
+            # invalid key stores
+            with open(filename, 'wb') as f:
+                f.write(MAGIC + b'\x00')
+            self.assertRaises(ValueError, KeyStore, filename)
+            with open(filename, 'wb') as f:
+                f.write(b'\x00' * (len(MAGIC) + BLOCK_SIZE))
+            self.assertRaises(ValueError, KeyStore, filename)
+
+
+    def test_interrupted_append(self):
+        xpub = b"xpub6ERApfZwUNrhLCkDtcHTcxd75RbzS1ed54G1LkBUHQVHQKqhMkhgbmJbZRkrgZw4koxb5JaHWkY4ALHY2grBGRjaDMzQLcgJvLJuZZvRcEL"
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, 'keys.bin')
+            journal = filename + JOURNAL_SUFFIX
+            with KeyStore(filename) as store:
+                store.append_range(xpub, [], 0, BLOCK_RECORDS + 3)
+                self.assertFalse(os.path.exists(journal))
+                expected = [store.h160(i) for i in range(len(store))]
+                # an append interrupted after writing the journal
+                store._journal()
+            with open(filename, 'r+b') as f:
+                f.seek(len(MAGIC) + BLOCK_SIZE + 40)
+                f.write(b'\xff' * 100)
+                f.seek(0, os.SEEK_END)
+                f.write(b'\x00' * (BLOCK_SIZE // 2))
+            with KeyStore(filename) as store:
+                self.assertFalse(os.path.exists(journal))
+                self.assertEqual(store.verify(), [])
+                self.assertEqual([store.h160(i) for i in range(len(store))],
+                                 expected)
+                store.append_range(xpub, [], BLOCK_RECORDS + 3, 1)
+                self.assertEqual(len(store), BLOCK_RECORDS + 4)
+
+            # an incomplete journal: the store was not modified yet
+            with open(journal, 'wb') as f:
+                f.write(b'\x00' * 50)
+            with KeyStore(filename) as store:
+                self.assertFalse(os.path.exists(journal))
+                self.assertEqual(len(store), BLOCK_RECORDS + 4)
+                self.assertEqual(store.verify(), [])
+
+
+if __name__ == "__main__":
+    # execute only if run as a script
+    unittest.main()
@@ -72,12 +72,36 @@ class TestMnemonicDictionaries(unittest.TestCase):
                                 "data",
                                 "english.txt")
         mnemonic_dict._load_lang(lang, filename)
+        self.assertNotIn("fakeng", mnemonic_dict.languages)
         test_indexes = [0,    0, 2047, 2047, 2047, 2047,
                         2047, 2047, 2047, 2047, 2047,    0]
         entropy = mnemonic_dict.entropy_from_indexes(test_indexes, lang)
         indexes = mnemonic_dict.indexes_from_entropy(entropy, lang)
         self.assertEqual(indexes, test_indexes)
 
+    def test_lookups(self):
+        for lang in ("en", "it"):
+            words = mnemonic_dict.word_list(lang)
+            mnemonic = ' '.join(words[::-100])
+            indexes = list(range(2047, -1, -100))
+            self.assertEqual(mnemonic_dict.indexes_from_mnemonic(mnemonic, lang), indexes)
+            # language auto-detection
+            self.assertEqual(mnemonic_dict.detect_language(mnemonic), lang)
+            self.assertEqual(mnemonic_dict.indexes_from_mnemonic(mnemonic), indexes)
+            # prefix lookup
+            for i, word in enumerate(words):
+                self.assertEqual(mnemonic_dict.index_from_prefix(word[:4], lang), i)
+                self.assertEqual(mnemonic_dict.index_from_prefix(word, lang), i)
+
+        self.assertEqual(mnemonic_dict.index_from_prefix("abso", "en"), 6)
+        self.assertRaises(ValueError, mnemonic_dict.index_from_prefix, "abs", "en")
+        self.assertRaises(ValueError, mnemonic_dict.index_from_prefix, "absx", "en")
+        self.assertRaises(ValueError, mnemonic_dict.index_from_prefix, "absolutely", "en")
+
+        self.assertRaises(ValueError, mnemonic_dict.indexes_from_mnemonic, "abandon notaword", "en")
+        self.assertRaises(ValueError, mnemonic_dict.detect_language, "abandon abaco")
+        self.assertRaises(ValueError, mnemonic_dict.detect_language, "")
+
 
 if __name__ == "__main__":
     # execute only if run as a script
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2019 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+import os
+import tempfile
+import unittest
+
+from btclib import base58, bip32, bip39, electrum
+from btclib.recovery import MnemonicRecovery, PassphraseRecovery, \
+    word_candidates, passphrase_candidates, RULES, _parse_target, _match
+from btclib.wifaddress import p2wpkh_address_from_pubkey
+
+mnemonic = bip39.mnemonic_from_raw_entropy(b'\x5a' * 16, 'en')
+seed = bip39.seed_from_mnemonic(mnemonic, '')
+mprv = bip32.xmprv_from_seed(seed, bip32.MAINNET_PRV)
+xpub = bip32.xpub_from_xprv(bip32.derive(mprv, "m/44'/0'/0'"))
+address = bip32.address_from_xpub(
+    bip32.xpub_from_xprv(bip32.derive(mprv, "m/44'/0'/0'/0/2")))
+
+
+class TestRecovery(unittest.TestCase):
+    def test_match(self):
+        segwit = bip32.xpub_from_xprv(bip32.derive(mprv, "m/84'/0'/0'/0/1"))
+        segwit = p2wpkh_address_from_pubkey(bip32.ExtendedKey.from_xkey(segwit))
+        targets = (address, xpub, segwit, mprv, bip32.xpub_from_xprv(mprv))
+        for target in targets:
+            self.assertTrue(_match(seed, _parse_target(target, None, 3)))
+        # beyond the gap
+        self.assertFalse(_match(seed, _parse_target(address, None, 2)))
+        other = bip39.seed_from_mnemonic(mnemonic, 'passphrase')
+        for target in targets:
+            self.assertFalse(_match(other, _parse_target(target)))
+        # explicit path
+        target = _parse_target(address, "m/44'/0'/0'/0", 3)
+        self.assertTrue(_match(seed, target))
+        target = _parse_target(xpub, "m/44'/0'/1'")
+        self.assertFalse(_match(seed, target))
+
+        # invalid targets
+        self.assertRaises(ValueError, _parse_target, address, None, 0)
+        self.assertRaises(ValueError, _parse_target, xpub, "m/44'/0'")
+        self.assertRaises(ValueError, _parse_target, address, "./0")
+        xkey = bip32.xpub_from_xprv(bip32.derive(mprv, "m/0'/1"))
+        self.assertRaises(ValueError, _parse_target, xkey)
+        self.assertRaises(ValueError, _parse_target,
+                          'bc1zw508d6qejxtdg4y5r3zarvaryvaxxpcs')
+        p2sh = base58.encode_check(b'\x05' + b'\x00' * 20)
+        self.assertRaises(ValueError, _parse_target, p2sh)
+        self.assertRaises(ValueError, _parse_target,
+                          base58.encode_check(b'\x00' * 32))
+
+    def test_word_candidates(self):
+        self.assertEqual(word_candidates('abandon'), ['abandon'])
+        self.assertEqual(word_candidates('abandn'), ['abandon'])
+        self.assertEqual(word_candidates('zoox'), ['zoo'])
+        # 4-letter prefix
+        self.assertIn('absorb', word_candidates('absorbxx'))
+        self.assertIn('cat', word_candidates('bat', max_distance=1))
+        self.assertEqual(word_candidates('qqqqqqqq'), [])
+
+    def test_search(self):
+        words = mnemonic.split()
+
+        # missing last word, extended key target
+        template = words[:-1] + ['?']
+        r = MnemonicRecovery(template, xpub)
+        self.assertEqual(r.total, 128)
+        self.assertEqual(r.search(), mnemonic)
+        self.assertGreater(r.rate, 0)
+
+        # missing word and misspelled word, address target
+        template = list(words)
+        template[3] = '?'
+        template[5] = words[5][:-1] + 'x'
+        r = MnemonicRecovery(' '.join(template), address, gap=3,
+                             shard_size=256)
+        self.assertEqual(r.search(), mnemonic)
+        self.assertLess(r.survivors, r.done)
+
+        # explicit candidates, multiple processes
+        template = list(words)
+        template[0] = ['abandon', words[0], 'zoo']
+        template[7] = '?'
+        progress = []
+        r = MnemonicRecovery(template, xpub, shard_size=512)
+        self.assertEqual(r.total, 3 * 2048)
+        found = r.search(2, callback=lambda r: progress.append(r.done))
+        self.assertEqual(found, mnemonic)
+        self.assertEqual(progress, list(range(512, r.done + 1, 512)))
+
+        # not found
+        template = words[:-1] + ['?']
+        r = MnemonicRecovery(template, xpub, passphrase='passphrase')
+        self.assertIsNone(r.search())
+        self.assertEqual(r.done, r.total)
+
+        # invalid templates
+        self.assertRaises(ValueError, MnemonicRecovery, words[:-1], xpub)
+        template = words[:-1] + ['qqqqqqqq']
+        self.assertRaises(ValueError, MnemonicRecovery, template, xpub)
+        template = words[:-1] + [['qqqqqqqq']]
+        self.assertRaises(ValueError, MnemonicRecovery, template, xpub)
+        self.assertRaises(ValueError, MnemonicRecovery, words, xpub,
+                          shard_size=0)
+
+    def test_checkpoint(self):
+        fd, filename = tempfile.mkstemp()
+        os.close(fd)
+        os.remove(filename)
+        try:
+            template = mnemonic.split()
+            template[0] = '?'
+            r = MnemonicRecovery(template, xpub, shard_size=256,
+                                 checkpoint=filename)
+            self.assertIsNone(r.search(max_candidates=512))
+            self.assertEqual(r.done, 512)
+            # secrets are not stored in clear, owner-only permissions
+            with open(filename) as f:
+                content = f.read()
+            self.assertNotIn(template[1], content)
+            if os.name == 'posix':
+                self.assertEqual(os.stat(filename).st_mode & 0o777, 0o600)
+
+            # resume
+            r2 = MnemonicRecovery(template, xpub, shard_size=256,
+                                  checkpoint=filename)
+            self.assertEqual(r2.done, 512)
+            self.assertEqual(r2.survivors, r.survivors)
+            self.assertEqual(r2.search(), mnemonic)
+
+            # checkpoint of a different recovery
+            self.assertRaises(ValueError, MnemonicRecovery, template, xpub,
+                              passphrase='passphrase', checkpoint=filename)
+            other = list(template)
+            other[1] = template[2]
+            self.assertRaises(ValueError, MnemonicRecovery, other, xpub,
+                              checkpoint=filename)
+        finally:
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    def test_passphrase_candidates(self):
+        words = ['Secret\n', 'pass', 'secret']
+        self.assertEqual(list(passphrase_candidates(words)),
+                         ['Secret', 'pass', 'secret'])
+        candidates = list(passphrase_candidates(words, ['case']))
+        self.assertEqual(candidates, ['Secret', 'secret', 'SECRET',
+                                      'pass', 'PASS', 'Pass'])
+        candidates = list(passphrase_candidates(['pass'], RULES))
+        self.assertEqual(len(candidates), len(set(candidates)))
+        for c in ('pass', 'Pass5', 'P455', 'p455!', 'PASS07'):
+            self.assertIn(c, candidates)
+        # bounded deduplication memory
+        words2 = ['a', 'b', 'a', 'a']
+        self.assertEqual(list(passphrase_candidates(words2)), ['a', 'b'])
+        self.assertEqual(list(passphrase_candidates(words2, (), 1)),
+                         ['a', 'b', 'a'])
+        self.assertRaises(ValueError, list,
+                          passphrase_candidates(words, ['unknown']))
+        self.assertRaises(ValueError, list,
+                          passphrase_candidates(words, (), 0))
+
+    def test_passphrase_search(self):
+        words = ['Secret', 'password', 'satoshi', 'bitcoin']
+        passphrase = 'Secret7'
+        seed = bip39.seed_from_mnemonic(mnemonic, passphrase)
+        xprv = bip32.xmprv_from_seed(seed, bip32.MAINNET_PRV)
+        xprv = bip32.derive(xprv, "m/44'/0'/0'/0/1")
+        target = bip32.address_from_xpub(bip32.xpub_from_xprv(xprv))
+        r = PassphraseRecovery(mnemonic, target, words, ['case', 'digits'],
+                               gap=2, batch_size=16)
+        self.assertEqual(r.search(), passphrase)
+        self.assertGreater(r.rate, 0)
+        self.assertLessEqual(r.survivors, r.done)
+        # not found without digits
+        r = PassphraseRecovery(mnemonic, target, words, ['case'], gap=2)
+        self.assertIsNone(r.search())
+        self.assertEqual(r.done, 12)
+
+        # electrum, standard and segwit
+        for eversion in ('standard', 'segwit'):
+            emnemonic = electrum.mnemonic_from_raw_entropy(0x5a5a5a, 'en',
+                                                           eversion)
+            passphrase = 'bitcoin!'
+            xprv = electrum.mprv_from_mnemonic(emnemonic, passphrase,
+                                               bip32.MAINNET_PRV)
+            xkey = bip32.ExtendedKey.from_xkey(bip32.derive(xprv, './0/0'))
+            if eversion == 'standard':
+                target = bip32.address_from_xpub(
+                    bip32.xpub_from_xprv(xkey.xkey()))
+            else:
+                target = p2wpkh_address_from_pubkey(xkey)
+            r = PassphraseRecovery(emnemonic, target, words, ['symbols'],
+                                   'electrum', batch_size=4)
+            self.assertEqual(r.search(2), passphrase)
+
+        # invalid parameters
+        invalid = mnemonic.split()[:-1] + ['abandon']
+        self.assertRaises(ValueError, PassphraseRecovery, ' '.join(invalid),
+                          target, words)
+        self.assertRaises(ValueError, PassphraseRecovery, mnemonic, xpub,
+                          words, scheme='unknown')
+        self.assertRaises(ValueError, PassphraseRecovery, mnemonic, xpub,
+                          words, ['unknown'])
+        self.assertRaises(ValueError, PassphraseRecovery, mnemonic, xpub,
+                          words, batch_size=0)
+
+    def test_passphrase_checkpoint(self):
+        fd, filename = tempfile.mkstemp()
+        os.close(fd)
+        os.remove(filename)
+        try:
+            words = ['password', 'satoshi', 'secret', 'bitcoin', '']
+            r = PassphraseRecovery(mnemonic, xpub, words, ['case'],
+                                   batch_size=4, checkpoint=filename)
+            self.assertIsNone(r.search(max_candidates=4))
+            self.assertEqual(r.done, 4)
+            with open(filename) as f:
+                self.assertNotIn(mnemonic.split()[0], f.read())
+
+            # resume
+            r2 = PassphraseRecovery(mnemonic, xpub, words, ['case'],
+                                    batch_size=4, checkpoint=filename)
+            self.assertEqual(r2.done, 4)
+            self.assertEqual(r2.search(), '')
+            self.assertEqual(r2.done, 13)
+
+            # checkpoint of a different recovery
+            self.assertRaises(ValueError, PassphraseRecovery, mnemonic, xpub,
+                              words, checkpoint=filename)
+            other = bip39.mnemonic_from_raw_entropy(b'\xa5' * 16, 'en')
+            self.assertRaises(ValueError, PassphraseRecovery, other, xpub,
+                              words, ['case'], checkpoint=filename)
+            self.assertRaises(ValueError, MnemonicRecovery, mnemonic, xpub,
+                              checkpoint=filename)
+        finally:
+            if os.path.exists(filename):
+                os.remove(filename)
+
+
+if __name__ == "__main__":
+    # execute only if run as a script
+    unittest.main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2019 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+import os
+import tempfile
+import unittest
+
+from btclib import bip32
+from btclib.rescan import Scanner, Match, h160_from_output
+
+
+class TestRescan(unittest.TestCase):
+    def test_h160_from_output(self):
+        h = bytes(range(20))
+        self.assertEqual(h160_from_output('76a914' + h.hex() + '88ac'), h)
+        self.assertEqual(h160_from_output(b'0014' + h.hex().encode()), h)
+        addr = b'1111111111111111111114oLvT2'
+        self.assertEqual(h160_from_output(addr), b'\x00'*20)
+        self.assertEqual(h160_from_output(addr + b'\n'), b'\x00'*20)
+        addr = 'BC1QW508D6QEJXTDG4Y5R3ZARVARY0C5XW7KV8F3T4'
+        h = bytes.fromhex('751e76e8199196d454941c45d1b3a323f1433bd6')
+        self.assertEqual(h160_from_output(addr), h)
+        self.assertIsNone(h160_from_output(b'0014' + b'zz'*20))
+        self.assertIsNone(h160_from_output(b'not an address'))
+        self.assertIsNone(h160_from_output(b''))
+
+    def test_scanner(self):
+        mprv = b"xprv9s21ZrQH143K3QTDL4LXw2F7HEK3wJUD2nW2nRk4stbPy6cq3jPPqjiChkVvvNKmPGJxWUtg6LnF5kejMRNNU3TGtRBeJgk33yuGBxrMPHi"
+        xpubs = [bip32.xpub_from_xprv(bip32.derive(mprv, f"m/44'/0'/{a}'"))
+                 for a in range(2)]
+        gap = 3
+
+        def address(a, c, i):
+            return bip32.address_from_xpub(bip32.derive(xpubs[a], f"./{c}/{i}"))
+
+        h = bip32.derive_range(bip32.derive(xpubs[1], "./0"), 2, 1, 'h160')[0]
+        items = [
+            b'garbage',
+            address(0, 0, 2),
+            address(0, 0, 5),   # only reachable after the previous hit
+            address(0, 1, 3),   # beyond the gap limit: not found
+            address(0, 0, 8),
+            '76a914' + h.hex() + '88ac',
+        ]
+        expected = [
+            Match(1, items[1], 0, 0, 2),
+            Match(2, items[2], 0, 0, 5),
+            Match(4, items[4], 0, 0, 8),
+            Match(5, items[5].encode(), 1, 0, 2),
+        ]
+
+        scanner = Scanner(xpubs, gap_limit=gap)
+        self.assertEqual(len(scanner), 2*2*gap)
+        self.assertEqual(list(scanner.scan(items)), expected)
+        # (0, 0) window extended up to 12, (1, 0) up to 6
+        self.assertEqual(len(scanner), 12 + 6 + gap + gap)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, 'outputs.txt')
+            with open(filename, 'wb') as f:
+                for item in items:
+                    item = item.encode() if isinstance(item, str) else item
+                    f.write(item + b'\n')
+            scanner = Scanner(xpubs, gap_limit=gap)
+            self.assertEqual(list(scanner.scan_file(filename)), expected)
+            scanner = Scanner(xpubs, gap_limit=gap)
+            matches = scanner.scan_file(filename, processes=2, chunk_size=2)
+            self.assertEqual(list(matches), expected)
+
+        self.assertRaises(ValueError, Scanner, xpubs, gap_limit=0)
+
+
+if __name__ == "__main__":
+    # execute only if run as a script
+    unittest.main()
@@ -10,6 +10,7 @@
 
 import random
 import unittest
+from unittest import mock
 from hashlib import sha256 as hf
 from typing import List
 
@@ -351,6 +352,196 @@ class TestEcssa(unittest.TestCase):
         self.assertRaises(ValueError, ssa._batch_verify, ec, hf, m, Q, sig)
         #ssa._batch_verify(ec, hf, m, Q, sig)
 
+    def test_batch_verify_detailed(self):
+        ec = secp256k1
+        hsize = hf().digest_size
+        hlen = hsize * 8
+        m = []
+        sig = []
+        Q = []
+        for i in range(9):
+            m.append(random.getrandbits(hlen).to_bytes(hsize, 'big'))
+            q = (1+random.getrandbits(ec.nlen)) % ec.n
+            sig.append(ssa.sign(ec, hf, m[i], q))
+            Q.append(mult(ec, q, ec.G))
+        self.assertEqual(ssa.batch_verify_detailed(ec, hf, m, Q, sig), [])
+
+        # invalid signatures
+        sig[2] = sig[3]
+        sig[7] = sig[8]
+        # invalid 31 bytes message
+        m[5] = m[5][:-1]
+        self.assertEqual(ssa.batch_verify_detailed(ec, hf, m, Q, sig),
+                         [2, 5, 7])
+        self.assertFalse(ssa.batch_verify(ec, hf, m, Q, sig))
+
+        # single invalid signature
+        self.assertEqual(ssa.batch_verify_detailed(ec, hf, m[2:3], Q[2:3], sig[2:3]), [0])
+
+        # infinite public key: forged signature (x(kG), k)
+        msg = hf(b'forged').digest()
+        for k in range(1, 5):
+            fsig = (mult(ec, k, ec.G)[0], k)
+            self.assertFalse(ssa.verify(ec, hf, msg, Point(), fsig))
+            self.assertFalse(ssa.batch_verify(ec, hf, [msg], [Point()], [fsig]))
+            self.assertEqual(ssa.batch_verify_detailed(ec, hf, [msg], [Point()], [fsig]), [0])
+            self.assertFalse(ssa.batch_verify(ec, hf, [msg] + m[:2], [Point()] + Q[:2], [fsig] + sig[:2]))
+            self.assertEqual(ssa.batch_verify_detailed(ec, hf, [msg] + m[:2], [Point()] + Q[:2], [fsig] + sig[:2]), [0])
+        self.assertEqual(ssa.batch_verify_detailed(ec, hf, [], [], []), [])
+
+        # mismatch between number of pubkeys and number of messages
+        self.assertRaises(ValueError, ssa.batch_verify_detailed, ec, hf, m[1:], Q, sig)
+        # mismatch between number of pubkeys and number of signatures
+        self.assertRaises(ValueError, ssa.batch_verify_detailed, ec, hf, m, Q, sig[1:])
+        # curve prime p must be equal to 3 (mod 4)
+        ec = secp224k1
+        self.assertRaises(ValueError, ssa.batch_verify_detailed, ec, hf, m, Q, sig)
+
+    def test_bip340(self):
+        """BIP340 test vectors
+
+           https://github.com/bitcoin/bips/blob/master/bip-0340/test-vectors.csv
+        """
+        ec = secp256k1
+        tv = [
+            (0x3,
+             "F9308A019258C31049344F85F89D5229B531C845836F99B08601F113BCE036F9",
+             "0000000000000000000000000000000000000000000000000000000000000000",
+             "0000000000000000000000000000000000000000000000000000000000000000",
+             "E907831F80848D1069A5371B402410364BDF1C5F8307B0084C55F1CE2DCA8215",
+             "25F66A4A85EA8B71E482A74F382D2CE5EBEEE8FDB2172F477DF4900D310536C0"),
+            (0xB7E151628AED2A6ABF7158809CF4F3C762E7160F38B4DA56A784D9045190CFEF,
+             "DFF1D77F2A671C5F36183726DB2341BE58FEAE1DA2DECED843240F7B502BA659",
+             "0000000000000000000000000000000000000000000000000000000000000001",
+             "243F6A8885A308D313198A2E03707344A4093822299F31D0082EFA98EC4E6C89",
+             "6896BD60EEAE296DB48A229FF71DFE071BDE413E6D43F917DC8DCF8C78DE3341",
+             "8906D11AC976ABCCB20B091292BFF4EA897EFCB639EA871CFA95F6DE339E4B0A"),
+        ]
+        for d, x, aux, msg, r, s in tv:
+            x = bytes.fromhex(x)
+            aux = bytes.fromhex(aux)
+            msg = bytes.fromhex(msg)
+            self.assertEqual(ssa.xonly_pubkey(ec, d), int_from_octets(x))
+            sig = ssa.bip340_sign(ec, msg, d, aux)
+            self.assertEqual(sig, (int(r, 16), int(s, 16)))
+            self.assertTrue(ssa.bip340_verify(ec, msg, x, sig))
+            self.assertTrue(ssa.bip340_verify(ec, msg, int_from_octets(x), sig))
+            self.assertTrue(ssa._bip340_verify(ec, msg, x, sig))
+            fsig = sig[0], (sig[1] + 1) % ec.n
+            self.assertFalse(ssa.bip340_verify(ec, msg, x, fsig))
+            fmsg = hf('Craig Wright'.encode()).digest()
+            self.assertFalse(ssa.bip340_verify(ec, fmsg, x, sig))
+
+        # the tag midstate is cached and reused
+        self.assertIn("BIP0340/challenge", ssa._tag_midstates)
+        data = b'tagged data'
+        tag = hf(b'test tag').digest()
+        self.assertEqual(ssa.tagged_hash('test tag', data),
+                         hf(tag + tag + data).digest())
+
+        msg = bytes(32)
+        # r not in [0, p-1]
+        self.assertRaises(ValueError, ssa._bip340_verify, ec, msg, 1, (ec._p, 1))
+        # invalid 31 bytes message
+        self.assertRaises(ValueError, ssa.bip340_sign, ec, msg[:-1], 1)
+        # invalid 31 bytes auxiliary random data
+        self.assertRaises(ValueError, ssa.bip340_sign, ec, msg, 1, msg[:-1])
+        # private key not in [1, n-1]
+        self.assertRaises(ValueError, ssa.bip340_sign, ec, msg, 0)
+        self.assertRaises(ValueError, ssa.xonly_pubkey, ec, ec.n)
+
+        # k' = int(rand) mod n
+        tagged_hash = ssa.tagged_hash
+
+        def nonce(value):
+            def f(tag, *data):
+                if tag == "BIP0340/nonce":
+                    return value.to_bytes(32, 'big')
+                return tagged_hash(tag, *data)
+            return f
+
+        with mock.patch.object(ssa, 'tagged_hash', nonce(ec.n)):
+            self.assertRaises(ValueError, ssa.bip340_sign, ec, msg, 1)
+        with mock.patch.object(ssa, 'tagged_hash', nonce(ec.n + 1)):
+            sig = ssa.bip340_sign(ec, msg, 1)
+        self.assertEqual(sig[0], ec.G[0])
+        self.assertTrue(ssa.bip340_verify(ec, msg, ssa.xonly_pubkey(ec, 1),
+                                          sig))
+
+    def test_batch_verifier(self):
+        ec = secp256k1
+        hsize = hf().digest_size
+        hlen = hsize * 8
+        m = []
+        sig = []
+        Q = []
+        for i in range(7):
+            m.append(random.getrandbits(hlen).to_bytes(hsize, 'big'))
+            q = (1+random.getrandbits(ec.nlen)) % ec.n
+            sig.append(ssa.sign(ec, hf, m[i], q))
+            Q.append(mult(ec, q, ec.G))
+
+        bv = ssa.BatchVerifier(ec, hf, 3)
+        for i in range(7):
+            self.assertEqual(bv.add(m[i], Q[i], sig[i]), i)
+        self.assertEqual(bv.finalize(), [])
+        self.assertEqual(bv.count, 7)
+
+        # invalid signatures, in the first flushed batch and in the last one
+        sig[1] = sig[0]
+        sig[6] = sig[5]
+        # invalid 31 bytes message
+        m[3] = m[3][:-1]
+        bv = ssa.BatchVerifier(ec, hf, 3)
+        for i in range(7):
+            bv.add(m[i], Q[i], sig[i])
+        self.assertEqual(bv.finalize(), [1, 3, 6])
+
+        # zero latency budget: flush at every add
+        bv = ssa.BatchVerifier(ec, hf, 100, 0)
+        for i in range(3):
+            bv.add(m[i], Q[i], sig[i])
+        self.assertEqual(bv.invalid, [1])
+        self.assertTrue(bv.flush())
+        self.assertEqual(bv.finalize(), [1])
+
+        # latency budget checked by poll, without further add
+        clock = [1000.0]
+        with mock.patch.object(ssa.time, 'monotonic', lambda: clock[0]):
+            bv = ssa.BatchVerifier(ec, hf, 100, 0.01)
+            bv.add(m[0], Q[0], sig[0])
+            bv.add(m[1], Q[1], sig[1])
+            self.assertEqual(bv.invalid, [])
+            self.assertTrue(bv.poll())
+            clock[0] += 0.02
+            # pending has no side effects
+            self.assertEqual(bv.pending, 2)
+            self.assertEqual(bv.invalid, [])
+            self.assertFalse(bv.poll())
+            self.assertEqual(bv.pending, 0)
+            self.assertEqual(bv.invalid, [1])
+            self.assertTrue(bv.poll())
+        bv = ssa.BatchVerifier(ec, hf, 100)
+        bv.add(m[0], Q[0], sig[0])
+        self.assertEqual(bv.pending, 1)
+
+        # infinite public key: forged signature (x(kG), k)
+        msg = hf(b'forged').digest()
+        for k in range(1, 5):
+            fsig = (mult(ec, k, ec.G)[0], k)
+            self.assertFalse(ssa.verify(ec, hf, msg, Point(), fsig))
+            bv = ssa.BatchVerifier(ec, hf, 3)
+            bv.add(msg, Point(), fsig)
+            self.assertEqual(bv.finalize(), [0])
+            bv = ssa.BatchVerifier(ec, hf, 3)
+            bv.add(m[0], Q[0], sig[0])
+            bv.add(msg, Point(), fsig)
+            self.assertEqual(bv.finalize(), [1])
+
+        self.assertRaises(ValueError, ssa.BatchVerifier, ec, hf, 0)
+        # curve prime p must be equal to 3 (mod 4)
+        self.assertRaises(ValueError, ssa.BatchVerifier, secp224k1, hf)
+
     def test_threshold(self):
         """testing 2-of-3 threshold signature (Pedersen secret sharing)"""
 
@@ -803,6 +994,34 @@ class TestEcssa(unittest.TestCase):
 
         self.assertTrue(ssa.verify(ec, hf, M, Q, sig))
 
+    def test_compact(self):
+        ec = secp256k1
+        sigs = []
+        for q in (1, 2, ec.n - 1):
+            mhd = hf(b'message').digest()
+            sig = ssa.sign(ec, hf, mhd, q)
+            sigs.append(sig)
+            data = ssa.serialize(ec, sig)
+            self.assertEqual(len(data), 64)
+            self.assertEqual(ssa.deserialize(ec, data), sig)
+            self.assertEqual(ssa.deserialize(ec, memoryview(data)), sig)
+        # s = 0 is a valid encoding
+        sigs.append((1, 0))
+        self.assertEqual(ssa.deserialize(ec, ssa.serialize(ec, (1, 0))), (1, 0))
+
+        self.assertRaises(ValueError, ssa.deserialize, ec, data[1:])
+        self.assertRaises(ValueError, ssa.deserialize, ec, b'\xff' * 32 + data[32:])
+        self.assertRaises(ValueError, ssa.deserialize, ec, data[:32] + b'\xff' * 32)
+        self.assertRaises(ValueError, ssa.serialize, ec, (ec._p, 1))
+
+        buf = ssa.serialize_many(ec, sigs)
+        self.assertEqual(bytes(buf), b''.join(ssa.serialize(ec, sig) for sig in sigs))
+        self.assertEqual(ssa.deserialize_many(ec, buf), sigs)
+        self.assertEqual(ssa.deserialize_many(ec, bytes(buf)), sigs)
+        self.assertRaises(ValueError, ssa.deserialize_many, ec, buf[:-1])
+        self.assertRaises(ValueError, ssa.deserialize_many, ec, buf + b'\xff' * 64)
+        self.assertRaises(ValueError, ssa.serialize_many, ec, sigs + [(1, ec.n)])
+
 
 if __name__ == "__main__":
     # execute only if run as a script
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+# Copyright (C) 2017-2019 The btclib developers
+#
+# This file is part of btclib. It is subject to the license terms in the
+# LICENSE file found in the top-level directory of this distribution.
+#
+# No part of btclib including this file, may be copied, modified, propagated,
+# or distributed except according to the terms contained in the LICENSE file.
+
+import os
+import tempfile
+import unittest
+
+from btclib.curve import mult
+from btclib.curves import secp256k1 as ec
+from btclib.utils import octets_from_point
+from btclib.vanity import VanitySearch, _pubkeys
+from btclib.wifaddress import address_from_pubkey
+
+
+class TestVanity(unittest.TestCase):
+    def test_pubkeys(self):
+        for start in (1, 2, 0xC28FCA386C7A227600B2FE50B7CAE11EC86D3BF1FBE471BE89827E19D72AA1D):
+            for compressed in (True, False):
+                pubkeys = _pubkeys(start, 5, compressed)
+                for i, pubkey in enumerate(pubkeys):
+                    Q = mult(ec, start + i, ec.G)
+                    self.assertEqual(pubkey, octets_from_point(ec, Q, compressed))
+
+    def test_search(self):
+        for compressed in (True, False):
+            vs = VanitySearch(suffix='z', compressed=compressed, block_size=64)
+            prvkey, address = vs.search()
+            self.assertTrue(address.endswith(b'z'))
+            Q = mult(ec, prvkey, ec.G)
+            self.assertEqual(address, address_from_pubkey(Q, compressed))
+            self.assertEqual(vs.keys % 64, 0)
+            self.assertGreater(vs.rate, 0)
+
+        # multiple processes
+        rates = []
+        vs = VanitySearch(prefix='1A', block_size=64)
+        prvkey, address = vs.search(2, callback=lambda v: rates.append(v.rate))
+        self.assertTrue(address.startswith(b'1A'))
+        Q = mult(ec, prvkey, ec.G)
+        self.assertEqual(address, address_from_pubkey(Q, True))
+        self.assertEqual(len(vs.starts), 2)
+        self.assertEqual(len(rates), vs.keys // 64)
+
+        # invalid patterns
+        self.assertRaises(ValueError, VanitySearch)
+        self.assertRaises(ValueError, VanitySearch, '1O')
+        self.assertRaises(ValueError, VanitySearch, '', 'l')
+        self.assertRaises(ValueError, VanitySearch, '2')
+        self.assertRaises(ValueError, VanitySearch, '1', '', True, b'\x00\x00')
+        self.assertRaises(ValueError, VanitySearch, '1', '', True, b'\x00', 0)
+
+    def test_checkpoint(self):
+        fd, filename = tempfile.mkstemp()
+        os.close(fd)
+        os.remove(filename)
+        try:
+            # practically impossible pattern
+            pattern = 'zzzzzzzzzz'
+            vs = VanitySearch('', pattern, block_size=32, checkpoint=filename)
+            self.assertIsNone(vs.search(max_keys=64))
+            self.assertEqual(vs.offsets, [64])
+            # the checkpoint contains private keys
+            if os.name == 'posix':
+                self.assertEqual(os.stat(filename).st_mode & 0o777, 0o600)
+
+            # resume
+            vs2 = VanitySearch('', pattern, block_size=32, checkpoint=filename)
+            self.assertEqual(vs2.starts, vs.starts)
+            self.assertEqual(vs2.offsets, [64])
+            self.assertEqual(vs2.keys, 64)
+            self.assertIsNone(vs2.search(max_keys=32))
+            self.assertEqual(vs2.offsets, [96])
+            self.assertEqual(vs2.keys, 96)
+
+            # checkpoint of a different search
+            self.assertRaises(ValueError, VanitySearch, '', 'zzz',
+                              checkpoint=filename)
+        finally:
+            os.remove(filename)
+
+
+if __name__ == "__main__":
+    # execute only if run as a script
+    unittest.main()
@@ -8,15 +8,22 @@
 # No part of btclib including this file, may be copied, modified, propagated,
 # or distributed except according to the terms contained in the LICENSE file.
 
+import os
+import tempfile
 import unittest
 
+from btclib import bip32
 from btclib.curve import mult
 from btclib.curves import secp256k1 as ec
-from btclib.utils import octets_from_int, point_from_octets
+from btclib.utils import octets_from_int, point_from_octets, \
+    octets_from_point, h160
 from btclib import base58
 from btclib.wifaddress import wif_from_prvkey, \
     prvkey_from_wif, address_from_pubkey, _h160_from_address, \
-    address_from_wif
+    address_from_wif, p2wpkh_address_from_pubkey
+from btclib.bech32 import segwit_address
+from btclib.keys import PrivateKey, PublicKey
+from btclib.keystore import KeyStore, KeyRecord
 
 
 class TestKeys(unittest.TestCase):
@@ -97,6 +104,44 @@ class TestKeys(unittest.TestCase):
 
         self.assertEqual(prvkey_from_wif(wif1)[0], prvkey_from_wif(wif2)[0])
 
+    def test_p2wpkh_address_from_pubkey(self):
+        # BIP173
+        pubkey = '0279BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798'
+        address = b'bc1qw508d6qejxtdg4y5r3zarvary0c5xw7kv8f3t4'
+        self.assertEqual(p2wpkh_address_from_pubkey(pubkey), address)
+        self.assertEqual(p2wpkh_address_from_pubkey(bytes.fromhex(pubkey)), address)
+        self.assertEqual(p2wpkh_address_from_pubkey(ec.G), address)
+        self.assertEqual(p2wpkh_address_from_pubkey(ec.G, 'tb'),
+                         b'tb1qw508d6qejxtdg4y5r3zarvary0c5xw7kxpjzsx')
+
+        # key objects: the public key is used, not their h160
+        mprv = bip32.xmprv_from_seed(b'\x5a' * 32, bip32.MAINNET_PRV)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, 'keys.bin')
+            with KeyStore(filename) as store:
+                store.append_range(bip32.xpub_from_xprv(mprv), [], 0, 1)
+                record = store[0]
+        key = PublicKey(record.pubkey)
+        self.assertEqual(record.h160, key.h160)
+        self.assertEqual(p2wpkh_address_from_pubkey(record),
+                         segwit_address('bc', 0, key.h160))
+        self.assertEqual(p2wpkh_address_from_pubkey(key),
+                         p2wpkh_address_from_pubkey(record))
+        record = record._replace(h160=b'\x00' * 20)
+        self.assertEqual(p2wpkh_address_from_pubkey(record),
+                         p2wpkh_address_from_pubkey(key))
+
+        # uncompressed public keys are not allowed in segwit v0
+        uncompressed = octets_from_point(ec, ec.G, False)
+        self.assertRaises(ValueError, p2wpkh_address_from_pubkey, uncompressed)
+        self.assertRaises(ValueError, p2wpkh_address_from_pubkey,
+                          uncompressed.hex())
+        record = KeyRecord([0], uncompressed, h160(uncompressed), None)
+        self.assertRaises(ValueError, p2wpkh_address_from_pubkey, record)
+        key = PublicKey(uncompressed)
+        self.assertRaises(ValueError, p2wpkh_address_from_pubkey, key)
+        self.assertRaises(ValueError, p2wpkh_address_from_pubkey,
+                          PrivateKey(1, False))
 
 if __name__ == "__main__":
     # execute only if run as a script